@@ -1,23 +1,42 @@
 #!/usr/bin/env python3
 """A2UI + A2A backend for the Flutter demo. Agent runs on port 9000."""
 
+import json
+import logging
 import os
+import re
 import sys
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
 
-from typing import Annotated
+from typing import Annotated, Any
 
+from pydantic import BaseModel, Field, ValidationError
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import FileResponse
 from starlette.routing import Route
 
 from autogen.a2a import A2aAgentServer, CardSettings
-from autogen import LLMConfig
+from autogen import ConversableAgent, LLMConfig
 from autogen.agents.experimental.a2ui import A2UIAgent, A2UIAction
 
+from templates import (
+    PreviewCopy,
+    preview_messages,
+    rewrite_messages,
+    scheduling_messages,
+)
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
 if not api_key:
     print("Set GOOGLE_GEMINI_API_KEY in .env to run this demo.")
@@ -30,6 +49,15 @@
     }
 )
 
+# The copy for the templates is a small structured output
+copy_llm_config = LLMConfig(
+    {
+        "api_type": "google",
+        "model": "gemini-3.1-flash-lite-preview",
+    },
+    response_format=PreviewCopy,
+)
+
 # ─── Custom catalog (optional) ───
 # If you want custom components like LinkedInPost/XPost, provide a catalog JSON.
 # Note that A2UIAgent always has the basic catalog (Column, Row, Card, Text, Image, Button, etc.)
@@ -62,8 +90,196 @@ def schedule_posts(
     )
 
 
+# ─── Templates ───
+# Briefs, rewrites and approvals are answered from the pre-built surfaces in
+# templates.py: only the copy is generated, by a copywriter that never sees the
+# A2UI schema or the catalog. The first message of a conversation is its brief;
+# later messages count as one only if the brief classifier says so. Other
+# messages and button actions, and copy that does not parse, fall through to
+# full A2UI generation.
+copywriter = ConversableAgent(
+    name="copywriter",
+    system_message=(
+        "You are a marketing copywriter. From a product brief, write the copy for "
+        "a launch email, a LinkedIn post and an X/Twitter post. Use the brand "
+        "details from the brief (author name, headline, handle) as given. Plain "
+        "text only: no markdown syntax. Keep the X post under 280 characters."
+    ),
+    llm_config=copy_llm_config,
+)
+
+
+class BriefCheck(BaseModel):
+    is_brief: bool = Field(
+        description="True if the message is a new product or campaign brief to write posts for"
+    )
+
+
+# Later free-text messages only start a new campaign if they read as a brief
+brief_classifier = ConversableAgent(
+    name="brief_classifier",
+    system_message=(
+        "Decide whether the user's message is a new marketing brief: a product or "
+        "campaign description to write launch posts for. Questions, feedback on the "
+        "current previews and other requests are not briefs."
+    ),
+    llm_config=LLMConfig(
+        {
+            "api_type": "google",
+            "model": "gemini-3.1-flash-lite-preview",
+        },
+        response_format=BriefCheck,
+    ),
+)
+
+# A2UIAgentExecutor turns a button click into this prompt
+ACTION_PROMPT = re.compile(r"The user clicked the '(\w+)' button")
+
+# Campaigns kept for rewrites, least recently used dropped first
+MAX_CONVERSATIONS = 256
+
+# The A2A context id of the request being served, set by ConversationExecutor
+conversation_id: ContextVar[str] = ContextVar("conversation_id", default="")
+
+
+@dataclass
+class Campaign:
+    """The brief of a conversation and the copy last written for it."""
+
+    brief: str
+    copy: PreviewCopy | None = None
+    # Whether the client shows the template tree, whose text is bound to the
+    # data model, rather than a marketing surface the A2UIAgent generated
+    templated: bool = False
+
+
+class MarketingPreviewer(A2UIAgent):
+    """A2UIAgent that fills cached surface templates instead of generating them.
+
+    The A2A server calls a_generate_oai_reply directly (registered reply
+    functions are not used), so the templates are served from there. The brief
+    and copy are kept per A2A conversation (conversation_id).
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        copywriter: ConversableAgent,
+        brief_classifier: ConversableAgent,
+        use_templates: bool = True,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.copywriter = copywriter
+        self.brief_classifier = brief_classifier
+        self.use_templates = use_templates
+        self._campaigns: OrderedDict[str, Campaign] = OrderedDict()
+
+    async def a_generate_oai_reply(
+        self, messages=None, sender=None, config=None, **kwargs
+    ):
+        if self.use_templates:
+            reply = await self._template_reply(messages or [])
+            if reply is not None:
+                return True, reply
+        # The A2UIAgent may replace the marketing surface with one without bindings
+        if (campaign := self._campaigns.get(conversation_id.get())) is not None:
+            campaign.templated = False
+        return await super().a_generate_oai_reply(messages, sender, config, **kwargs)
+
+    async def _template_reply(self, messages: list[dict[str, Any]]) -> str | None:
+        # Text parts from A2A carry no role unless the client sets one
+        text = next(
+            (
+                m["content"]
+                for m in reversed(messages)
+                if m.get("role", "user") == "user" and isinstance(m.get("content"), str)
+            ),
+            None,
+        )
+        if not text:
+            return None
+        match = ACTION_PROMPT.search(text)
+        action = match.group(1) if match else None
+        conversation = conversation_id.get()
+        campaign = self._campaigns.get(conversation)
+        if campaign is not None:
+            self._campaigns.move_to_end(conversation)
+
+        if action == "approve_previews":
+            return self._a2ui_response(
+                "Previews approved! Pick a time to schedule the posts.",
+                scheduling_messages(self.catalog_id),
+            )
+        if action == "rewrite_previews":
+            if (
+                campaign is None
+                or (copy := await self._write_copy(campaign, rewrite=True)) is None
+            ):
+                return None
+            # When the client already has the template tree, send only the new data
+            if campaign.templated:
+                return self._a2ui_response(copy.summary, rewrite_messages(copy))
+            campaign.templated = True
+            return self._a2ui_response(
+                copy.summary, preview_messages(copy, self.catalog_id)
+            )
+        if action is not None:
+            return None
+
+        # The first message is the brief; later ones go to the A2UIAgent unless
+        # they are a new brief
+        if campaign is not None and not await self._is_brief(text):
+            return None
+        campaign = self._campaigns[conversation] = Campaign(brief=text)
+        self._campaigns.move_to_end(conversation)
+        while len(self._campaigns) > MAX_CONVERSATIONS:
+            self._campaigns.popitem(last=False)
+        if (copy := await self._write_copy(campaign)) is None:
+            return None
+        campaign.templated = True
+        return self._a2ui_response(
+            copy.summary, preview_messages(copy, self.catalog_id)
+        )
+
+    async def _is_brief(self, text: str) -> bool:
+        _, reply = await self.brief_classifier.a_generate_oai_reply(
+            [{"role": "user", "content": text}]
+        )
+        content = reply.get("content") if isinstance(reply, dict) else reply
+        try:
+            return BriefCheck.model_validate_json(content or "").is_brief
+        except ValidationError:
+            return False
+
+    async def _write_copy(
+        self, campaign: Campaign, rewrite: bool = False
+    ) -> PreviewCopy | None:
+        prompt = f"Product brief:\n{campaign.brief}"
+        if rewrite and campaign.copy:
+            prompt += (
+                "\n\nRewrite all three posts with a completely different creative angle "
+                f"and tone than this version:\n{campaign.copy.model_dump_json()}"
+            )
+        _, reply = await self.copywriter.a_generate_oai_reply(
+            [{"role": "user", "content": prompt}]
+        )
+        content = reply.get("content") if isinstance(reply, dict) else reply
+        try:
+            campaign.copy = PreviewCopy.model_validate_json(content or "")
+        except ValidationError as e:
+            logger.warning(
+                "Copy did not match PreviewCopy, generating the full UI instead: %s", e
+            )
+            return None
+        return campaign.copy
+
+    def _a2ui_response(self, text: str, messages: list[dict[str, Any]]) -> str:
+        return f"{text}\n{self._response_delimiter}\n{json.dumps(messages)}"
+
+
 # ─── A2UI agent ───
-a2ui_agent = A2UIAgent(
+a2ui_agent = MarketingPreviewer(
     name="marketing_previewer",
     system_message=(
         "You are a marketing content designer. You work in a multi-step flow:\n\n"
@@ -103,6 +319,8 @@ def schedule_posts(
         "First write a short text summary, then the A2UI JSON."
     ),
     llm_config=llm_config,
+    copywriter=copywriter,
+    brief_classifier=brief_classifier,
     custom_catalog=CATALOG_PATH,
     custom_catalog_rules=CUSTOM_RULES,
     functions=[schedule_posts],
@@ -151,12 +369,37 @@ def schedule_posts(
     ],
 )
 
+
 # ─── Wrap in A2A server ───
+class ConversationExecutor(AgentExecutor):
+    """Runs the agent executor with conversation_id set to the request's A2A context id."""
+
+    def __init__(self, executor: AgentExecutor):
+        self.executor = executor
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        token = conversation_id.set(context.context_id or "")
+        try:
+            await self.executor.execute(context, event_queue)
+        finally:
+            conversation_id.reset(token)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        await self.executor.cancel(context, event_queue)
+
+
+class MarketingServer(A2aAgentServer):
+    @property
+    def executor(self) -> AgentExecutor:
+        return ConversationExecutor(super().executor)
+
+
 # A2aAgentServer auto-detects A2UIAgent and:
 #   - Uses A2UIAgentExecutor (splits response into TextPart + A2UI DataPart)
 #   - Declares the A2UI v0.9 extension in the agent card
 #   - Handles extension negotiation (clients without A2UI get text only)
-server = A2aAgentServer(
+# MarketingServer wraps that executor so the previewer knows the conversation.
+server = MarketingServer(
     agent=a2ui_agent,
     url="http://localhost:9000",
     agent_card=CardSettings(
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Tokens and time to first surface: cached templates vs. full A2UI generation.
+
+Plays the demo flow (brief, rewrite, approve) against Gemini both ways, calling
+the agent the way the A2A server does. The surface is sent to the client once
+the reply is complete, so the reply time is the time to first surface.
+
+    python benchmark.py [--runs 3]
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from backend import a2ui_agent, brief_classifier, conversation_id, copywriter
+
+BRIEF = """Create marketing previews for H2Oh, a premium reusable water bottle priced at $39.
+
+Product details:
+- Vacuum-insulated stainless steel, keeps water cold for 24 hours
+- Leak-proof lid with one-hand open
+- Available in 5 colors: Ocean Blue, Slate Grey, Sage Green, Blush Pink, Matte Black
+- BPA-free, eco-friendly — replaces 300+ plastic bottles per year
+- Fits standard cup holders
+
+Brand details:
+- Author name: H2Oh
+- LinkedIn headline: 5,200 followers
+- X handle: @DrinkH2Oh (verified)
+
+Campaign: Launch email to eco-conscious consumers.
+Tone: Fresh, modern, sustainability-focused.
+CTA: Shop Now — Free Shipping on First Order"""
+
+
+def _action(name: str) -> str:
+    # The prompt A2UIAgentExecutor builds for a button click
+    return f"The user clicked the '{name}' button. Action: {a2ui_agent.get_action(name).description}."
+
+
+STEPS = [
+    ("brief", BRIEF),
+    ("rewrite", _action("rewrite_previews")),
+    ("approve", _action("approve_previews")),
+]
+
+
+def _tokens() -> tuple[int, int]:
+    prompt = completion = 0
+    for agent in (a2ui_agent, copywriter, brief_classifier):
+        for usage in (agent.get_total_usage() or {}).values():
+            if isinstance(usage, dict):
+                prompt += usage.get("prompt_tokens", 0)
+                completion += usage.get("completion_tokens", 0)
+    return prompt, completion
+
+
+async def run_flow(
+    use_templates: bool,
+) -> dict[str, list[tuple[int, int, float, bool]]]:
+    """(prompt tokens, completion tokens, seconds, valid A2UI) for each step."""
+    a2ui_agent.use_templates = use_templates
+    # Each flow is a new A2A conversation, so the brief is its first message
+    conversation_id.set(uuid4().hex)
+    messages: list[dict[str, str]] = []
+    results = {}
+    for step, text in STEPS:
+        messages.append({"role": "user", "content": text})
+        before = _tokens()
+        start = time.perf_counter()
+        _, reply = await a2ui_agent.a_generate_oai_reply(messages)
+        seconds = time.perf_counter() - start
+        after = _tokens()
+
+        content = reply.get("content", "") if isinstance(reply, dict) else reply or ""
+        parsed = a2ui_agent.response_parser.parse(content)
+        valid = (
+            bool(parsed.operations)
+            and a2ui_agent.response_parser.validate(parsed.operations).is_valid
+        )
+        results[step] = (after[0] - before[0], after[1] - before[1], seconds, valid)
+        messages.append({"role": "assistant", "content": content})
+    return results
+
+
+async def main(runs: int) -> None:
+    print(
+        "| Mode | Step | Prompt tokens | Completion tokens | Time to surface (s) | Valid |"
+    )
+    print("|---|---|---|---|---|---|")
+    for mode, use_templates in [("full generation", False), ("templates", True)]:
+        totals = {step: [] for step, _ in STEPS}
+        for _ in range(runs):
+            for step, result in (await run_flow(use_templates)).items():
+                totals[step].append(result)
+        for step, results in totals.items():
+            prompt, completion, seconds = (
+                sum(r[i] for r in results) / runs for i in range(3)
+            )
+            valid = sum(r[3] for r in results)
+            print(
+                f"| {mode} | {step} | {prompt:.0f} | {completion:.0f} | {seconds:.2f} | {valid}/{runs} |"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--runs", type=int, default=3, help="Runs of the flow per mode (averaged)"
+    )
+    asyncio.run(main(parser.parse_args().runs))
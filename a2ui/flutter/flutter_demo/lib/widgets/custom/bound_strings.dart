@@ -0,0 +1,32 @@
+import 'package:flutter/widgets.dart';
+import 'package:genui/genui.dart';
+
+/// Builds a custom item from its DynamicString properties.
+///
+/// Each value is either a literal string or a `{"path": ...}` binding to the
+/// surface data model. Bound values are resolved through the data context,
+/// and the widget rebuilds when an `updateDataModel` changes them (e.g. when
+/// the backend rewrites the previews without resending the components).
+Widget buildWithStrings(
+  CatalogItemContext ctx,
+  Map<String, Object?> values,
+  Widget Function(Map<String, String> strings) builder,
+) {
+  final literals = <String, String>{};
+  final bound = <String, ValueNotifier<String?>>{};
+  values.forEach((key, value) {
+    if (value is Map && value['path'] is String) {
+      bound[key] = ctx.dataContext.subscribe<String>(DataPath(value['path'] as String));
+    } else {
+      literals[key] = value is String ? value : '';
+    }
+  });
+
+  return ListenableBuilder(
+    listenable: Listenable.merge(bound.values.toList()),
+    builder: (context, _) => builder({
+      ...literals,
+      for (final entry in bound.entries) entry.key: entry.value.value ?? '',
+    }),
+  );
+}
@@ -2,6 +2,8 @@ import 'package:flutter/material.dart';
 import 'package:genui/genui.dart';
 import 'package:json_schema_builder/json_schema_builder.dart';
 
+import 'bound_strings.dart';
+
 /// Custom LinkedInPost catalog item for the genui renderer.
 final linkedInPostItem = CatalogItem(
   name: 'LinkedInPost',
@@ -22,30 +24,33 @@ final linkedInPostItem = CatalogItem(
   ),
   widgetBuilder: (CatalogItemContext ctx) {
     final data = ctx.data as JsonMap;
-    final authorName = data['authorName'] as String? ?? '';
-    final authorHeadline = data['authorHeadline'] as String? ?? '';
-    final avatarUrl = data['authorAvatarUrl'] as String?;
-    final body = data['body'] as String? ?? '';
     final hashtagsRaw = data['hashtags'];
-    final hashtags = hashtagsRaw is String
-        ? hashtagsRaw.split(' ').where((s) => s.isNotEmpty).toList()
-        : (hashtagsRaw is List ? hashtagsRaw.cast<String>() : <String>[]);
     final likes = data['likes'] as int? ?? 0;
     final comments = data['comments'] as int? ?? 0;
     final reposts = data['reposts'] as int? ?? 0;
     final mediaChildId = data['mediaChild'] as String?;
 
-    return _LinkedInPostWidget(
-      authorName: authorName,
-      authorHeadline: authorHeadline,
-      avatarUrl: avatarUrl,
-      body: body,
-      hashtags: hashtags,
-      likes: likes,
-      comments: comments,
-      reposts: reposts,
-      mediaChildId: mediaChildId,
-      buildChild: ctx.buildChild,
+    return buildWithStrings(
+      ctx,
+      {
+        'authorName': data['authorName'],
+        'authorHeadline': data['authorHeadline'],
+        'authorAvatarUrl': data['authorAvatarUrl'],
+        'body': data['body'],
+        'hashtags': hashtagsRaw is List ? hashtagsRaw.join(' ') : hashtagsRaw,
+      },
+      (strings) => _LinkedInPostWidget(
+        authorName: strings['authorName']!,
+        authorHeadline: strings['authorHeadline']!,
+        avatarUrl: strings['authorAvatarUrl'],
+        body: strings['body']!,
+        hashtags: strings['hashtags']!.split(' ').where((s) => s.isNotEmpty).toList(),
+        likes: likes,
+        comments: comments,
+        reposts: reposts,
+        mediaChildId: mediaChildId,
+        buildChild: ctx.buildChild,
+      ),
     );
   },
 );
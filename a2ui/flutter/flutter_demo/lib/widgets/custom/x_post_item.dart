@@ -2,6 +2,8 @@ import 'package:flutter/material.dart';
 import 'package:genui/genui.dart';
 import 'package:json_schema_builder/json_schema_builder.dart';
 
+import 'bound_strings.dart';
+
 /// Custom XPost (X/Twitter) catalog item for the genui renderer.
 final xPostItem = CatalogItem(
   name: 'XPost',
@@ -23,29 +25,34 @@ final xPostItem = CatalogItem(
   ),
   widgetBuilder: (CatalogItemContext ctx) {
     final data = ctx.data as JsonMap;
-    final displayName = data['authorName'] as String? ?? '';
-    final handle = data['authorHandle'] as String? ?? '';
-    final avatarUrl = data['authorAvatarUrl'] as String?;
     final verified = data['verified'] as bool? ?? false;
-    final body = data['body'] as String? ?? '';
     final likes = data['likes'] as int? ?? 0;
     final reposts = data['reposts'] as int? ?? 0;
     final replies = data['replies'] as int? ?? 0;
     final views = data['views'] as int? ?? 0;
     final mediaChildId = data['mediaChild'] as String?;
 
-    return _XPostWidget(
-      displayName: displayName,
-      handle: handle,
-      avatarUrl: avatarUrl,
-      verified: verified,
-      body: body,
-      likes: likes,
-      reposts: reposts,
-      replies: replies,
-      views: views,
-      mediaChildId: mediaChildId,
-      buildChild: ctx.buildChild,
+    return buildWithStrings(
+      ctx,
+      {
+        'authorName': data['authorName'],
+        'authorHandle': data['authorHandle'],
+        'authorAvatarUrl': data['authorAvatarUrl'],
+        'body': data['body'],
+      },
+      (strings) => _XPostWidget(
+        displayName: strings['authorName']!,
+        handle: strings['authorHandle']!,
+        avatarUrl: strings['authorAvatarUrl'],
+        verified: verified,
+        body: strings['body']!,
+        likes: likes,
+        reposts: reposts,
+        replies: replies,
+        views: views,
+        mediaChildId: mediaChildId,
+        buildChild: ctx.buildChild,
+      ),
     );
   },
 );
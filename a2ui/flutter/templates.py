@@ -0,0 +1,295 @@
+"""Pre-built A2UI surfaces for the marketing demo.
+
+The component trees for the three preview cards and the scheduling surface
+never change, so they are built once here with their text bound to the data
+model ({"path": ...}). A request only needs the copy: a small structured
+output (PreviewCopy) that becomes one updateDataModel message. A rewrite sends
+that message alone; the client keeps the components it already has.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+VERSION = "v0.9"
+MARKETING_SURFACE = "marketing"
+SCHEDULING_SURFACE = "scheduling"
+
+PRODUCT_IMAGE_URL = "http://localhost:9000/images/bottle-hero.png"
+AVATAR_URL = "http://localhost:9000/images/AG2-square.png"
+SHOP_URL = "https://ag2.ai"
+
+# (action, button label, time) of the quick-schedule buttons
+QUICK_TIMES = [
+    ("schedule_9am", "9 AM", "9:00 AM"),
+    ("schedule_10am", "10 AM", "10:00 AM"),
+    ("schedule_2pm", "2 PM", "2:00 PM"),
+]
+CUSTOM_TIMES = [f"{hour}:00 AM" for hour in (9, 10, 11)] + [
+    f"{hour}:00 PM" for hour in (12, 1, 2, 3, 4, 5)
+]
+DEFAULT_CUSTOM_TIME = "12:00 PM"
+
+
+# ─── Copy filled in by the LLM ───
+class EmailCopy(BaseModel):
+    recipient: str = Field(description="Who the email goes to, e.g. 'H2Oh subscribers'")
+    subject: str
+    headline: str
+    body: str = Field(description="Two or three short paragraphs, plain text")
+    cta: str = Field(description="Call-to-action button label, e.g. 'Shop Now'")
+    footer: str = Field(
+        description="One-line footer, e.g. the company name and an unsubscribe note"
+    )
+
+
+class LinkedInCopy(BaseModel):
+    author_headline: str = Field(description="Tagline under the company name")
+    body: str = Field(description="Professional post, a few short paragraphs")
+    hashtags: str = Field(
+        description="Space-separated hashtags, e.g. '#Hydration #Wellness'"
+    )
+
+
+class XCopy(BaseModel):
+    body: str = Field(
+        description="Punchy post including hashtags, at most 280 characters"
+    )
+
+
+class PreviewCopy(BaseModel):
+    summary: str = Field(
+        description="One or two sentences for the chat describing the creative angle"
+    )
+    brand_name: str = Field(
+        description="Company or product brand shown as the post author"
+    )
+    brand_handle: str = Field(description="X handle for the brand, starting with @")
+    email: EmailCopy
+    linkedin: LinkedInCopy
+    x: XCopy
+
+
+# ─── Component trees ───
+def _text(id: str, text: str | dict[str, str], variant: str = "body") -> dict[str, Any]:
+    return {"id": id, "component": "Text", "text": text, "variant": variant}
+
+
+def _bound(path: str) -> dict[str, str]:
+    return {"path": path}
+
+
+def _button(
+    id: str,
+    label: str | dict[str, str],
+    action: dict[str, Any],
+    variant: str | None = None,
+) -> list[dict[str, Any]]:
+    """The Button and its Text label."""
+    button: dict[str, Any] = {
+        "id": id,
+        "component": "Button",
+        "child": f"{id}_label",
+        "action": action,
+    }
+    if variant:
+        button["variant"] = variant
+    return [button, _text(f"{id}_label", label)]
+
+
+def _event(name: str, context: dict[str, Any] | None = None) -> dict[str, Any]:
+    event: dict[str, Any] = {"name": name}
+    if context:
+        event["context"] = context
+    return {"event": event}
+
+
+def _media(id: str) -> dict[str, Any]:
+    return {
+        "id": id,
+        "component": "Image",
+        "url": PRODUCT_IMAGE_URL,
+        "variant": "header",
+        "fit": "cover",
+    }
+
+
+PREVIEW_COMPONENTS: list[dict[str, Any]] = [
+    {
+        "id": "root",
+        "component": "Column",
+        "children": [
+            "email_title",
+            "email_card",
+            "linkedin_title",
+            "linkedin_post",
+            "x_title",
+            "x_post",
+            "review_actions",
+        ],
+    },
+    # Email: basic catalog components in a Card
+    _text("email_title", "Email", "h2"),
+    {"id": "email_card", "component": "Card", "child": "email_content"},
+    {
+        "id": "email_content",
+        "component": "Column",
+        "children": [
+            "email_to",
+            "email_subject",
+            "email_divider_top",
+            "email_image",
+            "email_headline",
+            "email_body",
+            "email_divider_cta",
+            "email_cta",
+            "email_divider_footer",
+            "email_footer",
+        ],
+    },
+    _text("email_to", _bound("/email/to")),
+    _text("email_subject", _bound("/email/subject")),
+    {"id": "email_divider_top", "component": "Divider"},
+    _media("email_image"),
+    _text("email_headline", _bound("/email/headline"), "h2"),
+    _text("email_body", _bound("/email/body")),
+    {"id": "email_divider_cta", "component": "Divider"},
+    *_button(
+        "email_cta",
+        _bound("/email/cta"),
+        {"functionCall": {"call": "openUrl", "args": {"url": SHOP_URL}}},
+        variant="primary",
+    ),
+    {"id": "email_divider_footer", "component": "Divider"},
+    _text("email_footer", _bound("/email/footer"), "caption"),
+    # LinkedIn and X: custom catalog components. Engagement numbers are
+    # integers in the catalog (not bindable), so they are part of the template.
+    _text("linkedin_title", "LinkedIn", "h2"),
+    {
+        "id": "linkedin_post",
+        "component": "LinkedInPost",
+        "authorName": _bound("/brand/name"),
+        "authorHeadline": _bound("/linkedin/authorHeadline"),
+        "authorAvatarUrl": AVATAR_URL,
+        "body": _bound("/linkedin/body"),
+        "hashtags": _bound("/linkedin/hashtags"),
+        "mediaChild": "linkedin_image",
+        "likes": 248,
+        "comments": 37,
+        "reposts": 19,
+    },
+    _media("linkedin_image"),
+    _text("x_title", "X / Twitter", "h2"),
+    {
+        "id": "x_post",
+        "component": "XPost",
+        "authorName": _bound("/brand/name"),
+        "authorHandle": _bound("/brand/handle"),
+        "authorAvatarUrl": AVATAR_URL,
+        "verified": True,
+        "body": _bound("/x/body"),
+        "mediaChild": "x_image",
+        "replies": 24,
+        "reposts": 86,
+        "likes": 412,
+        "views": 18300,
+        "bookmarks": 31,
+    },
+    _media("x_image"),
+    {"id": "review_actions", "component": "Row", "children": ["approve", "rewrite"]},
+    *_button("approve", "Approve", _event("approve_previews"), variant="primary"),
+    *_button("rewrite", "Rewrite", _event("rewrite_previews")),
+]
+
+SCHEDULING_COMPONENTS: list[dict[str, Any]] = [
+    {
+        "id": "root",
+        "component": "Column",
+        "children": ["schedule_title", "quick_times", "custom_time", "schedule_custom"],
+    },
+    _text("schedule_title", "Previews Approved! Choose a schedule:", "h2"),
+    {
+        "id": "quick_times",
+        "component": "Row",
+        "children": [action for action, _, _ in QUICK_TIMES],
+    },
+    *[
+        part
+        for action, label, time in QUICK_TIMES
+        for part in _button(action, label, _event(action, {"time": time}))
+    ],
+    {
+        "id": "custom_time",
+        "component": "ChoicePicker",
+        "label": "Custom time",
+        "variant": "mutuallyExclusive",
+        "options": [{"label": t, "value": t} for t in CUSTOM_TIMES],
+        "value": _bound("/customTime"),
+    },
+    *_button(
+        "schedule_custom",
+        "Schedule Custom",
+        _event("schedule_custom", {"time": _bound("/customTime")}),
+        variant="primary",
+    ),
+]
+
+
+# ─── A2UI messages ───
+def preview_data(copy: PreviewCopy) -> dict[str, Any]:
+    """The data model of the marketing surface for this copy."""
+    return {
+        "brand": {"name": copy.brand_name, "handle": copy.brand_handle},
+        "email": {
+            "to": f"To: {copy.email.recipient}",
+            "subject": f"Subject: {copy.email.subject}",
+            "headline": copy.email.headline,
+            "body": copy.email.body,
+            "cta": copy.email.cta,
+            "footer": copy.email.footer,
+        },
+        "linkedin": {
+            "authorHeadline": copy.linkedin.author_headline,
+            "body": copy.linkedin.body,
+            "hashtags": copy.linkedin.hashtags,
+        },
+        "x": {"body": copy.x.body},
+    }
+
+
+def _message(kind: str, surface_id: str, **fields: Any) -> dict[str, Any]:
+    return {"version": VERSION, kind: {"surfaceId": surface_id, **fields}}
+
+
+def preview_messages(copy: PreviewCopy, catalog_id: str) -> list[dict[str, Any]]:
+    """The marketing surface with its data: for a new brief."""
+    return [
+        _message("createSurface", MARKETING_SURFACE, catalogId=catalog_id),
+        _message("updateComponents", MARKETING_SURFACE, components=PREVIEW_COMPONENTS),
+        *rewrite_messages(copy),
+    ]
+
+
+def rewrite_messages(copy: PreviewCopy) -> list[dict[str, Any]]:
+    """Only the new data for the marketing surface the client already shows."""
+    return [
+        _message(
+            "updateDataModel", MARKETING_SURFACE, path="/", value=preview_data(copy)
+        )
+    ]
+
+
+def scheduling_messages(catalog_id: str) -> list[dict[str, Any]]:
+    """The scheduling surface; the marketing surface is left untouched."""
+    return [
+        _message("createSurface", SCHEDULING_SURFACE, catalogId=catalog_id),
+        _message(
+            "updateComponents", SCHEDULING_SURFACE, components=SCHEDULING_COMPONENTS
+        ),
+        _message(
+            "updateDataModel",
+            SCHEDULING_SURFACE,
+            path="/customTime",
+            value=[DEFAULT_CUSTOM_TIME],
+        ),
+    ]
@@ -3,22 +3,34 @@
 Uses a single orchestrator agent with stage-specific tools. The agent follows
 a feedback loop: plan -> draft -> review -> revise -> review -> finalize.
 ContextVariables track the workflow state, and the frontend visualizes each stage.
+
+Each conversation thread gets its own agent and server-side state (see
+sessions.py), and the number of concurrent runs is bounded: when every run
+slot is busy, /chat answers 429 with a Retry-After header.
 """
 
 from typing import Annotated
 
 from ag_ui.core import RunAgentInput
 from dotenv import load_dotenv
-from fastapi import FastAPI, Header
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 from autogen import ConversableAgent, LLMConfig
-from autogen.ag_ui import AGUIStream
 from autogen.agentchat.group import ContextVariables, ReplyResult
 
+from document_edits import (
+    EditError,
+    SectionEdit,
+    describe_revision,
+    revise,
+    split_sections,
+)
+from sessions import Saturated, ThreadBusy, ThreadSessions
+
 load_dotenv()
 
 llm_config = LLMConfig({"model": "gpt-4o-mini"})
@@ -29,9 +41,12 @@
 STAGE 1 - PLANNING: Call submit_plan with an outline, audience, and tone.
 STAGE 2 - DRAFTING: Call submit_draft with the full document based on the plan.
 STAGE 3 - REVIEW: Call submit_review with strengths, improvements, and whether revision is needed.
-STAGE 4 - REVISION (if needed): Call submit_revision with the revised document.
+STAGE 4 - REVISION (if needed): Call revise_draft with ONLY the changes to the current draft:
+  section edits (replace, insert_after or delete a section by its heading) or a unified diff.
+  Never send the whole document again.
   -> Then go back to STAGE 3 for another review.
-STAGE 5 - FINALIZATION: Call submit_final with the polished final document.
+STAGE 5 - FINALIZATION: Call submit_final. Pass edits only for last polishing changes:
+  the current draft becomes the final document.
 
 RULES:
 - Call exactly ONE tool per turn. Do NOT call multiple tools at once.
@@ -42,15 +57,7 @@
 - Keep documents concise (300-500 words) for demo purposes.
 """
 
-agent = ConversableAgent(
-    name="orchestrator",
-    system_message=ORCHESTRATOR_SYSTEM,
-    llm_config=llm_config,
-)
-
 
-@agent.register_for_execution()
-@agent.register_for_llm(description="Submit the document plan. Call this first.")
 def submit_plan(
     outline: Annotated[str, "Structured outline with 3-5 sections and key points"],
     audience: Annotated[str, "Target audience"],
@@ -67,13 +74,12 @@ def submit_plan(
     )
 
 
-@agent.register_for_execution()
-@agent.register_for_llm(description="Submit the document draft based on the plan.")
 def submit_draft(
     document: Annotated[str, "Full document draft in markdown"],
     context_variables: ContextVariables,
 ) -> ReplyResult:
-    context_variables["document_draft"] = document
+    # Stored as sections, so revisions can edit one section at a time
+    context_variables["document_draft"] = split_sections(document)
     context_variables["stage"] = "review"
     context_variables["active_agent"] = "reviewer"
     return ReplyResult(
@@ -82,8 +88,6 @@ def submit_draft(
     )
 
 
-@agent.register_for_execution()
-@agent.register_for_llm(description="Submit review feedback on the current draft.")
 def submit_review(
     strengths: Annotated[str, "What the document does well"],
     improvements: Annotated[str, "Specific areas needing improvement"],
@@ -102,7 +106,7 @@ def submit_review(
         context_variables["stage"] = "revision"
         context_variables["active_agent"] = "editor"
         return ReplyResult(
-            message=f"[REVIEWER] Iteration {iteration + 1}/{max_iter}: Revisions needed. Use submit_revision.",
+            message=f"[REVIEWER] Iteration {iteration + 1}/{max_iter}: Revisions needed. Use revise_draft.",
             context_variables=context_variables,
         )
     else:
@@ -115,35 +119,62 @@ def submit_review(
         )
 
 
-@agent.register_for_execution()
-@agent.register_for_llm(
-    description="Submit revised document incorporating feedback. Loops back to review."
-)
-def submit_revision(
-    revised_document: Annotated[
-        str, "Revised document incorporating reviewer feedback"
-    ],
+def _apply_edits(
     context_variables: ContextVariables,
+    edits: list[SectionEdit] | None,
+    diff: str,
+) -> str | None:
+    """Applies the edits to the stored draft; returns the error if they don't apply."""
+    try:
+        context_variables["document_draft"] = revise(
+            context_variables.get("document_draft", []), edits, diff
+        )
+    except EditError as e:
+        return str(e)
+    return None
+
+
+def revise_draft(
+    context_variables: ContextVariables,
+    edits: Annotated[
+        list[SectionEdit] | None, "Section edits, applied in order"
+    ] = None,
+    diff: Annotated[
+        str, "Unified diff against the current draft, applied after the edits"
+    ] = "",
 ) -> ReplyResult:
-    context_variables["document_draft"] = revised_document
+    previous = context_variables.get("document_draft", [])
+    if error := _apply_edits(context_variables, edits, diff):
+        return ReplyResult(
+            message=f"[EDITOR] Revision rejected, the draft is unchanged: {error}. Fix the edits and call revise_draft again.",
+            context_variables=context_variables,
+        )
     context_variables["iteration"] = context_variables.get("iteration", 0) + 1
     context_variables["stage"] = "review"
     context_variables["active_agent"] = "reviewer"
+    # The model only sees the draft through tool results: show what it is now
+    revision = describe_revision(previous, context_variables["document_draft"])
     return ReplyResult(
-        message=f"[EDITOR] Revision {context_variables['iteration']} complete. Now review again using submit_review.",
+        message=f"[EDITOR] Revision {context_variables['iteration']} complete.\n\n{revision}\n\nNow review the current draft using submit_review.",
         context_variables=context_variables,
     )
 
 
-@agent.register_for_execution()
-@agent.register_for_llm(
-    description="Submit the final polished document. Call this last."
-)
 def submit_final(
-    final_document: Annotated[str, "Finalized document in markdown"],
     context_variables: ContextVariables,
+    edits: Annotated[
+        list[SectionEdit] | None, "Optional last section edits, applied in order"
+    ] = None,
+    diff: Annotated[str, "Optional unified diff against the current draft"] = "",
 ) -> ReplyResult:
-    context_variables["final_document"] = final_document
+    if (edits or diff.strip()) and (
+        error := _apply_edits(context_variables, edits, diff)
+    ):
+        return ReplyResult(
+            message=f"[EDITOR] Final edits rejected, the draft is unchanged: {error}. Fix the edits and call submit_final again.",
+            context_variables=context_variables,
+        )
+    # The stored draft is the final document: no need to send it again
     context_variables["stage"] = "done"
     context_variables["active_agent"] = ""
     return ReplyResult(
@@ -152,7 +183,36 @@ def submit_final(
     )
 
 
-stream = AGUIStream(agent)
+TOOLS = [
+    (submit_plan, "Submit the document plan. Call this first."),
+    (submit_draft, "Submit the document draft based on the plan."),
+    (submit_review, "Submit review feedback on the current draft."),
+    (
+        revise_draft,
+        "Revise the current draft with section edits or a unified diff. Loops back to review.",
+    ),
+    (
+        submit_final,
+        "Finalize the current draft, with optional last edits. Call this last.",
+    ),
+]
+
+
+def make_agent(config: LLMConfig = llm_config) -> ConversableAgent:
+    """Agent factory: one orchestrator per conversation thread."""
+    agent = ConversableAgent(
+        name="orchestrator",
+        system_message=ORCHESTRATOR_SYSTEM,
+        llm_config=config,
+    )
+    for tool, description in TOOLS:
+        agent.register_for_execution()(
+            agent.register_for_llm(description=description)(tool)
+        )
+    return agent
+
+
+sessions = ThreadSessions(make_agent)
 
 # ──────────────────────────────────────────────
 # FastAPI app
@@ -181,9 +241,19 @@ async def run_agent(
     message: RunAgentInput,
     accept: str | None = Header(None),
 ) -> StreamingResponse:
-    event_stream = stream.dispatch(message, accept=accept)
+    try:
+        session = await sessions.acquire(message.thread_id)
+    except Saturated as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many documents in progress, try again shortly",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except ThreadBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
     return StreamingResponse(
-        event_stream,
+        sessions.run(session, message, accept=accept),
         media_type=accept or "text/event-stream",
     )
 
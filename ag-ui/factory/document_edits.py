@@ -0,0 +1,177 @@
+"""Edits against the stored document draft.
+
+The draft is stored as a list of sections: the text before the first heading,
+then one section per markdown heading, each with its heading line. Revisions
+send only what changes, either as section edits or as a unified diff, instead
+of the whole document. Edits are validated before anything is applied: a
+heading that is missing or ambiguous, or a diff hunk whose lines are not in the
+draft, rejects the whole revision with an EditError.
+"""
+
+import re
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+HEADING = re.compile(r"^#{1,6}\s+\S")
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+
+class EditError(ValueError):
+    """An edit does not apply to the current draft."""
+
+
+class SectionEdit(BaseModel):
+    heading: str = Field(
+        description='Heading line of the section to edit, as in the draft (e.g. "## Benefits"); '
+        '"" for the text before the first heading'
+    )
+    action: Literal["replace", "insert_after", "delete"] = Field(
+        default="replace",
+        description="replace the section, insert a new section after it, or delete it",
+    )
+    content: str = Field(
+        default="",
+        description="Full text of the new section, starting with its heading line (not used by delete)",
+    )
+
+
+def split_sections(document: str) -> list[str]:
+    """Splits markdown into sections, each starting at a heading."""
+    sections: list[list[str]] = [[]]
+    for line in document.strip().splitlines():
+        if HEADING.match(line) and any(text.strip() for text in sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+    return [
+        "\n".join(lines).strip()
+        for lines in sections
+        if any(text.strip() for text in lines)
+    ]
+
+
+def join_sections(sections: list[str]) -> str:
+    return "\n\n".join(sections)
+
+
+def _heading(section: str) -> str:
+    first = section.split("\n", 1)[0]
+    return first if HEADING.match(first) else ""
+
+
+def _normalize(heading: str) -> str:
+    return " ".join(heading.lstrip("#").split()).lower()
+
+
+def _find_section(sections: list[str], heading: str) -> int:
+    wanted = _normalize(heading)
+    matches = [i for i, s in enumerate(sections) if _normalize(_heading(s)) == wanted]
+    if not matches:
+        headings = ", ".join(repr(_heading(s)) for s in sections)
+        raise EditError(f"No section with heading {heading!r}. Headings: {headings}")
+    if len(matches) > 1:
+        raise EditError(f"Heading {heading!r} matches {len(matches)} sections")
+    return matches[0]
+
+
+def apply_section_edits(sections: list[str], edits: list[SectionEdit]) -> list[str]:
+    sections = list(sections)
+    for number, edit in enumerate(edits, 1):
+        try:
+            index = _find_section(sections, edit.heading)
+            if edit.action == "delete":
+                del sections[index]
+                continue
+            new = split_sections(edit.content)
+            if not new:
+                raise EditError(
+                    "content is empty; use the delete action to remove a section"
+                )
+            if edit.action == "replace":
+                sections[index : index + 1] = new
+            else:
+                sections[index + 1 : index + 1] = new
+        except EditError as e:
+            raise EditError(f"Edit {number}: {e}") from None
+    return sections
+
+
+def _parse_hunks(diff: str) -> list[tuple[int, list[str], list[str]]]:
+    """(old start line, old lines, new lines) for each hunk of a unified diff."""
+    hunks = []
+    for line in diff.splitlines():
+        if match := HUNK_HEADER.match(line):
+            hunks.append((int(match.group(1)), [], []))
+        elif line.startswith(("---", "+++", "\\")) or not hunks:
+            continue
+        else:
+            _, old, new = hunks[-1]
+            marker, text = (line[0], line[1:]) if line else (" ", "")
+            if marker == " ":
+                old.append(text)
+                new.append(text)
+            elif marker == "-":
+                old.append(text)
+            elif marker == "+":
+                new.append(text)
+            else:
+                raise EditError(f"Unexpected diff line {line!r}")
+    if not hunks:
+        raise EditError("The diff has no @@ hunks")
+    return hunks
+
+
+def apply_unified_diff(document: str, diff: str) -> str:
+    lines = document.splitlines()
+    offset = 0
+    for number, (start, old, new) in enumerate(_parse_hunks(diff), 1):
+        # The hunk's lines must appear in the draft; prefer the position
+        # closest to the one in its header
+        expected = max(start - 1 + offset, 0)
+        positions = [
+            i
+            for i in range(len(lines) - len(old) + 1)
+            if lines[i : i + len(old)] == old
+        ]
+        if not old:
+            # Pure insertion: nothing to match, trust the header
+            position = min(expected + (1 if start else 0), len(lines))
+        elif not positions:
+            raise EditError(f"Hunk {number} does not match the draft")
+        else:
+            position = min(positions, key=lambda i: abs(i - expected))
+        lines[position : position + len(old)] = new
+        offset += len(new) - len(old)
+    return "\n".join(lines)
+
+
+def describe_revision(old: list[str], new: list[str]) -> str:
+    """The sections a revision changed, as stored, and the outline of the result.
+
+    Sent back to the model, so later reviews and diffs work from the stored text
+    (normalized by split_sections) rather than from its memory of the draft.
+    """
+    unchanged = set(old)
+    changed = [section for section in new if section not in unchanged]
+    outline = "\n".join(f"- {_heading(section) or '(intro)'}" for section in new)
+    text = f"Outline:\n{outline}"
+    if changed:
+        text += f"\n\nChanged sections:\n\n{join_sections(changed)}"
+    return text
+
+
+def revise(
+    sections: list[str],
+    edits: list[SectionEdit] | None = None,
+    diff: str = "",
+) -> list[str]:
+    """The draft after the section edits, then the diff; raises EditError."""
+    if not edits and not diff.strip():
+        raise EditError("No edits given: pass section edits or a unified diff")
+    if edits:
+        sections = apply_section_edits(sections, edits)
+    if diff.strip():
+        sections = split_sections(apply_unified_diff(join_sections(sections), diff))
+    if not sections:
+        raise EditError("The edits would leave the document empty")
+    return sections
@@ -0,0 +1,215 @@
+"""Per-thread conversation state for the Feedback Factory backend.
+
+Each AG-UI thread (RunAgentInput.thread_id) gets its own orchestrator agent,
+built by the agent factory, and its own workflow state (stage, iteration,
+document drafts). The state is kept on the server between runs, so concurrent
+users never share a draft or an iteration counter.
+
+Threads idle for longer than IDLE_SECONDS are dropped, and past MAX_THREADS the
+least recently used idle thread is dropped first. A semaphore bounds the number
+of runs (and so LLM conversations) in flight; a run that cannot get a slot
+within ACQUIRE_TIMEOUT seconds is refused with Saturated.
+
+A run sends the full state once, as a STATE_SNAPSHOT event, then only what
+changes, as STATE_DELTA events carrying JSON Patch (RFC 6902) operations.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from ag_ui.core import BaseEvent, RunAgentInput, StateDeltaEvent, StateSnapshotEvent
+from ag_ui.encoder import EventEncoder
+from anyio import create_memory_object_stream, create_task_group
+
+from autogen import ConversableAgent
+from autogen.ag_ui.adapter import AGStreamInput, run_stream
+from autogen.agentchat import ContextVariables
+from autogen.agentchat.remote import AgentService
+
+MAX_THREADS = 256
+IDLE_SECONDS = 30 * 60
+MAX_CONCURRENT_RUNS = 8
+ACQUIRE_TIMEOUT = 2.0
+RETRY_AFTER_SECONDS = 5
+
+
+def _pointer(path: str, key: str | int) -> str:
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _same(a: Any, b: Any) -> bool:
+    return a == b and type(a) is type(b)
+
+
+def json_patch(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """JSON Patch operations turning old into new, descending into objects and arrays."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [{"op": "remove", "path": _pointer(path, k)} for k in old if k not in new]
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+            else:
+                ops += json_patch(old[key], value, _pointer(path, key))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        # Skip the unchanged head and tail, so an insertion or deletion is a
+        # single add/remove at its index rather than a rewrite of what follows.
+        start = 0
+        while start < min(len(old), len(new)) and _same(old[start], new[start]):
+            start += 1
+        end = 0
+        while end < min(len(old), len(new)) - start and _same(
+            old[-1 - end], new[-1 - end]
+        ):
+            end += 1
+        old_mid, new_mid = old[start : len(old) - end], new[start : len(new) - end]
+        ops = []
+        for offset, (a, b) in enumerate(zip(old_mid, new_mid)):
+            ops += json_patch(a, b, _pointer(path, start + offset))
+        index = start + min(len(old_mid), len(new_mid))
+        for _ in range(len(old_mid) - len(new_mid)):
+            ops.append({"op": "remove", "path": _pointer(path, index)})
+        for offset, value in enumerate(new_mid[len(old_mid) :]):
+            ops.append(
+                {"op": "add", "path": _pointer(path, index + offset), "value": value}
+            )
+        return ops
+    if _same(old, new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+class Saturated(Exception):
+    """All run slots are busy."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Service saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ThreadBusy(Exception):
+    """The thread already has a run in progress."""
+
+
+@dataclass
+class ThreadSession:
+    thread_id: str
+    agent: ConversableAgent
+    service: AgentService
+    state: dict[str, Any] = field(default_factory=dict)
+    last_used: float = field(default_factory=time.monotonic)
+    running: bool = False
+
+
+class ThreadSessions:
+    def __init__(
+        self,
+        make_agent: Callable[[], ConversableAgent],
+        max_threads: int = MAX_THREADS,
+        idle_seconds: float = IDLE_SECONDS,
+        max_concurrent_runs: int = MAX_CONCURRENT_RUNS,
+        acquire_timeout: float = ACQUIRE_TIMEOUT,
+    ):
+        self.make_agent = make_agent
+        self.max_threads = max_threads
+        self.idle_seconds = idle_seconds
+        self.max_concurrent_runs = max_concurrent_runs
+        self.acquire_timeout = acquire_timeout
+        self._threads: OrderedDict[str, ThreadSession] = OrderedDict()
+        self._runs = asyncio.Semaphore(max_concurrent_runs)
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    def __contains__(self, thread_id: str) -> bool:
+        return thread_id in self._threads
+
+    def _evict(self, keep: str) -> None:
+        """Drops expired threads, then the least recently used ones over the cap."""
+        now = time.monotonic()
+        for session in list(self._threads.values()):
+            over_cap = len(self._threads) > self.max_threads
+            if not over_cap and now - session.last_used < self.idle_seconds:
+                break
+            if not session.running and session.thread_id != keep:
+                del self._threads[session.thread_id]
+
+    def get(self, thread_id: str) -> ThreadSession:
+        """The thread's session, created on first use."""
+        session = self._threads.get(thread_id)
+        if session is None:
+            agent = self.make_agent()
+            session = ThreadSession(thread_id, agent, AgentService(agent))
+            self._threads[thread_id] = session
+        self._threads.move_to_end(thread_id)
+        session.last_used = time.monotonic()
+        self._evict(keep=thread_id)
+        return session
+
+    async def acquire(self, thread_id: str) -> ThreadSession:
+        """Reserves a run slot for the thread; release it with release()."""
+        session = self.get(thread_id)
+        if session.running:
+            raise ThreadBusy(f"Thread {thread_id} already has a run in progress")
+        try:
+            await asyncio.wait_for(self._runs.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise Saturated(RETRY_AFTER_SECONDS) from None
+        session.running = True
+        return session
+
+    def release(self, session: ThreadSession) -> None:
+        if session.running:
+            session.running = False
+            session.last_used = time.monotonic()
+            if session.thread_id in self._threads:
+                self._threads.move_to_end(session.thread_id)
+            self._runs.release()
+
+    async def run(
+        self,
+        session: ThreadSession,
+        incoming: RunAgentInput,
+        accept: str | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        AGUIStream.dispatch for a session: the run starts from the thread's
+        stored state, and every state snapshot is stored back. After the first
+        snapshot, snapshots are sent as deltas. Releases the session's run
+        slot when done.
+        """
+        try:
+            state = ContextVariables()
+            state.update(session.agent.context_variables.to_dict())
+            state.update(incoming.state or {})
+            # The server's copy of the thread state wins over the frontend's
+            state.update(session.state)
+
+            write_events, read_events = create_memory_object_stream[BaseEvent]()
+            encoder = EventEncoder(accept=accept)
+            sent: dict[str, Any] | None = None
+            async with create_task_group() as tg:
+                tg.start_soon(
+                    run_stream,
+                    AGStreamInput(incoming=incoming, context=state),
+                    session.service,
+                    write_events,
+                )
+                async with read_events:
+                    async for event in read_events:
+                        if isinstance(event, StateSnapshotEvent):
+                            snapshot = event.snapshot
+                            session.state = dict(snapshot)
+                            if sent is not None:
+                                delta = json_patch(sent, snapshot)
+                                event = StateDeltaEvent(
+                                    delta=delta, timestamp=event.timestamp
+                                )
+                            sent = snapshot
+                        yield encoder.encode(event)
+        finally:
+            self.release(session)
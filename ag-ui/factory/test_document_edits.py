@@ -0,0 +1,171 @@
+"""Tests for draft edits and the JSON Patch state deltas."""
+
+import copy
+
+import pytest
+
+from document_edits import (
+    EditError,
+    SectionEdit,
+    describe_revision,
+    join_sections,
+    revise,
+    split_sections,
+)
+from sessions import json_patch
+
+DRAFT = """# AI Agents
+
+Agents are programs that act.
+
+## Benefits
+
+- Fast
+- Cheap
+
+## Risks
+
+They can be wrong.
+"""
+
+
+def _apply(document, ops):
+    """Minimal RFC 6902 apply (add, remove, replace), as the frontend does."""
+    document = copy.deepcopy(document)
+    for op in ops:
+        keys = [
+            k.replace("~1", "/").replace("~0", "~") for k in op["path"].split("/")[1:]
+        ]
+        parent = document
+        for key in keys[:-1]:
+            parent = parent[int(key)] if isinstance(parent, list) else parent[key]
+        last = keys[-1]
+        if isinstance(parent, list):
+            index = int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = op["value"]
+    return document
+
+
+def test_split_sections_round_trips():
+    sections = split_sections(DRAFT)
+    assert [s.splitlines()[0] for s in sections] == [
+        "# AI Agents",
+        "## Benefits",
+        "## Risks",
+    ]
+    assert join_sections(sections) == DRAFT.strip()
+
+
+def test_section_edits():
+    sections = split_sections(DRAFT)
+    edited = revise(
+        sections,
+        [
+            SectionEdit(heading="benefits", content="## Benefits\n\n- Fast"),
+            SectionEdit(
+                heading="## Risks",
+                action="insert_after",
+                content="## Outlook\n\nBright.",
+            ),
+            SectionEdit(heading="# AI Agents", action="delete"),
+        ],
+    )
+    assert edited == [
+        "## Benefits\n\n- Fast",
+        "## Risks\n\nThey can be wrong.",
+        "## Outlook\n\nBright.",
+    ]
+    # The stored draft is not modified in place
+    assert sections == split_sections(DRAFT)
+
+
+def test_unified_diff():
+    diff = """--- a/draft.md
++++ b/draft.md
+@@ -7,2 +7,3 @@
+ - Fast
+-- Cheap
++- Cheap to run
++- Easy to test
+"""
+    edited = revise(split_sections(DRAFT), diff=diff)
+    assert edited[1] == "## Benefits\n\n- Fast\n- Cheap to run\n- Easy to test"
+    assert edited[2] == "## Risks\n\nThey can be wrong."
+
+
+@pytest.mark.parametrize(
+    "edits, diff, error",
+    [
+        (
+            [SectionEdit(heading="## Costs", content="## Costs")],
+            "",
+            "No section with heading",
+        ),
+        ([SectionEdit(heading="## Risks", content="")], "", "content is empty"),
+        (None, "@@ -1,1 +1,1 @@\n-# Not there\n+# Title\n", "does not match"),
+        (None, "just rewrite it", "no @@ hunks"),
+        (None, "", "No edits given"),
+    ],
+)
+def test_invalid_edits_are_rejected(edits, diff, error):
+    with pytest.raises(EditError, match=error):
+        revise(split_sections(DRAFT), edits, diff)
+
+
+def test_describe_revision_shows_the_changed_sections_and_outline():
+    sections = split_sections(DRAFT)
+    revised = revise(
+        sections,
+        [
+            SectionEdit(heading="Benefits", content="## Benefits\n\n- Fast\n- Safe"),
+            SectionEdit(heading="Risks", action="delete"),
+        ],
+    )
+
+    assert describe_revision(sections, revised) == (
+        "Outline:\n- # AI Agents\n- ## Benefits\n\n"
+        "Changed sections:\n\n## Benefits\n\n- Fast\n- Safe"
+    )
+
+
+def test_json_patch_sends_only_the_changed_section():
+    old = {"stage": "review", "iteration": 0, "document_draft": split_sections(DRAFT)}
+    new = copy.deepcopy(old)
+    new.update(stage="revision", iteration=1, feedback="More detail")
+    new["document_draft"][1] = "## Benefits\n\n- Fast\n- Cheap\n- Safe"
+
+    ops = json_patch(old, new)
+    assert _apply(old, ops) == new
+    assert {op["path"] for op in ops} == {
+        "/stage",
+        "/iteration",
+        "/feedback",
+        "/document_draft/1",
+    }
+
+    shorter = copy.deepcopy(new)
+    del shorter["feedback"]
+    shorter["document_draft"] = shorter["document_draft"][:1] + ["## New/Section"]
+    assert _apply(new, json_patch(new, shorter)) == shorter
+
+
+def test_json_patch_inserts_and_deletes_sections_in_place():
+    sections = split_sections(DRAFT)
+    inserted = sections[:1] + ["## Risks\n\nNone yet."] + sections[1:]
+
+    ops = json_patch(sections, inserted)
+    assert ops == [{"op": "add", "path": "/1", "value": "## Risks\n\nNone yet."}]
+    assert _apply(sections, ops) == inserted
+
+    ops = json_patch(inserted, sections)
+    assert ops == [{"op": "remove", "path": "/1"}]
+    assert _apply(inserted, ops) == sections
@@ -0,0 +1,275 @@
+"""Load test for /chat with a fake LLM: many concurrent threads, bounded runs."""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from openai.types.chat import ChatCompletion
+
+import backend
+from autogen import LLMConfig
+from sessions import ThreadSessions
+
+LLM_SECONDS = 0.02
+
+# The orchestrator's pipeline with the default 2 revision cycles
+SCRIPT = [
+    "submit_plan",
+    "submit_draft",
+    "submit_review",
+    "revise_draft",
+    "submit_review",
+    "revise_draft",
+    "submit_review",
+    "submit_final",
+]
+
+
+class FakeLLM:
+    """Model client that walks the pipeline, writing the request into each document."""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    calls = 0
+
+    def __init__(self, config, **kwargs):
+        pass
+
+    def create(self, params):
+        with FakeLLM.lock:
+            FakeLLM.active += 1
+            FakeLLM.calls += 1
+            FakeLLM.peak = max(FakeLLM.peak, FakeLLM.active)
+        try:
+            time.sleep(LLM_SECONDS)
+            return self._reply(params["messages"])
+        finally:
+            with FakeLLM.lock:
+                FakeLLM.active -= 1
+
+    def _reply(self, messages):
+        last_user = max(i for i, m in enumerate(messages) if m["role"] == "user")
+        request = messages[last_user]["content"]
+        step = sum(m["role"] == "tool" for m in messages[last_user:])
+        message = {"role": "assistant", "content": "Done."}
+        if step < len(SCRIPT):
+            name = SCRIPT[step]
+            arguments = {
+                "submit_plan": {
+                    "outline": request,
+                    "audience": "devs",
+                    "tone": "casual",
+                },
+                "submit_draft": {
+                    "document": f"# {request}\n\nIntro\n\n## Body\n\nDraft"
+                },
+                "submit_review": {
+                    "strengths": "ok",
+                    "improvements": "more",
+                    "needs_revision": True,
+                },
+                "revise_draft": {
+                    "edits": [
+                        {"heading": "## Body", "content": f"## Body\n\nRevision {step}"}
+                    ]
+                },
+                "submit_final": {},
+            }[name]
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{step}",
+                        "type": "function",
+                        "function": {"name": name, "arguments": json.dumps(arguments)},
+                    }
+                ],
+            }
+        return ChatCompletion.model_validate(
+            {
+                "id": "fake",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "fake",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                },
+            }
+        )
+
+    def message_retrieval(self, response):
+        return [choice.message for choice in response.choices]
+
+    def cost(self, response):
+        return 0.0
+
+    @staticmethod
+    def get_usage(response):
+        return {
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cost": 0,
+            "model": "fake",
+        }
+
+
+def make_fake_agent():
+    agent = backend.make_agent(
+        LLMConfig({"model": "fake", "model_client_cls": "FakeLLM", "cache_seed": None})
+    )
+    agent.register_model_client(FakeLLM)
+    return agent
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    FakeLLM.active = FakeLLM.peak = FakeLLM.calls = 0
+
+    def use(**kwargs):
+        sessions = ThreadSessions(make_fake_agent, **kwargs)
+        monkeypatch.setattr(backend, "sessions", sessions)
+        return sessions
+
+    return use
+
+
+def _body(thread_id, content):
+    return {
+        "threadId": thread_id,
+        "runId": f"run-{thread_id}",
+        "state": {},
+        "messages": [{"id": "m1", "role": "user", "content": content}],
+        "tools": [],
+        "context": [],
+        "forwardedProps": {},
+    }
+
+
+async def _chat(client, thread_id, content):
+    return await client.post("/chat", json=_body(thread_id, content))
+
+
+def _events(response):
+    return [
+        json.loads(line[len("data: ") :])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def _client():
+    transport = httpx.ASGITransport(app=backend.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60)
+
+
+def test_concurrent_threads_keep_their_own_state(sessions):
+    store = sessions(max_concurrent_runs=4, acquire_timeout=60)
+    threads = 20
+
+    async def main():
+        async with _client() as client:
+            return await asyncio.gather(
+                *(_chat(client, f"t{i}", f"doc {i}") for i in range(threads))
+            )
+
+    start = time.perf_counter()
+    responses = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+
+    assert [r.status_code for r in responses] == [200] * threads
+    assert FakeLLM.peak <= 4
+    assert FakeLLM.calls == threads * (len(SCRIPT) + 1)
+    for i, response in enumerate(responses):
+        final = store.get(f"t{i}").state
+        assert final["stage"] == "done"
+        assert final["iteration"] == 2
+        assert final["document_draft"] == [
+            f"# doc {i}\n\nIntro",
+            "## Body\n\nRevision 5",
+        ]
+        # One snapshot, then deltas
+        events = _events(response)
+        assert sum(e["type"] == "STATE_SNAPSHOT" for e in events) == 1
+        assert any(e["type"] == "STATE_DELTA" for e in events)
+    # 4 at a time: about a quarter of running every LLM call back to back
+    assert elapsed < threads * (len(SCRIPT) + 1) * LLM_SECONDS
+    print(
+        f"\n{threads} threads, {FakeLLM.calls} LLM calls, peak {FakeLLM.peak}: {elapsed:.2f}s"
+    )
+
+
+def test_saturated_service_answers_429(sessions):
+    sessions(max_concurrent_runs=2, acquire_timeout=0.01)
+
+    async def main():
+        async with _client() as client:
+            return await asyncio.gather(
+                *(_chat(client, f"t{i}", "doc") for i in range(6))
+            )
+
+    responses = asyncio.run(main())
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses.count(200) >= 2
+    assert 429 in statuses
+    rejected = next(r for r in responses if r.status_code == 429)
+    assert rejected.headers["Retry-After"] == "5"
+    # The slots are free again once the runs finish
+    assert backend.sessions._runs._value == 2
+
+
+def test_state_carries_over_between_runs_of_a_thread(sessions):
+    store = sessions()
+
+    async def main():
+        async with _client() as client:
+            await _chat(client, "t", "first")
+            store.get("t").state["marker"] = "kept"
+            return await _chat(client, "t", "second")
+
+    response = asyncio.run(main())
+    first_snapshot = next(e for e in _events(response) if e["type"] == "STATE_SNAPSHOT")
+    assert first_snapshot["snapshot"]["marker"] == "kept"
+    assert store.get("t").state["document_draft"][0] == "# second\n\nIntro"
+
+
+def test_revisions_send_only_the_changed_section(sessions):
+    sessions()
+
+    async def main():
+        async with _client() as client:
+            return await _chat(client, "t", "doc")
+
+    events = _events(asyncio.run(main()))
+    edits = [
+        op
+        for e in events
+        if e["type"] == "STATE_DELTA"
+        for op in e["delta"]
+        if op["path"].startswith("/document_draft/")
+    ]
+    # Each revision replaces the Body section only
+    assert [op["op"] for op in edits] == ["replace", "replace"]
+    assert {op["path"] for op in edits} == {"/document_draft/1"}
+    assert edits[-1]["value"] == "## Body\n\nRevision 5"
+
+
+def test_least_recently_used_idle_threads_are_evicted(sessions):
+    store = sessions(max_threads=2)
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+    assert "b" not in store and "a" in store and "c" in store
+
+    store.idle_seconds = 0
+    store.get("d")
+    assert len(store) == 1 and "d" in store
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from typing import Annotated
 
 import httpx
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
@@ -15,72 +16,27 @@
 from autogen.ag_ui import AGUIStream
 from dotenv import load_dotenv
 
+from weather_client import WeatherClient
+
 load_dotenv()
 
 
-def get_weather_condition(code: int) -> str:
-    """Map WMO weather code to human-readable condition."""
-    conditions = {
-        0: "Clear sky",
-        1: "Mainly clear",
-        2: "Partly cloudy",
-        3: "Overcast",
-        45: "Foggy",
-        48: "Depositing rime fog",
-        51: "Light drizzle",
-        53: "Moderate drizzle",
-        55: "Dense drizzle",
-        61: "Slight rain",
-        63: "Moderate rain",
-        65: "Heavy rain",
-        71: "Slight snow",
-        73: "Moderate snow",
-        75: "Heavy snow",
-        80: "Slight rain showers",
-        81: "Moderate rain showers",
-        82: "Violent rain showers",
-        95: "Thunderstorm",
-        96: "Thunderstorm with slight hail",
-        99: "Thunderstorm with heavy hail",
-    }
-    return conditions.get(code, "Unknown")
+# Set by the app's lifespan, which owns its pooled HTTP client
+weather: WeatherClient | None = None
 
 
 async def get_weather(
     location: Annotated[str, "City name to get weather for"],
 ) -> dict[str, str | float]:
     """Get current weather for a location using the Open-Meteo API."""
-    async with httpx.AsyncClient() as client:
-        geocoding_url = (
-            f"https://geocoding-api.open-meteo.com/v1/search?name={location}&count=1"
-        )
-        geocoding_response = await client.get(geocoding_url)
-        geocoding_data = geocoding_response.json()
-
-        if not geocoding_data.get("results"):
-            return {"error": f"Location '{location}' not found"}
-
-        result = geocoding_data["results"][0]
-        lat, lon, name = result["latitude"], result["longitude"], result["name"]
-
-        weather_url = (
-            f"https://api.open-meteo.com/v1/forecast?"
-            f"latitude={lat}&longitude={lon}"
-            f"&current=temperature_2m,apparent_temperature,relative_humidity_2m,"
-            f"wind_speed_10m,wind_gusts_10m,weather_code"
-        )
-        weather_response = await client.get(weather_url)
-        current = weather_response.json()["current"]
-
-        return {
-            "temperature": current["temperature_2m"],
-            "feelsLike": current["apparent_temperature"],
-            "humidity": current["relative_humidity_2m"],
-            "windSpeed": current["wind_speed_10m"],
-            "windGust": current["wind_gusts_10m"],
-            "conditions": get_weather_condition(current["weather_code"]),
-            "location": name,
-        }
+    return await weather.weather(location)
+
+
+async def get_weather_many(
+    locations: Annotated[list[str], "City names to get weather for"],
+) -> dict[str, list[dict[str, str | float]]]:
+    """Get current weather for several locations at once using the Open-Meteo API."""
+    return {"cities": await weather.weather_many(locations)}
 
 
 agent = ConversableAgent(
@@ -90,14 +46,28 @@ async def get_weather(
         "building production-ready multi-agent AI systems. You're knowledgeable about "
         "AG2, AI agents, and Python programming. Be concise, helpful, and friendly. "
         "When showing code, use markdown code blocks with language tags. "
-        "You can also check the weather for any city using the get_weather tool."
+        "You can also check the weather for any city using the get_weather tool, "
+        "or for several cities in one call using the get_weather_many tool."
     ),
     llm_config=LLMConfig({"model": "gpt-5-mini", "stream": True}),
-    functions=[get_weather],
+    functions=[get_weather, get_weather_many],
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global weather
+    async with httpx.AsyncClient(
+        timeout=10,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    ) as http:
+        weather = WeatherClient(http)
+        yield
+        weather = None
+
+
 stream = AGUIStream(agent)
-agentic_chat_app = FastAPI()
+agentic_chat_app = FastAPI(lifespan=lifespan)
 
 agentic_chat_app.add_middleware(
     CORSMiddleware,
@@ -117,6 +87,12 @@ async def serve_frontend():
     return FileResponse(Path(__file__).parent / "frontend.html")
 
 
+@agentic_chat_app.get("/metrics")
+async def metrics():
+    """Weather lookup latencies in the Prometheus text format."""
+    return PlainTextResponse(weather.latency.render() if weather else "")
+
+
 if __name__ == "__main__":
     import uvicorn
 
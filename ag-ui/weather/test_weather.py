@@ -0,0 +1,165 @@
+"""Tests for the weather client against a local stub of the Open-Meteo endpoints."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from weather_client import WeatherClient
+
+UPSTREAM_SECONDS = 0.1
+
+CITIES = {
+    "tokyo": {"name": "Tokyo", "latitude": 35.6895, "longitude": 139.69171},
+    "paris": {"name": "Paris", "latitude": 48.85341, "longitude": 2.3488},
+    "paris 1er": {"name": "Paris 1er", "latitude": 48.8534, "longitude": 2.3490},
+    "oslo": {"name": "Oslo", "latitude": 59.91273, "longitude": 10.74609},
+}
+
+
+def make_stub():
+    """Open-Meteo geocoding and forecast endpoints, counting requests."""
+    stub = FastAPI()
+    stub.state.requests = {"geocode": 0, "forecast": 0}
+
+    @stub.get("/v1/search")
+    async def search(name: str, count: int = 1):
+        stub.state.requests["geocode"] += 1
+        await asyncio.sleep(UPSTREAM_SECONDS)
+        city = CITIES.get(name.lower())
+        return {"results": [city]} if city else {"generationtime_ms": 0.1}
+
+    @stub.get("/v1/forecast")
+    async def forecast(latitude: float, longitude: float, current: str):
+        stub.state.requests["forecast"] += 1
+        await asyncio.sleep(UPSTREAM_SECONDS)
+        assert "weather_code" in current
+        return {
+            "current": {
+                "temperature_2m": round(latitude / 10, 1),
+                "apparent_temperature": 1.0,
+                "relative_humidity_2m": 50,
+                "wind_speed_10m": 3.0,
+                "wind_gusts_10m": 6.0,
+                "weather_code": 3,
+            }
+        }
+
+    return stub
+
+
+@pytest.fixture
+def stub():
+    return make_stub()
+
+
+def run(stub, tmp_path, coroutine_fn, **kwargs):
+    async def main():
+        transport = httpx.ASGITransport(app=stub)
+        async with httpx.AsyncClient(transport=transport) as http:
+            client = WeatherClient(
+                http,
+                geocode_cache_file=tmp_path / "geocode.json",
+                geocoding_url="http://geocoding.stub/v1/search",
+                forecast_url="http://forecast.stub/v1/forecast",
+                **kwargs,
+            )
+            return client, await coroutine_fn(client)
+
+    return asyncio.run(main())
+
+
+def test_repeated_city_is_served_from_the_caches(stub, tmp_path):
+    async def calls(client):
+        first = await client.weather("Tokyo")
+        second = await client.weather("  tokyo ")
+        return first, second
+
+    client, (first, second) = run(stub, tmp_path, calls)
+    assert first == second
+    assert first["location"] == "Tokyo"
+    assert first["temperature"] == 3.6
+    assert first["conditions"] == "Overcast"
+    assert stub.state.requests == {"geocode": 1, "forecast": 1}
+    assert client.latency.count(operation="forecast", cache="hit") == 1
+
+
+def test_geocode_cache_survives_a_restart(stub, tmp_path):
+    run(stub, tmp_path, lambda client: client.weather("Oslo"))
+    run(stub, tmp_path, lambda client: client.weather("Oslo"))
+    # The second client only asked for the forecast
+    assert stub.state.requests == {"geocode": 1, "forecast": 2}
+
+
+def test_forecast_expires_after_its_ttl(stub, tmp_path):
+    async def calls(client):
+        await client.weather("Oslo")
+        await asyncio.sleep(0.05)
+        await client.weather("Oslo")
+
+    run(stub, tmp_path, calls, forecast_ttl=0.01)
+    assert stub.state.requests == {"geocode": 1, "forecast": 2}
+
+
+def test_nearby_places_share_a_forecast_bucket(stub, tmp_path):
+    async def calls(client):
+        return await client.weather("Paris"), await client.weather("Paris 1er")
+
+    _, (paris, first) = run(stub, tmp_path, calls)
+    assert paris["temperature"] == first["temperature"]
+    assert first["location"] == "Paris 1er"
+    assert stub.state.requests == {"geocode": 2, "forecast": 1}
+
+
+def test_many_cities_are_resolved_concurrently(stub, tmp_path):
+    start = time.perf_counter()
+    _, results = run(
+        stub,
+        tmp_path,
+        lambda client: client.weather_many(["Tokyo", "Atlantis", "Paris", "Oslo"]),
+    )
+    elapsed = time.perf_counter() - start
+
+    assert [r.get("location") for r in results] == ["Tokyo", None, "Paris", "Oslo"]
+    assert results[1] == {"error": "Location 'Atlantis' not found"}
+    # Geocode then forecast, all cities at once: about two upstream round trips
+    assert elapsed < 4 * UPSTREAM_SECONDS
+
+
+def test_concurrent_lookups_share_upstream_requests(stub, tmp_path):
+    run(stub, tmp_path, lambda client: client.weather_many(["Tokyo"] * 5))
+    assert stub.state.requests == {"geocode": 1, "forecast": 1}
+
+
+def test_upstream_errors_are_reported_per_city(tmp_path):
+    broken = FastAPI()
+
+    @broken.get("/v1/search")
+    async def search(name: str, count: int = 1):
+        return {"results": [CITIES["oslo"]]}
+
+    @broken.get("/v1/forecast")
+    async def forecast():
+        return Response(status_code=503)
+
+    _, result = run(broken, tmp_path, lambda client: client.weather("Oslo"))
+    assert "Weather service unavailable for 'Oslo'" in result["error"]
+
+
+def test_metrics_endpoint(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    import backend
+
+    with TestClient(backend.agentic_chat_app) as client:
+        backend.weather.latency.observe(0.02, operation="get_weather")
+        text = client.get("/metrics").text
+    assert "# TYPE weather_latency_seconds histogram" in text
+    assert (
+        'weather_latency_seconds_bucket{operation="get_weather",le="0.025"} 1' in text
+    )
+    assert 'weather_latency_seconds_count{operation="get_weather"} 1' in text
+    # The lifespan closed the shared client
+    assert backend.weather is None
@@ -0,0 +1,248 @@
+"""Open-Meteo client for the weather tool, with caching and latency metrics.
+
+- One pooled httpx.AsyncClient is shared by every call; the app's lifespan
+  opens and closes it.
+- City -> coordinates lookups never change, so they are cached in a JSON file
+  that survives restarts.
+- Current weather is cached for FORECAST_TTL seconds per lat/lon bucket
+  (rounded to LATLON_DECIMALS decimals), so nearby or repeated cities share
+  one forecast request.
+- Concurrent requests for the same city or bucket share one upstream request.
+- Latencies are recorded per operation as a Prometheus histogram, served by
+  the backend at /metrics.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+GEOCODE_CACHE_FILE = Path(__file__).parent / "geocode_cache.json"
+# Open-Meteo refreshes current conditions every 15 minutes
+FORECAST_TTL = 10 * 60
+LATLON_DECIMALS = 2
+CURRENT_FIELDS = (
+    "temperature_2m,apparent_temperature,relative_humidity_2m,"
+    "wind_speed_10m,wind_gusts_10m,weather_code"
+)
+
+WEATHER_CONDITIONS = {
+    0: "Clear sky",
+    1: "Mainly clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Foggy",
+    48: "Depositing rime fog",
+    51: "Light drizzle",
+    53: "Moderate drizzle",
+    55: "Dense drizzle",
+    61: "Slight rain",
+    63: "Moderate rain",
+    65: "Heavy rain",
+    71: "Slight snow",
+    73: "Moderate snow",
+    75: "Heavy snow",
+    80: "Slight rain showers",
+    81: "Moderate rain showers",
+    82: "Violent rain showers",
+    95: "Thunderstorm",
+    96: "Thunderstorm with slight hail",
+    99: "Thunderstorm with heavy hail",
+}
+
+
+def get_weather_condition(code: int) -> str:
+    """Map WMO weather code to human-readable condition."""
+    return WEATHER_CONDITIONS.get(code, "Unknown")
+
+
+class LatencyMetric:
+    """Histogram of latencies in seconds, rendered in the Prometheus text format."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        # labels -> [bucket counts..., sum, count]
+        self._series: dict[tuple[tuple[str, str], ...], list[float]] = {}
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._series.setdefault(key, [0] * (len(self.BUCKETS) + 2))
+        for i, bound in enumerate(self.BUCKETS):
+            if seconds <= bound:
+                series[i] += 1
+        series[-2] += seconds
+        series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Times the block; labels can be changed inside it (e.g. cache hit or miss)."""
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(sorted(labels.items())))
+        return int(series[-1]) if series else 0
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in key)
+            for bound, count in zip(self.BUCKETS, series):
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {int(count)}'
+                )
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {int(series[-1])}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {int(series[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+class WeatherClient:
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        geocode_cache_file: Path = GEOCODE_CACHE_FILE,
+        forecast_ttl: float = FORECAST_TTL,
+        geocoding_url: str = GEOCODING_URL,
+        forecast_url: str = FORECAST_URL,
+    ):
+        self.http = http
+        self.geocode_cache_file = Path(geocode_cache_file)
+        self.forecast_ttl = forecast_ttl
+        self.geocoding_url = geocoding_url
+        self.forecast_url = forecast_url
+        self.latency = LatencyMetric(
+            "weather_latency_seconds",
+            "Latency of weather lookups by operation and cache result",
+        )
+        self._places: dict[str, dict[str, Any]] = self._load_places()
+        self._forecasts: dict[tuple[float, float], tuple[float, dict[str, Any]]] = {}
+        self._inflight: dict[Any, asyncio.Future] = {}
+
+    # -------------- Shared in-flight requests --------------
+    async def _once(self, key: Any, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs fetch(), unless a call for the same key is in flight: then waits for it."""
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters get the error; don't warn if nobody was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    # -------------- Geocoding --------------
+    def _load_places(self) -> dict[str, dict[str, Any]]:
+        try:
+            return json.loads(self.geocode_cache_file.read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_places(self) -> None:
+        tmp = self.geocode_cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._places, indent=2, sort_keys=True))
+        os.replace(tmp, self.geocode_cache_file)
+
+    async def geocode(self, location: str) -> dict[str, Any] | None:
+        """{"name", "latitude", "longitude"} for the city, or None if unknown."""
+        key = " ".join(location.lower().split())
+        with self.latency.time(operation="geocode", cache="hit") as labels:
+            if key in self._places:
+                return self._places[key]
+            labels["cache"] = "miss"
+            return await self._once(
+                ("geocode", key), lambda: self._fetch_place(key, location)
+            )
+
+    async def _fetch_place(self, key: str, location: str) -> dict[str, Any] | None:
+        response = await self.http.get(
+            self.geocoding_url, params={"name": location, "count": 1}
+        )
+        response.raise_for_status()
+        results = response.json().get("results")
+        if not results:
+            # Not cached: a typo today may be a known city for a retry
+            return None
+        result = results[0]
+        place = {
+            "name": result["name"],
+            "latitude": result["latitude"],
+            "longitude": result["longitude"],
+        }
+        self._places[key] = place
+        self._save_places()
+        return place
+
+    # -------------- Forecast --------------
+    async def current(self, latitude: float, longitude: float) -> dict[str, Any]:
+        """Current conditions for the lat/lon bucket, cached for forecast_ttl seconds."""
+        bucket = (round(latitude, LATLON_DECIMALS), round(longitude, LATLON_DECIMALS))
+        with self.latency.time(operation="forecast", cache="hit") as labels:
+            cached = self._forecasts.get(bucket)
+            if cached and time.monotonic() - cached[0] < self.forecast_ttl:
+                return cached[1]
+            labels["cache"] = "miss"
+            return await self._once(
+                ("forecast", bucket), lambda: self._fetch_current(bucket)
+            )
+
+    async def _fetch_current(self, bucket: tuple[float, float]) -> dict[str, Any]:
+        response = await self.http.get(
+            self.forecast_url,
+            params={
+                "latitude": bucket[0],
+                "longitude": bucket[1],
+                "current": CURRENT_FIELDS,
+            },
+        )
+        response.raise_for_status()
+        current = response.json()["current"]
+        self._forecasts[bucket] = (time.monotonic(), current)
+        return current
+
+    # -------------- Tool results --------------
+    async def weather(self, location: str) -> dict[str, str | float]:
+        with self.latency.time(operation="get_weather"):
+            try:
+                place = await self.geocode(location)
+                if place is None:
+                    return {"error": f"Location '{location}' not found"}
+                current = await self.current(place["latitude"], place["longitude"])
+            except httpx.HTTPError as e:
+                return {"error": f"Weather service unavailable for '{location}': {e}"}
+            return {
+                "temperature": current["temperature_2m"],
+                "feelsLike": current["apparent_temperature"],
+                "humidity": current["relative_humidity_2m"],
+                "windSpeed": current["wind_speed_10m"],
+                "windGust": current["wind_gusts_10m"],
+                "conditions": get_weather_condition(current["weather_code"]),
+                "location": place["name"],
+            }
+
+    async def weather_many(self, locations: list[str]) -> list[dict[str, str | float]]:
+        """Weather for every location, looked up concurrently, in the given order."""
+        return list(
+            await asyncio.gather(*(self.weather(location) for location in locations))
+        )
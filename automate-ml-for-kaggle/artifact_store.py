@@ -0,0 +1,215 @@
+"""
+Store of processed train/test splits, reused across runs of the workflow.
+
+An artifact is keyed by a fingerprint of the raw dataset (its contents) and of
+the processing code that produced it. The splits are saved as Parquet files in
+coding/artifacts/<key>/, and index.json records each artifact's fingerprints,
+processing code, size and last use. When the store grows past its size cap,
+the least recently used artifacts are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable
+
+ARTIFACT_DIR = Path("coding") / "artifacts"
+MAX_STORE_BYTES = 1024**3
+SPLIT_FILES = ["X_train", "X_test", "y_train", "y_test"]
+INDEX_FILE = "index.json"
+
+# Runs in the notebook kernel to save the split as Parquet into {directory}
+EXPORT_SPLIT = """
+import numpy as _np
+import pandas as _pd
+
+def _to_frame(_value):
+    if isinstance(_value, _pd.DataFrame):
+        _frame = _value
+    elif isinstance(_value, _pd.Series):
+        _frame = _value.to_frame()
+    else:
+        _frame = _pd.DataFrame(_np.asarray(_value))
+    _frame = _frame.copy()
+    _frame.columns = [str(_c) for _c in _frame.columns]
+    return _frame
+
+for _name in {names!r}:
+    _to_frame(globals()[_name]).to_parquet(f"{directory}/{{_name}}.parquet")
+"""
+
+# Runs in the notebook kernel to load a cached split from {directory}
+LOAD_SPLIT = """
+import pandas as _pd
+
+X_train = _pd.read_parquet("{directory}/X_train.parquet")
+X_test = _pd.read_parquet("{directory}/X_test.parquet")
+y_train = _pd.read_parquet("{directory}/y_train.parquet").squeeze("columns")
+y_test = _pd.read_parquet("{directory}/y_test.parquet").squeeze("columns")
+print(f"Loaded cached split: X_train {{X_train.shape}}, X_test {{X_test.shape}}")
+"""
+
+
+def code_fingerprint(code_blocks: list[str]) -> str:
+    code = "\n\n".join(block.strip() for block in code_blocks)
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+@dataclass
+class Artifact:
+    key: str
+    dataset: str
+    dataset_fingerprint: str
+    code_fingerprint: str
+    code: list[str]
+    bytes: int = 0
+    created: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+
+
+class ArtifactStore:
+    def __init__(self, root: Path = ARTIFACT_DIR, max_bytes: int = MAX_STORE_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    # -------------- Index --------------
+    def _load_index(self) -> dict:
+        try:
+            index = json.loads((self.root / INDEX_FILE).read_text())
+            return {
+                "artifacts": {k: Artifact(**a) for k, a in index["artifacts"].items()},
+                "datasets": index.get("datasets", {}),
+            }
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return {"artifacts": {}, "datasets": {}}
+
+    def _save_index(self) -> None:
+        tmp = self.root / f"{INDEX_FILE}.tmp"
+        tmp.write_text(
+            json.dumps(
+                {
+                    "artifacts": {
+                        k: asdict(a) for k, a in self._index["artifacts"].items()
+                    },
+                    "datasets": self._index["datasets"],
+                },
+                indent=2,
+            )
+        )
+        os.replace(tmp, self.root / INDEX_FILE)
+
+    def path(self, artifact: Artifact) -> Path:
+        return self.root / artifact.key
+
+    # -------------- Fingerprints --------------
+    def dataset_fingerprint(self, dataset: Path) -> str:
+        """Hash of the file contents, re-computed only when its size or mtime changes."""
+        stat = Path(dataset).stat()
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            known = self._index["datasets"].get(str(dataset))
+            if known and known["stamp"] == stamp:
+                return known["fingerprint"]
+
+        digest = hashlib.sha256()
+        with open(dataset, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fingerprint = digest.hexdigest()
+        with self._lock:
+            self._index["datasets"][str(dataset)] = {
+                "stamp": stamp,
+                "fingerprint": fingerprint,
+            }
+            self._save_index()
+        return fingerprint
+
+    # -------------- Artifacts --------------
+    def lookup(
+        self, dataset_fingerprint: str, code_fp: str | None = None
+    ) -> Artifact | None:
+        """The most recent artifact for the dataset (and processing code, if given)."""
+        with self._lock:
+            matches = [
+                a
+                for a in self._index["artifacts"].values()
+                if a.dataset_fingerprint == dataset_fingerprint
+                and (code_fp is None or a.code_fingerprint == code_fp)
+                and all(
+                    (self.path(a) / f"{name}.parquet").exists() for name in SPLIT_FILES
+                )
+            ]
+            if not matches:
+                return None
+            artifact = max(matches, key=lambda a: a.created)
+            artifact.last_used = time.time()
+            self._save_index()
+            return artifact
+
+    def put(
+        self,
+        dataset: Path,
+        code: list[str],
+        write: Callable[[Path], None],
+    ) -> Artifact:
+        """
+        Saves a new artifact. write(directory) must create the split files in
+        the directory; if it raises, nothing is stored.
+        """
+        dataset_fp = self.dataset_fingerprint(dataset)
+        code_fp = code_fingerprint(code)
+        key = hashlib.sha256(f"{dataset_fp}:{code_fp}".encode()).hexdigest()[:16]
+        staging = self.root / f".{key}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        try:
+            write(staging)
+            missing = [
+                n for n in SPLIT_FILES if not (staging / f"{n}.parquet").exists()
+            ]
+            if missing:
+                raise FileNotFoundError(f"Split files not written: {missing}")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        artifact = Artifact(
+            key=key,
+            dataset=str(dataset),
+            dataset_fingerprint=dataset_fp,
+            code_fingerprint=code_fp,
+            code=code,
+            bytes=sum(f.stat().st_size for f in staging.iterdir()),
+        )
+        with self._lock:
+            shutil.rmtree(self.root / key, ignore_errors=True)
+            os.replace(staging, self.root / key)
+            self._index["artifacts"][key] = artifact
+            self._evict(keep=key)
+            self._save_index()
+        return artifact
+
+    def _evict(self, keep: str) -> None:
+        """Drops least recently used artifacts until the store fits its cap."""
+        artifacts = self._index["artifacts"]
+        total = sum(a.bytes for a in artifacts.values())
+        for artifact in sorted(artifacts.values(), key=lambda a: a.last_used):
+            if total <= self.max_bytes:
+                break
+            if artifact.key == keep:
+                continue
+            shutil.rmtree(self.path(artifact), ignore_errors=True)
+            del artifacts[artifact.key]
+            total -= artifact.bytes
+            print(f"Evicted cached artifact {artifact.key} ({artifact.bytes:,} bytes)")
+
+    def total_bytes(self) -> int:
+        return sum(a.bytes for a in self._index["artifacts"].values())
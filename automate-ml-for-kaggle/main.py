@@ -1,6 +1,12 @@
+import os
+import time
+
 import autogen
 from autogen import OpenAIWrapper
-from utils import is_ready_for_train, count_train_trials
+from autogen.coding import CodeBlock
+from artifact_store import EXPORT_SPLIT, LOAD_SPLIT, SPLIT_FILES, ArtifactStore
+from trial_runner import TrialRunner
+from utils import WorkflowState, is_ready_for_train
 from pathlib import Path
 from autogen.coding.jupyter import LocalJupyterServer, JupyterCodeExecutor
 from autogen import LLMConfig
@@ -16,6 +22,16 @@
 #     "timeout": 120,
 # }
 
+# Trial-runner mode: the Model_Trainer proposes a batch of trials that run
+# concurrently on a pool of Jupyter kernels. Set to 0 to train one model per turn.
+TRIAL_KERNELS = min(4, os.cpu_count() or 1)
+TRIALS_PER_BATCH = 4
+
+# A cached processed split of the same dataset is reused whatever code produced
+# it. Set to a code fingerprint from coding/artifacts/index.json to only reuse
+# the split of that processing code.
+PROCESSING_CODE_FINGERPRINT: str | None = None
+
 llm_config = LLMConfig(
     {"api_type": "openai", "model": "gpt-5-nano"},
     cache_seed=42,
@@ -67,7 +83,7 @@
     name="Model_Trainer",
     llm_config=llm_config,
     system_message="""You are the model trainer. Given a dataset and a task, please write code to train one model for the task.
-Please split the train data into 30% test and 70% train. If it is already done, please use the existing split.
+Please split the train data into 30% test and 70% train, named `X_train`, `X_test`, `y_train` and `y_test`. If it is already done, please use the existing split.
 You don't need to repeat previous code snippets.
 Please reason about the choice of the model and select the one you think is the best for the task. For example, you can use models like but not limited to LinearRegression, RandomForestModel, GradientBoostingModel, CartModel, DistributedGradientBoostingModel, etc.
 Each time, based on previous results, you should try a different model, or a different set of hyperparameters if you think this current model can be improved. And then evaluate the model on the test split.
@@ -79,39 +95,90 @@
 """,
 )
 
+if TRIAL_KERNELS:
+    model_trainer.update_system_message(
+        f"""You are the model trainer. Given a dataset and a task, please propose a batch of {TRIALS_PER_BATCH} model trials for the task in one message.
+The trials run at the same time on separate Jupyter kernels that already hold the processed data as `X_train`, `X_test`, `y_train` and `y_test`.
+
+1. If these four variables do not exist yet in the notebook, first send one setup ```python block that creates them by splitting the processed data into 70% train and 30% test. Setup blocks run in the shared notebook before the trials.
+2. Then send one ```python block per trial. Each trial must be self-contained: import what it needs, train one model on `X_train`/`y_train`, and evaluate it on `X_test`/`y_test`.
+3. Each trial must end with exactly one line like:
+   print("TRIAL_RESULT", json.dumps({{"model": "<model and key hyperparameters>", "metric": "<metric name>", "score": <float>, "higher_is_better": <true or false>}}))
+   Use the same metric for all trials.
+
+Please reason about the choice of the models and select candidates you think are the best for the task, for example different models, or different hyperparameters for a promising model. For example, you can use models like but not limited to LinearRegression, RandomForestModel, GradientBoostingModel, CartModel, DistributedGradientBoostingModel, etc.
+Do not perform any hyperparameter tuning like grid search inside a trial.
+If a batch failed, fix the failing trials and send a new batch.
+
+If you are asked to never use particular models, please do not use them even if they are better.
+"""
+    )
+
 summarizer = autogen.AssistantAgent(
     name="Code_Summarizer",
     llm_config=llm_config,
     system_message="""You are the code summarizer. Given a machine learning task and previous code snippets, please integrate all error-free code into a single code snippet.
 Please also provide a brief summary of the data exploration, data processing, and model training steps, and conclude what model is the best for the task.
 You should give the full code to reproduce the data exploration, data processing, and model training steps, and show the results with different metrics.
+If a trial leaderboard is given, use the code of its best trial for the model training step and report the leaderboard.
 """,
 )
 
 output_dir = Path("coding")
 output_dir.mkdir(exist_ok=True)
 server = LocalJupyterServer()
+notebook = JupyterCodeExecutor(server, output_dir=output_dir)
 code_executor = autogen.UserProxyAgent(
     name="Code_Executor",
     system_message="Executor. Execute the code written by the Coder and report the result.",
     human_input_mode="NEVER",
     code_execution_config={
-        "executor": JupyterCodeExecutor(server, output_dir=output_dir),
+        "executor": notebook,
     },
 )
 
+trial_runner = TrialRunner(
+    shared_executor=notebook,
+    make_executor=lambda: JupyterCodeExecutor(
+        server, timeout=600, output_dir=output_dir
+    ),
+    kernels=TRIAL_KERNELS,
+    output_dir=output_dir,
+)
+trial_runner_agent = autogen.ConversableAgent(
+    name="Trial_Runner",
+    llm_config=False,
+    human_input_mode="NEVER",
+    code_execution_config=False,
+)
+trial_runner_agent.register_reply([autogen.Agent, None], trial_runner.reply)
+
 
 client = OpenAIWrapper(config_list=config_list)
+workflow_state = WorkflowState()
 
 
 def state_transition(last_speaker, groupchat):
-    messages = groupchat.messages
+    workflow_state.update(groupchat.messages)
 
     # init state
     if last_speaker is initializer:
+        # a cached split is already loaded: init -> train
+        if cached_artifact is not None:
+            return model_trainer
         # init -> explore
         return data_explorer
 
+    # in trial-runner mode, a batch of trials runs on the kernel pool
+    elif last_speaker is model_trainer and TRIAL_KERNELS:
+        return trial_runner_agent
+
+    elif last_speaker is trial_runner_agent:
+        # retry failed batches, otherwise the leaderboard goes to the summarizer
+        if workflow_state.last_error:
+            return model_trainer
+        return summarizer
+
     # these states contains two steps, we will always call code_executor after the first step
     elif last_speaker in [data_explorer, data_processer, model_trainer]:
         return code_executor
@@ -120,7 +187,7 @@ def state_transition(last_speaker, groupchat):
         last_second_speaker_name = groupchat.messages[-2]["name"]
 
         # if we get an error, we repeat the current state
-        if "exitcode: 1" in messages[-1]["content"]:
+        if workflow_state.last_error:
             return groupchat.agent_by_name(last_second_speaker_name)
 
         # explore state
@@ -129,12 +196,12 @@ def state_transition(last_speaker, groupchat):
 
         # process state
         elif last_second_speaker_name == "Data_Processer":
-            if is_ready_for_train(groupchat=groupchat, client=client):
+            if is_ready_for_train(workflow_state, client):
                 return model_trainer
             return data_explorer
 
         elif last_second_speaker_name == "Model_Trainer":
-            if count_train_trials(groupchat) < 2:
+            if workflow_state.train_trials < 2:
                 return model_trainer
             return summarizer
 
@@ -151,6 +218,7 @@ def state_transition(last_speaker, groupchat):
         model_trainer,
         summarizer,
         code_executor,
+        trial_runner_agent,
     ],
     messages=[],
     max_round=20,
@@ -159,8 +227,9 @@ def state_transition(last_speaker, groupchat):
 manager = autogen.GroupChatManager(groupchat=groupchat, llm_config=None)
 
 
-task_prompt = """Please help me to build a model predict the sales price for each house.
-- The dataset is downloaded to this location: `./house_prices_train.csv`.
+dataset = Path("house_prices_train.csv")
+task_prompt = f"""Please help me to build a model predict the sales price for each house.
+- The dataset is downloaded to this location: `./{dataset}`.
 - All code will be executed in a Jupyter notebook, where previous states are saved.
 """
 
@@ -172,7 +241,56 @@ def state_transition(last_speaker, groupchat):
 # """
 
 
-chat_result = initializer.initiate_chat(manager, message=task_prompt)
+def run_in_notebook(code):
+    return notebook.execute_code_blocks([CodeBlock(code=code, language="python")])
+
+
+def export_split(directory):
+    result = run_in_notebook(
+        EXPORT_SPLIT.format(names=SPLIT_FILES, directory=directory)
+    )
+    if result.exit_code != 0:
+        raise RuntimeError(result.output)
+
+
+# Reuse the processed split of an earlier run on the same dataset
+artifact_store = ArtifactStore(output_dir / "artifacts")
+cached_artifact = artifact_store.lookup(
+    artifact_store.dataset_fingerprint(dataset), PROCESSING_CODE_FINGERPRINT
+)
+if cached_artifact is not None:
+    directory = artifact_store.path(cached_artifact)
+    loaded = run_in_notebook(LOAD_SPLIT.format(directory=directory))
+    if loaded.exit_code == 0:
+        created = time.strftime(
+            "%Y-%m-%d %H:%M", time.localtime(cached_artifact.created)
+        )
+        print(
+            f"Using cached processed dataset {directory}, produced on {created} by "
+            f"processing code {cached_artifact.code_fingerprint[:12]}"
+        )
+        processing_code = "\n\n".join(cached_artifact.code)
+        task_prompt += f"""- The dataset has already been explored and processed in an earlier run. The processed split is loaded in the notebook as `X_train`, `X_test`, `y_train` and `y_test` (cached as Parquet files in `{directory}`). Skip exploration and processing and use it for training.
+- It was produced by this processing code:
+```python
+{processing_code}
+```
+"""
+    else:
+        cached_artifact = None
+
+try:
+    chat_result = initializer.initiate_chat(manager, message=task_prompt)
+    if cached_artifact is None and workflow_state.processing_code:
+        try:
+            artifact = artifact_store.put(
+                dataset, workflow_state.processing_code, export_split
+            )
+            print(f"Cached processed dataset in {artifact_store.path(artifact)}")
+        except Exception as e:
+            print(f"Could not cache the processed dataset: {e}")
+finally:
+    trial_runner.stop()
 
 
 if "```python" in chat_result.chat_history[-1]["content"]:
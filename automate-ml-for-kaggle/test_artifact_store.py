@@ -0,0 +1,95 @@
+"""Tests for the processed dataset artifact store."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from artifact_store import SPLIT_FILES, ArtifactStore, code_fingerprint
+
+
+def _writer(rows):
+    def write(directory):
+        for name in SPLIT_FILES:
+            pd.DataFrame({"x": range(rows)}).to_parquet(directory / f"{name}.parquet")
+
+    return write
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "train.csv"
+    path.write_text("a,y\n1,2\n3,4\n")
+    return path
+
+
+def test_lookup_by_dataset_fingerprint(tmp_path, dataset):
+    store = ArtifactStore(tmp_path / "artifacts")
+    artifact = store.put(dataset, ["df = df.dropna()"], _writer(10))
+
+    # A new process finds it through the index
+    store = ArtifactStore(tmp_path / "artifacts")
+    found = store.lookup(store.dataset_fingerprint(dataset))
+    assert found.key == artifact.key
+    assert found.code == ["df = df.dropna()"]
+    assert pd.read_parquet(store.path(found) / "X_train.parquet").shape == (10, 1)
+    assert (
+        store.lookup(store.dataset_fingerprint(dataset), code_fingerprint(["other"]))
+        is None
+    )
+
+
+def test_changed_dataset_does_not_match(tmp_path, dataset):
+    store = ArtifactStore(tmp_path / "artifacts")
+    store.put(dataset, ["df = df.dropna()"], _writer(10))
+    dataset.write_text("a,y\n1,2\n3,5\n")
+    assert store.lookup(store.dataset_fingerprint(dataset)) is None
+
+
+def test_fingerprint_is_cached_until_the_file_changes(tmp_path, dataset):
+    store = ArtifactStore(tmp_path / "artifacts")
+    first = store.dataset_fingerprint(dataset)
+    # Same size and mtime: the stored hash is trusted
+    stat = dataset.stat()
+    dataset.write_text("a,y\n9,9\n9,9\n")
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert store.dataset_fingerprint(dataset) == first
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert store.dataset_fingerprint(dataset) != first
+
+
+def test_same_code_replaces_the_artifact(tmp_path, dataset):
+    store = ArtifactStore(tmp_path / "artifacts")
+    first = store.put(dataset, ["  df = df.dropna()\n"], _writer(10))
+    second = store.put(dataset, ["df = df.dropna()"], _writer(20))
+    assert first.key == second.key
+    assert len(list((tmp_path / "artifacts").iterdir())) == 2  # index + one artifact
+
+
+def test_least_recently_used_is_evicted_over_the_cap(tmp_path, dataset):
+    store = ArtifactStore(tmp_path / "artifacts")
+    a = store.put(dataset, ["a"], _writer(1000))
+    store.max_bytes = a.bytes * 2 + 1
+    b = store.put(dataset, ["b"], _writer(1000))
+    # Using a makes b the least recently used
+    assert store.lookup(a.dataset_fingerprint, a.code_fingerprint).key == a.key
+    c = store.put(dataset, ["c"], _writer(1000))
+
+    keys = {x.key for x in (a, c)}
+    assert set(store._index["artifacts"]) == keys
+    assert not store.path(b).exists()
+    assert store.total_bytes() <= store.max_bytes
+
+
+def test_failed_write_stores_nothing(tmp_path, dataset):
+    store = ArtifactStore(tmp_path / "artifacts")
+
+    def fail(directory):
+        raise RuntimeError("NameError: X_train")
+
+    with pytest.raises(RuntimeError):
+        store.put(dataset, ["a"], fail)
+    with pytest.raises(FileNotFoundError):
+        store.put(dataset, ["a"], lambda directory: None)
+    assert store.lookup(store.dataset_fingerprint(dataset)) is None
+    assert [p.name for p in (tmp_path / "artifacts").iterdir()] == ["index.json"]
@@ -0,0 +1,111 @@
+"""Tests for the trial runner with fake kernels instead of Jupyter."""
+
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from trial_runner import TrialRunner, leaderboard
+
+TRIAL_SECONDS = 0.3
+
+
+class FakeKernel:
+    """Records the code it runs; a trial sleeps, then prints its TRIAL_RESULT."""
+
+    started = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        with FakeKernel.lock:
+            FakeKernel.started += 1
+        self.ran: list[str] = []
+
+    def execute_code_blocks(self, code_blocks):
+        code = code_blocks[0].code
+        self.ran.append(code)
+        if "1 / 0" in code:
+            return SimpleNamespace(exit_code=1, output="ERROR: ZeroDivisionError")
+        match = re.search(r"score=(\S+)", code)
+        if match is None:
+            return SimpleNamespace(exit_code=0, output="")
+        time.sleep(TRIAL_SECONDS)
+        result = {
+            "model": f"model {match.group(1)}",
+            "metric": "rmse",
+            "score": float(match.group(1)),
+            "higher_is_better": False,
+        }
+        return SimpleNamespace(
+            exit_code=0, output=f"TRIAL_RESULT {json.dumps(result)}\n"
+        )
+
+    def stop(self):
+        pass
+
+
+def _trial(score):
+    return f"```python\n# score={score}\nprint('TRIAL_RESULT', ...)\n```"
+
+
+def _runner(tmp_path, kernels=4):
+    FakeKernel.started = 0
+    shared = FakeKernel()
+    return shared, TrialRunner(shared, FakeKernel, kernels=kernels, output_dir=tmp_path)
+
+
+def test_batch_runs_concurrently_and_ranks_results(tmp_path):
+    shared, runner = _runner(tmp_path)
+    message = "```python\nX_train = ...\n```\n" + "\n".join(
+        _trial(s) for s in (3.0, 1.0, 2.0, 4.0)
+    )
+
+    start = time.perf_counter()
+    _, reply = runner.reply(None, [{"content": message}])
+    elapsed = time.perf_counter() - start
+
+    # Four trials on four kernels take about as long as one
+    assert elapsed < 2 * TRIAL_SECONDS
+    assert reply.startswith("exitcode: 0")
+    # Lower RMSE is better
+    assert [r.score for r in leaderboard(runner.results)] == [1.0, 2.0, 3.0, 4.0]
+    assert reply.index("| 1 | 2 | model 1.0 |") < reply.index("| 2 | 3 | model 2.0 |")
+    # The setup block ran in the shared notebook, then the split was saved there
+    assert shared.ran[0].strip() == "X_train = ..."
+    assert "_joblib.dump" in shared.ran[1]
+    assert json.loads((tmp_path / "leaderboard.json").read_text())[0]["score"] == 1.0
+
+
+def test_kernels_load_the_split_once_per_version(tmp_path):
+    shared, runner = _runner(tmp_path, kernels=2)
+    runner.reply(None, [{"content": "\n".join(_trial(s) for s in (1, 2, 3, 4))}])
+    runner.reply(None, [{"content": "\n".join(_trial(s) for s in (5, 6))}])
+
+    assert FakeKernel.started == 3  # shared + 2 pool kernels
+    kernels = [runner._pool.get_nowait() for _ in range(2)]
+    for kernel in kernels:
+        loads = [code for code in kernel.ran if "_joblib.load" in code]
+        # Each batch saves a new split version, loaded once per kernel
+        assert len(loads) <= 2
+        assert sum("score=" in code for code in kernel.ran) >= 1
+    assert sum("score=" in code for k in kernels for code in k.ran) == 6
+
+
+def test_failed_trials_are_reported_but_not_ranked(tmp_path):
+    _, runner = _runner(tmp_path)
+    message = _trial(2.0) + "\n```python\nprint('TRIAL_RESULT', 1 / 0)\n```"
+    _, reply = runner.reply(None, [{"content": message}])
+    assert reply.startswith("exitcode: 0")
+    assert "Trial 2 failed (error)" in reply
+    assert len(leaderboard(runner.results)) == 1
+
+
+def test_batch_without_successful_trials_fails(tmp_path):
+    _, runner = _runner(tmp_path)
+    _, reply = runner.reply(
+        None, [{"content": "```python\nprint('TRIAL_RESULT', 1 / 0)\n```"}]
+    )
+    assert reply.startswith("exitcode: 1")
+    _, reply = runner.reply(None, [{"content": "No code here."}])
+    assert reply.startswith("exitcode: 1") and "No trials found" in reply
@@ -0,0 +1,111 @@
+"""Tests for the incremental workflow state and the bounded readiness check."""
+
+from utils import MAX_OUTPUT_CHARS, WorkflowState, is_ready_for_train
+
+
+class CountingMessage(dict):
+    """A group chat message that counts how often it is read."""
+
+    reads = 0
+
+    def get(self, key, default=None):
+        CountingMessage.reads += 1
+        return super().get(key, default)
+
+
+class FakeClient:
+    """Stands in for OpenAIWrapper; records the size of every prompt."""
+
+    def __init__(self, decision="Need more processing"):
+        self.decision = decision
+        self.prompt_chars = []
+
+    def create(self, messages):
+        self.prompt_chars.append(sum(len(m["content"]) for m in messages))
+        return f"Summary: {len(self.prompt_chars)} checks so far.\nDecision: {self.decision}"
+
+    def extract_text_or_completion_object(self, response):
+        return [response]
+
+
+def _conversation(turns):
+    """Init, then explorer/processer/trainer steps each followed by executor output."""
+    yield CountingMessage(name="Init", content="Predict house prices.")
+    speakers = ["Data_Explorer", "Data_Processer", "Model_Trainer"]
+    for turn in range(turns):
+        speaker = speakers[turn % 3]
+        yield CountingMessage(name=speaker, content=f"```python\nstep_{turn}()\n```")
+        failed = turn % 7 == 0
+        output = f"exitcode: {int(failed)} (execution {'failed' if failed else 'succeeded'})\n"
+        yield CountingMessage(name="Code_Executor", content=output + "x" * 5000)
+
+
+def _rescan_trials(messages):
+    """The full-history count the tracker replaces."""
+    count = 0
+    for i, message in enumerate(messages):
+        if message["name"] == "Model_Trainer":
+            count += 1
+        elif (
+            message["name"] == "Code_Executor"
+            and "exitcode: 1" in message["content"]
+            and messages[i - 1]["name"] == "Model_Trainer"
+        ):
+            count -= 1
+    return count
+
+
+def test_trial_count_and_errors_match_a_full_rescan():
+    state = WorkflowState()
+    messages = []
+    for message in _conversation(150):
+        messages.append(message)
+        state.update(messages)
+        assert state.train_trials == _rescan_trials(messages)
+        if message["name"] == "Code_Executor":
+            assert state.last_error == ("exitcode: 1" in message["content"])
+
+
+def test_constant_per_turn_overhead_at_500_messages():
+    state = WorkflowState()
+    client = FakeClient()
+    messages = []
+    reads_per_turn = []
+    for message in _conversation(250):
+        messages.append(message)
+        CountingMessage.reads = 0
+        state.update(messages)
+        reads_per_turn.append(CountingMessage.reads)
+        if (
+            message["name"] == "Code_Executor"
+            and messages[-2]["name"] == "Data_Processer"
+        ):
+            is_ready_for_train(state, client)
+
+    assert len(messages) > 500
+    # Each turn only reads the message that arrived
+    assert max(reads_per_turn) == 2
+    # The readiness prompt stops growing once the recent-output window is full
+    assert len(client.prompt_chars) > 80
+    steady = client.prompt_chars[state.executor_outputs.maxlen :]
+    assert max(steady) - min(steady) < 10
+    assert (
+        max(client.prompt_chars)
+        < (state.executor_outputs.maxlen + 2) * MAX_OUTPUT_CHARS
+    )
+
+
+def test_readiness_check_carries_the_rolling_summary():
+    state = WorkflowState()
+    client = FakeClient(decision="Ready for training")
+    state.update(list(_conversation(2)))
+    assert is_ready_for_train(state, client)
+    assert state.summary == "1 checks so far."
+
+
+def test_reset_group_chat_starts_over():
+    state = WorkflowState()
+    state.update(list(_conversation(6)))
+    state.update(list(_conversation(1)))
+    assert state.seen == 3
+    assert state.train_trials == 0
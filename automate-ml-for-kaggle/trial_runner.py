@@ -0,0 +1,236 @@
+"""
+Runs a batch of model trials concurrently on a pool of Jupyter kernels.
+
+The Model_Trainer sends one message with several ```python blocks:
+
+- setup blocks (no TRIAL_RESULT line) run first, in the shared notebook kernel,
+  e.g. to create the train/test split
+- every other block is one trial; it ends by printing
+  TRIAL_RESULT {"model": ..., "metric": ..., "score": ..., "higher_is_better": ...}
+
+The split (X_train, X_test, y_train, y_test) is saved once from the shared
+kernel with joblib, and each pool kernel loads it once per version instead of
+re-running the preprocessing. The trials are then spread over the pool, and the
+results are ranked into a leaderboard for the Code_Summarizer.
+"""
+
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from autogen.coding import CodeBlock, MarkdownCodeExtractor
+
+SPLIT_VARIABLES = ["X_train", "X_test", "y_train", "y_test"]
+TRIAL_RESULT_RE = re.compile(r"^TRIAL_RESULT\s+(\{.*\})\s*$", re.MULTILINE)
+# How many of the best trials have their code passed to the summarizer
+TOP_K = 3
+MAX_OUTPUT_CHARS = 1500
+
+PERSIST_SPLIT = """
+import joblib as _joblib
+_missing = [_name for _name in {names!r} if _name not in globals()]
+if _missing:
+    raise NameError(f"Create {{_missing}} before proposing trials")
+_joblib.dump({{_name: globals()[_name] for _name in {names!r}}}, {path!r})
+"""
+
+LOAD_SPLIT = """
+import joblib as _joblib
+globals().update(_joblib.load({path!r}))
+"""
+
+
+@dataclass
+class TrialResult:
+    trial: int
+    code: str
+    exit_code: int
+    seconds: float
+    output: str
+    model: str = ""
+    metric: str = ""
+    score: float | None = None
+    higher_is_better: bool = True
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0 and self.score is not None
+
+
+def is_trial(code: str) -> bool:
+    return "TRIAL_RESULT" in code
+
+
+def parse_trial_result(result: TrialResult) -> TrialResult:
+    matches = TRIAL_RESULT_RE.findall(result.output)
+    if not matches:
+        return result
+    try:
+        reported = json.loads(matches[-1])
+        result.model = str(reported.get("model", ""))
+        result.metric = str(reported.get("metric", ""))
+        result.score = float(reported["score"])
+        result.higher_is_better = bool(reported.get("higher_is_better", True))
+    except (ValueError, KeyError, TypeError):
+        pass
+    return result
+
+
+def leaderboard(results: list[TrialResult]) -> list[TrialResult]:
+    """Successful trials, best first. Trials are ranked by their own metric direction."""
+    ranked = [r for r in results if r.ok]
+    return sorted(ranked, key=lambda r: -r.score if r.higher_is_better else r.score)
+
+
+class TrialRunner:
+    """
+    A pool of Jupyter kernels for model trials. make_executor() returns a new
+    JupyterCodeExecutor (one kernel); shared_executor is the notebook the other
+    agents work in.
+    """
+
+    def __init__(self, shared_executor, make_executor, kernels: int, output_dir: Path):
+        self.shared_executor = shared_executor
+        self.output_dir = Path(output_dir)
+        self.split_path = self.output_dir / "trial_split.joblib"
+        self.leaderboard_path = self.output_dir / "leaderboard.json"
+        self._split_version = 0
+        # Kernels are started on first use and reused across batches
+        self._make_executor = make_executor
+        self._kernels = kernels
+        self._pool: queue.Queue = queue.Queue()
+        self._started = 0
+        self._start_lock = threading.Lock()
+        self._loaded: dict[int, int] = {}  # id(executor) -> split version loaded
+        self.results: list[TrialResult] = []
+
+    def _run(self, executor, code: str):
+        return executor.execute_code_blocks([CodeBlock(code=code, language="python")])
+
+    def persist_split(self) -> tuple[bool, str]:
+        result = self._run(
+            self.shared_executor,
+            PERSIST_SPLIT.format(names=SPLIT_VARIABLES, path=str(self.split_path)),
+        )
+        if result.exit_code == 0:
+            self._split_version += 1
+        return result.exit_code == 0, result.output
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            with self._start_lock:
+                start_kernel = self._started < self._kernels
+                self._started += start_kernel
+            if start_kernel:
+                return self._make_executor()
+            return self._pool.get()
+
+    def _run_trial(self, trial: int, code: str) -> TrialResult:
+        executor = self._acquire()
+        try:
+            start = time.perf_counter()
+            if self._loaded.get(id(executor)) != self._split_version:
+                loaded = self._run(
+                    executor, LOAD_SPLIT.format(path=str(self.split_path))
+                )
+                if loaded.exit_code != 0:
+                    return TrialResult(trial, code, 1, 0.0, loaded.output)
+                self._loaded[id(executor)] = self._split_version
+            result = self._run(executor, code)
+            seconds = time.perf_counter() - start
+        finally:
+            self._pool.put(executor)
+        return parse_trial_result(
+            TrialResult(trial, code, result.exit_code, seconds, result.output)
+        )
+
+    def run_batch(
+        self, setup: list[str], trials: list[str]
+    ) -> tuple[str, list[TrialResult]]:
+        """Returns an error message (empty on success) and the trial results."""
+        for code in setup:
+            result = self._run(self.shared_executor, code)
+            if result.exit_code != 0:
+                return f"Setup code failed:\n{result.output}", []
+        ok, output = self.persist_split()
+        if not ok:
+            return f"Could not save the train/test split:\n{output}", []
+
+        offset = len(self.results)
+        with ThreadPoolExecutor(max_workers=self._kernels) as pool:
+            results = list(
+                pool.map(
+                    self._run_trial,
+                    range(offset + 1, offset + len(trials) + 1),
+                    trials,
+                )
+            )
+        self.results.extend(results)
+        self.leaderboard_path.write_text(
+            json.dumps([asdict(r) for r in leaderboard(self.results)], indent=2)
+        )
+        return "", results
+
+    def stop(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().stop()
+
+    # -------------- Group chat agent --------------
+    def reply(self, recipient, messages=None, sender=None, config=None):
+        """Reply function for the Trial_Runner agent: runs the Model_Trainer's batch."""
+        blocks = MarkdownCodeExtractor().extract_code_blocks(messages[-1]["content"])
+        blocks = [b.code for b in blocks if b.language in ("python", "")]
+        setup = [code for code in blocks if not is_trial(code)]
+        trials = [code for code in blocks if is_trial(code)]
+        if not trials:
+            return True, (
+                "exitcode: 1 (execution failed)\nNo trials found. Send one ```python "
+                "block per trial, each printing a TRIAL_RESULT line."
+            )
+
+        start = time.perf_counter()
+        error, results = self.run_batch(setup, trials)
+        if error:
+            return True, f"exitcode: 1 (execution failed)\n{error[-MAX_OUTPUT_CHARS:]}"
+        elapsed = time.perf_counter() - start
+        return True, self.format_report(results, elapsed)
+
+    def format_report(self, results: list[TrialResult], elapsed: float) -> str:
+        ranked = leaderboard(self.results)
+        failed = [r for r in results if not r.ok]
+        exit_code = 0 if any(r.ok for r in results) else 1
+        lines = [
+            f"exitcode: {exit_code} (execution {'succeeded' if exit_code == 0 else 'failed'})",
+            f"Ran {len(results)} trials on {self._kernels} kernels in {elapsed:.1f}s "
+            f"(sum of trial times {sum(r.seconds for r in results):.1f}s).",
+            "",
+            "Leaderboard:",
+            "| Rank | Trial | Model | Metric | Score | Seconds |",
+            "| --- | --- | --- | --- | --- | --- |",
+        ]
+        for rank, r in enumerate(ranked, 1):
+            lines.append(
+                f"| {rank} | {r.trial} | {r.model} | {r.metric} | {r.score:.4f} | {r.seconds:.1f} |"
+            )
+        for r in ranked[:TOP_K]:
+            lines += [
+                "",
+                f"Trial {r.trial} ({r.model}) code:",
+                f"```python\n{r.code.strip()}\n```",
+                f"Output:\n{r.output[-MAX_OUTPUT_CHARS:]}",
+            ]
+        for r in failed:
+            reason = "no TRIAL_RESULT line" if r.exit_code == 0 else "error"
+            lines += [
+                "",
+                f"Trial {r.trial} failed ({reason}):",
+                r.output[-MAX_OUTPUT_CHARS:],
+            ]
+        return "\n".join(lines)
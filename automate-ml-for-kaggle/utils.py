@@ -1,19 +1,83 @@
-def is_ready_for_train(groupchat, client):
-    messages = (
-        [
-            {
-                "role": "system",
-                "content": """Based on the dataset exploration, and the data processing, please determine whether the data is ready for model training.
-Please give a short summary of what we know about the dataset and what we have done so far.
+import re
+from collections import deque
+
+READINESS_PROMPT = """Based on the dataset exploration, and the data processing, please determine whether the data is ready for model training.
+Please give a short summary of what we know about the dataset and what we have done so far. Keep it under 200 words.
 
 Please follow this format:
 Summary: <Your summary>
 Decision: <choose from "Ready for training" or "Need more processing">
-""",
-            }
-        ]
-        + groupchat.messages
+"""
+
+# The readiness check sees the task, its previous summary and the last few
+# executor outputs, so its prompt does not grow with the conversation
+RECENT_OUTPUTS = 4
+MAX_OUTPUT_CHARS = 2000
+MAX_SUMMARY_CHARS = 2000
+# Agents whose messages are code execution results
+EXECUTORS = ("Code_Executor", "Trial_Runner")
+CODE_BLOCK_RE = re.compile(r"```(?:python|py)?\n(.*?)```", re.DOTALL)
+
+
+class WorkflowState:
+    """
+    Tracks the workflow as messages arrive, so state_transition never rescans
+    groupchat.messages: each message is looked at once, in update().
+    """
+
+    def __init__(self, recent_outputs: int = RECENT_OUTPUTS):
+        self.seen = 0
+        self.task = ""
+        self.last_speaker = None
+        self.last_error = False
+        self.train_trials = 0
+        self.summary = ""
+        # Data_Processer code blocks that ran without errors, in order
+        self.processing_code = []
+        self._last_content = ""
+        # (speaker whose code was run, executor output)
+        self.executor_outputs = deque(maxlen=recent_outputs)
+
+    def update(self, messages):
+        if len(messages) < self.seen:
+            # The group chat was reset
+            self.__init__(self.executor_outputs.maxlen)
+        for message in messages[self.seen :]:
+            name = message.get("name")
+            content = message.get("content") or ""
+            if not self.seen:
+                self.task = content[:MAX_OUTPUT_CHARS]
+            if name == "Model_Trainer":
+                self.train_trials += 1
+            elif name in EXECUTORS:
+                self.last_error = "exitcode: 1" in content
+                # A failed training run does not count as a trial
+                if self.last_error and self.last_speaker == "Model_Trainer":
+                    self.train_trials -= 1
+                self.executor_outputs.append(
+                    (self.last_speaker, content[-MAX_OUTPUT_CHARS:])
+                )
+                if not self.last_error and self.last_speaker == "Data_Processer":
+                    self.processing_code += CODE_BLOCK_RE.findall(self._last_content)
+            self.last_speaker = name
+            self._last_content = content
+            self.seen += 1
+
+
+def is_ready_for_train(state, client):
+    outputs = "\n\n".join(
+        f"Output of {speaker}'s code:\n{output}"
+        for speaker, output in state.executor_outputs
     )
+    messages = [
+        {"role": "system", "content": READINESS_PROMPT},
+        {
+            "role": "user",
+            "content": f"Task:\n{state.task}\n\n"
+            f"Summary so far:\n{state.summary or 'None yet.'}\n\n"
+            f"Most recent results:\n{outputs}",
+        },
+    ]
 
     response = client.create(messages=messages)
     response_str = client.extract_text_or_completion_object(response)[0]
@@ -22,23 +86,11 @@ def is_ready_for_train(groupchat, client):
     print(response_str)
     print("-" * 50)
 
-    if "ready for training" in response_str.lower():
+    # Carried into the next check in place of the full history
+    summary = response_str.split("Decision:")[0].replace("Summary:", "").strip()
+    state.summary = summary[:MAX_SUMMARY_CHARS]
+
+    decision = response_str.split("Decision:")[-1]
+    if "ready for training" in decision.lower():
         return True
     return False
-
-
-def count_train_trials(groupchat):
-    messages = groupchat.messages
-
-    tcount = 0
-    for i, message in enumerate(messages):
-        if message["name"] == "Model_Trainer":
-            tcount += 1
-        elif (
-            message["name"] == "Code_Executor"
-            and "exitcode: 1" in message["content"]
-            and messages[i - 1]["name"] == "Model_Trainer"
-        ):
-            tcount -= 1
-
-    return tcount
@@ -2,8 +2,8 @@
 
 Listens to CaseMemory deltas and asks the commentator Agent for a
 one-liner each time something dramatic happens. The generated lines are
-published on an in-process queue that the frontend subscribes to via
-/commentary/stream.
+published on an in-process queue that ``EVENT_HUB`` forwards to the
+frontend over the multiplexed /events stream.
 """
 
 import asyncio
@@ -0,0 +1,193 @@
+"""Multiplexed spectator event stream.
+
+One ``EventHub`` per process fans notebook deltas, commentary lines and
+clock ticks out to every connected browser over a single ``/events``
+SSE stream. Each event is serialized into its SSE frame exactly once
+and the same string is queued for every subscriber, and a single timer
+task drives the clock for all of them.
+
+Frames carry a monotonically increasing ``id:`` so a reconnecting
+``EventSource`` (which sends ``Last-Event-ID``) only receives what it
+missed. If the gap is older than the replay buffer the client gets a
+fresh snapshot instead.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any
+
+from .clock import GAME_CLOCK
+from .commentary import CommentaryEngine
+from .memory import CASE_MEMORY, _to_plain
+
+KEEPALIVE_SECONDS = 15.0
+REPLAY_BUFFER_SIZE = 512
+SUBSCRIBER_QUEUE_SIZE = 256
+# Commentary replayed to new spectators; older lines are dropped
+COMMENTARY_HISTORY_SIZE = 100
+_KEEPALIVE_FRAME = ": keepalive\n\n"
+
+
+def _frame(event_id: str, kind: str, payload: Any) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n"
+
+
+class Subscriber:
+    """A single connected browser. ``closed`` is set when it falls behind."""
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+
+class EventHub:
+    def __init__(self, *, tick_seconds: float = 1.0) -> None:
+        self._tick_seconds = tick_seconds
+        # Ids are "<epoch>-<seq>" so ids from a previous server process are
+        # never mistaken for positions in this one's replay buffer.
+        self._epoch = str(int(time.time() * 1000))
+        self._seq = 0
+        self._buffer: deque[tuple[int, str]] = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._subs: set[Subscriber] = set()
+        self._last_tick: dict[str, Any] | None = None
+        self._tick_frame: str | None = None
+        self._snapshot: list[str] | None = None
+        self._commentary: deque[dict[str, Any]] = deque(maxlen=COMMENTARY_HISTORY_SIZE)
+        self._tasks: list[asyncio.Task] = []
+
+    # -- lifecycle -------------------------------------------------------
+
+    async def start(self, engine: CommentaryEngine | None) -> None:
+        CASE_MEMORY.subscribe(self._on_memory_change)
+        self._tasks.append(asyncio.create_task(self._ticker()))
+        if engine is not None:
+            self._tasks.append(asyncio.create_task(self._pump_commentary(engine)))
+
+    def stop(self) -> None:
+        CASE_MEMORY.unsubscribe(self._on_memory_change)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    # -- subscribers -----------------------------------------------------
+
+    def subscribe(self, last_event_id: str | None = None) -> Subscriber:
+        """Register a subscriber and pre-load what it needs to catch up."""
+        sub = Subscriber()
+        for frame in self._catch_up(last_event_id):
+            sub.queue.put_nowait(frame)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subs.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+    def _catch_up(self, last_event_id: str | None) -> list[str]:
+        resume_from = self._parse_event_id(last_event_id)
+        if (
+            resume_from is not None
+            and resume_from <= self._seq
+            and (not self._buffer or resume_from >= self._buffer[0][0] - 1)
+        ):
+            frames = [frame for eid, frame in self._buffer if eid > resume_from]
+        else:
+            frames = self._snapshot_frames()
+        if self._tick_frame is not None:
+            frames.append(self._tick_frame)
+        return frames[-SUBSCRIBER_QUEUE_SIZE:]
+
+    def _snapshot_frames(self) -> list[str]:
+        # Cached until the next publish, so a burst of (re)connecting
+        # spectators shares one serialization of the full notebook.
+        if self._snapshot is None:
+            notebook = {
+                "turns": [_to_plain(t) for t in CASE_MEMORY.interrogation_log],
+                "facts": [_to_plain(f) for f in CASE_MEMORY.verified_facts],
+            }
+            self._snapshot = [_frame(self._event_id(), "snapshot", notebook)]
+            if self._commentary:
+                self._snapshot.append(
+                    _frame(
+                        self._event_id(), "commentary_history", list(self._commentary)
+                    )
+                )
+        return list(self._snapshot)
+
+    # -- publishing ------------------------------------------------------
+
+    def publish(self, kind: str, payload: Any) -> None:
+        self._seq += 1
+        frame = _frame(self._event_id(), kind, payload)
+        self._buffer.append((self._seq, frame))
+        self._snapshot = None
+        self._broadcast(frame)
+
+    def _broadcast(self, frame: str) -> None:
+        for sub in list(self._subs):
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow consumer: drop it, the browser reconnects with
+                # Last-Event-ID and resumes from the replay buffer.
+                sub.closed = True
+                self._subs.discard(sub)
+
+    def _event_id(self) -> str:
+        return f"{self._epoch}-{self._seq}"
+
+    def _parse_event_id(self, value: str | None) -> int | None:
+        if not value:
+            return None
+        epoch, _, seq = value.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _on_memory_change(self, kind: str, payload: dict) -> None:
+        if kind == "snapshot":
+            # CaseMemory.reset(): a new game starts with no commentary.
+            self._commentary.clear()
+        self.publish(kind, payload)
+
+    async def _pump_commentary(self, engine: CommentaryEngine) -> None:
+        q = engine.subscribe()
+        try:
+            while True:
+                line = await q.get()
+                payload = {"timestamp": line.timestamp, "text": line.text}
+                self._commentary.append(payload)
+                self.publish("commentary", payload)
+        finally:
+            engine.unsubscribe(q)
+
+    async def _ticker(self) -> None:
+        # Ticks are not buffered: only the latest one matters, and it is
+        # handed to every new subscriber on connect.
+        idle = 0.0
+        while True:
+            payload = {
+                "remaining": GAME_CLOCK.remaining(),
+                "duration": GAME_CLOCK.duration,
+                "expired": GAME_CLOCK.expired,
+            }
+            if payload != self._last_tick:
+                self._last_tick = payload
+                self._tick_frame = _frame(self._event_id(), "tick", payload)
+                self._broadcast(self._tick_frame)
+                idle = 0.0
+            else:
+                idle += self._tick_seconds
+                if idle >= KEEPALIVE_SECONDS:
+                    self._broadcast(_KEEPALIVE_FRAME)
+                    idle = 0.0
+            await asyncio.sleep(self._tick_seconds)
+
+
+EVENT_HUB = EventHub()
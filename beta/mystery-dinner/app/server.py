@@ -1,7 +1,6 @@
 # ruff: noqa: E402
 # load_dotenv() must run before the autogen imports so provider-specific
 # clients (Gemini, OpenAI) see GEMINI_API_KEY / etc. at construction time.
-import asyncio
 import json
 from pathlib import Path
 
@@ -32,6 +31,7 @@
 from .clock import GAME_CLOCK
 from .commentary import CommentaryEngine, set_engine
 from .config import GAME_DURATION_SECONDS
+from .events import EVENT_HUB
 from .game_master import GAME_MASTER
 from .memory import CASE_MEMORY, _to_plain
 
@@ -61,10 +61,8 @@ def create_app() -> Starlette:
     routes.append(Route("/case", case_info))
     routes.append(Route("/suspects", suspects_info))
     routes.append(Route("/reset", reset_game, methods=["POST"]))
-    routes.append(Route("/notebook/stream", notebook_stream))
+    routes.append(Route("/events", events_stream))
     routes.append(Route("/notebook/snapshot", notebook_snapshot))
-    routes.append(Route("/commentary/stream", commentary_stream))
-    routes.append(Route("/clock/stream", clock_stream))
     routes.append(
         Mount("/images", app=StaticFiles(directory=IMAGES_DIR), name="images")
     )
@@ -75,9 +73,11 @@ def create_app() -> Starlette:
     @asynccontextmanager
     async def lifespan(app):
         await engine.start()
+        await EVENT_HUB.start(engine)
         try:
             yield
         finally:
+            EVENT_HUB.stop()
             engine.stop()
 
     return Starlette(routes=routes, lifespan=lifespan)
@@ -121,84 +121,27 @@ async def one():
     return StreamingResponse(one(), media_type="application/json")
 
 
-async def notebook_stream(request: Request) -> StreamingResponse:
-    queue: asyncio.Queue = asyncio.Queue()
+async def events_stream(request: Request) -> StreamingResponse:
+    """Single SSE stream carrying notebook, commentary and clock events.
 
-    def on_change(kind: str, payload: dict) -> None:
-        queue.put_nowait((kind, payload))
-
-    CASE_MEMORY.subscribe(on_change)
-
-    async def gen():
-        try:
-            snapshot = {
-                "turns": [_to_plain(t) for t in CASE_MEMORY.interrogation_log],
-                "facts": [_to_plain(f) for f in CASE_MEMORY.verified_facts],
-            }
-            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
-            while True:
-                if await request.is_disconnected():
-                    break
-                try:
-                    kind, payload = await asyncio.wait_for(queue.get(), timeout=15.0)
-                except asyncio.TimeoutError:
-                    yield ": keepalive\n\n"
-                    continue
-                yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
-        finally:
-            CASE_MEMORY.unsubscribe(on_change)
-
-    return StreamingResponse(gen(), media_type="text/event-stream")
-
-
-async def commentary_stream(request: Request) -> StreamingResponse:
-    from .commentary import get_engine
-
-    engine = get_engine()
-    if engine is None:
-
-        async def empty():
-            yield "event: error\ndata: no engine\n\n"
-
-        return StreamingResponse(empty(), media_type="text/event-stream")
-
-    q = engine.subscribe()
+    Frames are pre-serialized by ``EVENT_HUB``; this handler only drains
+    the subscriber's queue. Starlette cancels the generator when the
+    client disconnects, so no per-connection polling is needed.
+    """
+    sub = EVENT_HUB.subscribe(request.headers.get("last-event-id"))
 
     async def gen():
         try:
-            while True:
-                if await request.is_disconnected():
-                    break
-                try:
-                    line = await asyncio.wait_for(q.get(), timeout=15.0)
-                except asyncio.TimeoutError:
-                    yield ": keepalive\n\n"
-                    continue
-                payload = {"timestamp": line.timestamp, "text": line.text}
-                yield f"event: commentary\ndata: {json.dumps(payload)}\n\n"
+            while not (sub.closed and sub.queue.empty()):
+                yield await sub.queue.get()
         finally:
-            engine.unsubscribe(q)
+            EVENT_HUB.unsubscribe(sub)
 
-    return StreamingResponse(gen(), media_type="text/event-stream")
-
-
-async def clock_stream(request: Request) -> StreamingResponse:
-    async def gen():
-        while True:
-            if await request.is_disconnected():
-                break
-            rem = GAME_CLOCK.remaining()
-            payload = {
-                "remaining": rem,
-                "duration": GAME_CLOCK.duration,
-                "expired": GAME_CLOCK.expired,
-            }
-            yield f"event: tick\ndata: {json.dumps(payload)}\n\n"
-            if rem <= 0:
-                break
-            await asyncio.sleep(1.0)
-
-    return StreamingResponse(gen(), media_type="text/event-stream")
+    return StreamingResponse(
+        gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 app = create_app()
@@ -89,6 +89,7 @@ async function submitDirective(text) {
   threadId = crypto.randomUUID();
   streamEl.innerHTML = "";
   commentaryListEl.innerHTML = '<li class="muted">Awaiting first forced-truth…</li>';
+  commentaryEmpty = true;
 
   showView("game");
 
@@ -469,28 +470,10 @@ function fmtElapsed(sec) {
 function scrollStream() { streamEl.scrollTop = streamEl.scrollHeight; }
 function truncate(s, n) { return s.length <= n ? s : s.slice(0, n) + "…"; }
 
-// ---------- Notebook SSE ----------
+// ---------- Notebook ----------
 
 const state = { turns: [], facts: [] };
 
-function startNotebookStream() {
-  const es = new EventSource("/notebook/stream");
-  es.addEventListener("snapshot", (e) => {
-    const snap = JSON.parse(e.data);
-    state.turns = snap.turns || [];
-    state.facts = snap.facts || [];
-    renderNotebook();
-  });
-  es.addEventListener("turn", (e) => {
-    state.turns.push(JSON.parse(e.data));
-    renderNotebook();
-  });
-  es.addEventListener("fact", (e) => {
-    state.facts.push(JSON.parse(e.data));
-    renderNotebook();
-  });
-}
-
 function renderNotebook() {
   // Per-suspect counters
   const counts = {};
@@ -553,33 +536,56 @@ function fmtClock(sec) {
   return `⏱ ${String(m).padStart(2, "0")}:${String(s).padStart(2, "0")}`;
 }
 
-function startClockStream() {
-  const es = new EventSource("/clock/stream");
-  es.addEventListener("tick", (e) => {
-    const { remaining, expired } = JSON.parse(e.data);
-    clockEl.textContent = fmtClock(remaining);
-    clockEl.classList.toggle("warn", remaining <= 120 && remaining > 60);
-    clockEl.classList.toggle("danger", remaining <= 60 || expired);
-    if (expired) {
-      clockEl.textContent = "⏱ TIME UP";
-    }
-  });
+function renderTick({ remaining, expired }) {
+  clockEl.textContent = fmtClock(remaining);
+  clockEl.classList.toggle("warn", remaining <= 120 && remaining > 60);
+  clockEl.classList.toggle("danger", remaining <= 60 || expired);
+  if (expired) {
+    clockEl.textContent = "⏱ TIME UP";
+  }
 }
 
-function startCommentaryStream() {
-  const es = new EventSource("/commentary/stream");
-  let firstItem = true;
-  es.addEventListener("commentary", (e) => {
-    const line = JSON.parse(e.data);
-    if (firstItem) {
-      commentaryListEl.innerHTML = "";
-      firstItem = false;
-    }
-    const li = document.createElement("li");
-    li.className = "commentary-item";
-    li.textContent = line.text;
-    commentaryListEl.prepend(li);
+let commentaryEmpty = true;
+
+function addCommentary(line) {
+  if (commentaryEmpty) {
+    commentaryListEl.innerHTML = "";
+    commentaryEmpty = false;
+  }
+  const li = document.createElement("li");
+  li.className = "commentary-item";
+  li.textContent = line.text;
+  commentaryListEl.prepend(li);
+}
+
+// ---------- Event SSE ----------
+// One multiplexed stream for notebook, commentary and clock. EventSource
+// reconnects on its own and sends Last-Event-ID, so the server only
+// replays what was missed (or a fresh snapshot if the gap is too old).
+
+function startEventStream() {
+  const es = new EventSource("/events");
+  es.addEventListener("snapshot", (e) => {
+    const snap = JSON.parse(e.data);
+    state.turns = snap.turns || [];
+    state.facts = snap.facts || [];
+    renderNotebook();
+  });
+  es.addEventListener("turn", (e) => {
+    state.turns.push(JSON.parse(e.data));
+    renderNotebook();
+  });
+  es.addEventListener("fact", (e) => {
+    state.facts.push(JSON.parse(e.data));
+    renderNotebook();
+  });
+  es.addEventListener("tick", (e) => renderTick(JSON.parse(e.data)));
+  es.addEventListener("commentary_history", (e) => {
+    commentaryListEl.innerHTML = "";
+    commentaryEmpty = true;
+    for (const line of JSON.parse(e.data)) addCommentary(line);
   });
+  es.addEventListener("commentary", (e) => addCommentary(JSON.parse(e.data)));
 }
 
 const newGameBtn = document.getElementById("new-game");
@@ -601,6 +607,7 @@ if (newGameBtn) {
       // Notebook lists clear via the SSE snapshot we pushed from /reset.
       // Commentary stream doesn't have a reset event, so clear it locally.
       commentaryListEl.innerHTML = '<li class="muted">Awaiting first forced-truth…</li>';
+      commentaryEmpty = true;
       showView("splash");
     } catch (e) {
       console.error(e);
@@ -671,7 +678,5 @@ showTourPage(0);
 
 loadCase();
 loadSuspects().then(() => {
-  startNotebookStream();
-  startCommentaryStream();
-  startClockStream();
+  startEventStream();
 });
@@ -0,0 +1,315 @@
+"""
+Local search index over the dataroom documents.
+
+Each document is extracted once, when it is new or its size or mtime changed:
+
+- text from PDF, Word, text and markdown files is split into passages and
+  stored in an SQLite FTS5 full-text index
+- every Excel sheet and CSV file is converted once to a Parquet file, and its
+  schema (columns, types, row count) plus its first rows are indexed, so
+  questions about the data read the Parquet file instead of re-parsing Excel
+
+search() returns the best matching passages and tables, with the Parquet path
+of each matching table.
+"""
+
+import hashlib
+import json
+import re
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+INDEX_DIR = Path("dataroom_index")
+PASSAGE_CHARS = 1500
+# Rows of each table added to the full-text index, besides its schema
+INDEXED_TABLE_ROWS = 50
+MAX_EXTRACT_WORKERS = 4
+
+TEXT_SUFFIXES = {".txt", ".md"}
+TABLE_SUFFIXES = {".csv", ".xlsx", ".xlsm", ".xls"}
+SUFFIXES = TEXT_SUFFIXES | TABLE_SUFFIXES | {".pdf", ".docx"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, error TEXT
+);
+CREATE TABLE IF NOT EXISTS tables (
+    path TEXT, sheet TEXT, columns TEXT, rows INTEGER, parquet TEXT,
+    PRIMARY KEY (path, sheet)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    path UNINDEXED, location UNINDEXED, sheet UNINDEXED, text,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+@dataclass
+class Table:
+    sheet: str
+    frame: pd.DataFrame
+
+
+@dataclass
+class Extraction:
+    passages: list[tuple[str, str]] = field(default_factory=list)  # (location, text)
+    tables: list[Table] = field(default_factory=list)
+
+
+# -------------- Extraction --------------
+def _split(text: str, location: str) -> list[tuple[str, str]]:
+    """Splits text into passages of about PASSAGE_CHARS, on paragraph boundaries."""
+    passages, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if current and len(current) + len(paragraph) > PASSAGE_CHARS:
+            passages.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        passages.append(current)
+    if len(passages) == 1:
+        return [(location, passages[0])]
+    return [(f"{location}, part {n}", p) for n, p in enumerate(passages, 1)]
+
+
+def _extract_pdf(path: Path) -> Extraction:
+    from pypdf import PdfReader
+
+    extraction = Extraction()
+    for number, page in enumerate(PdfReader(path).pages, 1):
+        extraction.passages += _split(page.extract_text() or "", f"page {number}")
+    return extraction
+
+
+def _extract_docx(path: Path) -> Extraction:
+    import docx
+
+    document = docx.Document(path)
+    extraction = Extraction()
+    text = "\n\n".join(p.text for p in document.paragraphs if p.text.strip())
+    extraction.passages = _split(text, "text")
+    for number, table in enumerate(document.tables, 1):
+        rows = [[cell.text.strip() for cell in row.cells] for row in table.rows]
+        if len(rows) > 1:
+            frame = pd.DataFrame(rows[1:], columns=_column_names(rows[0]))
+            extraction.tables.append(Table(f"table {number}", frame))
+    return extraction
+
+
+def _extract_table_file(path: Path) -> Extraction:
+    if path.suffix.lower() == ".csv":
+        return Extraction(tables=[Table("csv", pd.read_csv(path))])
+    sheets = pd.read_excel(path, sheet_name=None)
+    return Extraction(
+        tables=[Table(str(name), frame) for name, frame in sheets.items()]
+    )
+
+
+def _extract_text(path: Path) -> Extraction:
+    return Extraction(passages=_split(path.read_text(errors="replace"), "text"))
+
+
+def extract(path: Path) -> Extraction:
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        return _extract_pdf(path)
+    if suffix == ".docx":
+        return _extract_docx(path)
+    if suffix in TABLE_SUFFIXES:
+        return _extract_table_file(path)
+    return _extract_text(path)
+
+
+def _column_names(columns) -> list[str]:
+    """Unique, non-empty string column names, as Parquet requires."""
+    names, seen = [], {}
+    for number, column in enumerate(columns):
+        name = str(column).strip() or f"column_{number}"
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return names
+
+
+def _to_parquet(frame: pd.DataFrame, target: Path) -> pd.DataFrame:
+    frame = frame.copy()
+    frame.columns = _column_names(frame.columns)
+    # Mixed-type columns (common in spreadsheets) are stored as text
+    for column in frame.columns:
+        if frame[column].dtype == object:
+            frame[column] = frame[column].astype("string")
+    frame.to_parquet(target, index=False)
+    return frame
+
+
+def _table_text(sheet: str, frame: pd.DataFrame) -> str:
+    schema = ", ".join(f"{c} ({t})" for c, t in frame.dtypes.astype(str).items())
+    rows = frame.head(INDEXED_TABLE_ROWS).to_string(index=False, max_colwidth=40)
+    return f"Sheet {sheet}: {len(frame)} rows. Columns: {schema}\n\n{rows}"
+
+
+def _match_query(query: str) -> str:
+    """FTS5 query matching any of the words, so punctuation cannot break it."""
+    words = re.findall(r"\w+", query.lower())
+    return " OR ".join(f'"{word}"' for word in words)
+
+
+# -------------- Index --------------
+class DataroomIndex:
+    def __init__(self, roots: list[Path], index_dir: Path = INDEX_DIR):
+        self.roots = [Path(root) for root in roots]
+        self.index_dir = Path(index_dir)
+        self.tables_dir = self.index_dir / "tables"
+        self.tables_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.index_dir / "index.sqlite", check_same_thread=False
+        )
+        self._db.executescript(SCHEMA)
+
+    def _files(self) -> dict[str, Path]:
+        files = {}
+        for root in self.roots:
+            if not root.exists():
+                continue
+            for path in root.rglob("*"):
+                relative = path.relative_to(root).parts
+                if (
+                    path.suffix.lower() in SUFFIXES
+                    and path.is_file()
+                    and not any(part.startswith((".", "~$")) for part in relative)
+                ):
+                    files[str(path)] = path
+        return files
+
+    def _table_dir(self, path: str) -> Path:
+        return self.tables_dir / hashlib.sha256(path.encode()).hexdigest()[:16]
+
+    def _remove(self, path: str) -> None:
+        for table in ("documents", "tables", "passages"):
+            self._db.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+        shutil.rmtree(self._table_dir(path), ignore_errors=True)
+
+    def _store(
+        self, path: str, stat, extraction: Extraction | None, error: str | None
+    ) -> None:
+        self._remove(path)
+        self._db.execute(
+            "INSERT INTO documents VALUES (?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, error),
+        )
+        if extraction is None:
+            return
+        self._db.executemany(
+            "INSERT INTO passages VALUES (?, ?, NULL, ?)",
+            [
+                (path, location, text)
+                for location, text in extraction.passages
+                if text.strip()
+            ],
+        )
+        table_dir = self._table_dir(path)
+        for number, table in enumerate(extraction.tables):
+            table_dir.mkdir(parents=True, exist_ok=True)
+            target = table_dir / f"{number}.parquet"
+            frame = _to_parquet(table.frame, target)
+            self._db.execute(
+                "INSERT INTO tables VALUES (?, ?, ?, ?, ?)",
+                (
+                    path,
+                    table.sheet,
+                    json.dumps(dict(frame.dtypes.astype(str))),
+                    len(frame),
+                    str(target.resolve()),
+                ),
+            )
+            self._db.execute(
+                "INSERT INTO passages VALUES (?, ?, ?, ?)",
+                (
+                    path,
+                    f"sheet {table.sheet}",
+                    table.sheet,
+                    _table_text(table.sheet, frame),
+                ),
+            )
+
+    def refresh(self) -> dict[str, int]:
+        """Indexes new and changed documents, and drops deleted ones."""
+        with self._lock:
+            files = self._files()
+            known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in self._db.execute(
+                    "SELECT path, size, mtime_ns FROM documents"
+                )
+            }
+            stats = {path: p.stat() for path, p in files.items()}
+            changed = [
+                path
+                for path, stat in stats.items()
+                if known.get(path) != (stat.st_size, stat.st_mtime_ns)
+            ]
+            removed = [path for path in known if path not in files]
+
+            with ThreadPoolExecutor(max_workers=MAX_EXTRACT_WORKERS) as pool:
+                futures = {path: pool.submit(extract, files[path]) for path in changed}
+            failed = 0
+            with self._db:
+                for path in removed:
+                    self._remove(path)
+                for path, future in futures.items():
+                    try:
+                        self._store(path, stats[path], future.result(), None)
+                    except Exception as e:
+                        # Recorded so an unreadable file is not retried until it changes
+                        self._store(path, stats[path], None, f"{type(e).__name__}: {e}")
+                        failed += 1
+            return {
+                "indexed": len(changed) - failed,
+                "failed": failed,
+                "removed": len(removed),
+                "documents": len(files),
+            }
+
+    def search(self, query: str, limit: int = 8) -> str:
+        """Markdown list of the passages and tables best matching the query."""
+        match = _match_query(query)
+        if not match:
+            return "Empty search query."
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT p.path, p.location, snippet(passages, 3, '**', '**', ' … ', 40),
+                       t.rows, t.columns, t.parquet
+                FROM passages AS p
+                LEFT JOIN tables AS t ON t.path = p.path AND t.sheet = p.sheet
+                WHERE passages MATCH ?
+                ORDER BY bm25(passages)
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        if not rows:
+            return f"No dataroom documents match {query!r}."
+
+        lines = [f"Dataroom results for {query!r}:"]
+        for number, (path, location, snippet, n_rows, columns, parquet) in enumerate(
+            rows, 1
+        ):
+            snippet = " ".join(snippet.split())
+            lines.append(f"{number}. {path} ({location}): {snippet}")
+            if parquet:
+                lines.append(
+                    f"   Table with {n_rows} rows, columns {', '.join(json.loads(columns))}; "
+                    f'read it with pd.read_parquet("{parquet}")'
+                )
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        self._db.close()
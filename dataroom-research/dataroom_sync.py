@@ -0,0 +1,240 @@
+"""
+Incremental mirror of a Google Drive folder into a local directory.
+
+The first sync lists the folder tree and downloads every file. Later syncs ask
+the Drive changes feed whether anything changed since the saved change token;
+if nothing did, they return without listing the folder. Otherwise the folder
+is listed again and only files whose modified time or checksum changed are
+downloaded, in parallel. Files removed from the folder are removed locally.
+
+Google Docs, Sheets and Slides are exported as .docx, .xlsx and .txt files.
+The sync state (change token and one entry per mirrored file) is kept in
+<local_dir>/.sync_state.json.
+"""
+
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from googleapiclient.discovery import build
+from googleapiclient.http import MediaIoBaseDownload
+
+DATAROOM_DIR = Path("dataroom")
+STATE_FILE = ".sync_state.json"
+MAX_DOWNLOADS = 8
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+# Google-native files are exported; other Google types (forms, maps...) are skipped
+EXPORTS = {
+    "application/vnd.google-apps.document": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ".docx",
+    ),
+    "application/vnd.google-apps.spreadsheet": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        ".xlsx",
+    ),
+    "application/vnd.google-apps.presentation": ("text/plain", ".txt"),
+}
+FILE_FIELDS = "id, name, mimeType, modifiedTime, md5Checksum"
+
+
+@dataclass
+class SyncResult:
+    downloaded: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    unchanged: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        text = (
+            f"Dataroom sync: {len(self.downloaded)} downloaded, {len(self.removed)} removed, "
+            f"{self.unchanged} unchanged, {len(self.failed)} failed in {self.seconds:.1f}s"
+        )
+        for path, error in self.failed.items():
+            text += f"\n- {path}: {error}"
+        return text
+
+
+class DriveMirror:
+    def __init__(
+        self,
+        credentials,
+        folder_id: str,
+        local_dir: Path = DATAROOM_DIR,
+        max_downloads: int = MAX_DOWNLOADS,
+    ):
+        self.credentials = credentials
+        self.folder_id = folder_id
+        self.local_dir = Path(local_dir)
+        self.max_downloads = max_downloads
+        # googleapiclient services are not thread-safe: one per thread
+        self._local = threading.local()
+
+    @property
+    def service(self):
+        if not hasattr(self._local, "service"):
+            self._local.service = build(
+                "drive", "v3", credentials=self.credentials, cache_discovery=False
+            )
+        return self._local.service
+
+    # -------------- State --------------
+    def _load_state(self) -> dict:
+        try:
+            state = json.loads((self.local_dir / STATE_FILE).read_text())
+            if state.get("folder_id") == self.folder_id:
+                return state
+        except (OSError, json.JSONDecodeError):
+            pass
+        return {"folder_id": self.folder_id, "change_token": None, "files": {}}
+
+    def _save_state(self, state: dict) -> None:
+        tmp = self.local_dir / f"{STATE_FILE}.tmp"
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, self.local_dir / STATE_FILE)
+
+    # -------------- Drive --------------
+    def _start_token(self) -> str:
+        return (
+            self.service.changes()
+            .getStartPageToken(supportsAllDrives=True)
+            .execute()["startPageToken"]
+        )
+
+    def _has_changes(self, token: str) -> tuple[bool, str]:
+        """Whether anything changed since the token, and the token to save next."""
+        changed = False
+        while True:
+            response = (
+                self.service.changes()
+                .list(
+                    pageToken=token,
+                    pageSize=1000,
+                    fields="nextPageToken, newStartPageToken, changes(fileId)",
+                    supportsAllDrives=True,
+                    includeItemsFromAllDrives=True,
+                )
+                .execute()
+            )
+            changed = changed or bool(response.get("changes"))
+            if "newStartPageToken" in response:
+                return changed, response["newStartPageToken"]
+            token = response["nextPageToken"]
+
+    def _list_folder(self, folder_id: str, prefix: str = "") -> dict[str, dict]:
+        """Files under the folder, recursively, keyed by Drive file id."""
+        files = {}
+        page_token = None
+        while True:
+            response = (
+                self.service.files()
+                .list(
+                    q=f"'{folder_id}' in parents and trashed = false",
+                    pageSize=1000,
+                    pageToken=page_token,
+                    fields=f"nextPageToken, files({FILE_FIELDS})",
+                    supportsAllDrives=True,
+                    includeItemsFromAllDrives=True,
+                )
+                .execute()
+            )
+            for item in response.get("files", []):
+                name = item["name"].replace("/", "_")
+                if item["mimeType"] == FOLDER_MIME:
+                    files.update(self._list_folder(item["id"], f"{prefix}{name}/"))
+                    continue
+                if item["mimeType"].startswith("application/vnd.google-apps."):
+                    if item["mimeType"] not in EXPORTS:
+                        continue
+                    name += EXPORTS[item["mimeType"]][1]
+                files[item["id"]] = {
+                    "path": prefix + name,
+                    "mime_type": item["mimeType"],
+                    "modified": item["modifiedTime"],
+                    "md5": item.get("md5Checksum"),
+                }
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return files
+
+    def _download(self, file_id: str, entry: dict) -> None:
+        files = self.service.files()
+        if entry["mime_type"] in EXPORTS:
+            request = files.export_media(
+                fileId=file_id, mimeType=EXPORTS[entry["mime_type"]][0]
+            )
+        else:
+            request = files.get_media(fileId=file_id, supportsAllDrives=True)
+
+        target = self.local_dir / entry["path"]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.part")
+        with io.FileIO(partial, "wb") as f:
+            downloader = MediaIoBaseDownload(f, request, chunksize=8 * 1024 * 1024)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk(num_retries=3)
+        os.replace(partial, target)
+
+    # -------------- Sync --------------
+    def sync(self) -> SyncResult:
+        start = time.perf_counter()
+        self.local_dir.mkdir(parents=True, exist_ok=True)
+        state = self._load_state()
+        result = SyncResult()
+
+        if state["change_token"]:
+            changed, next_token = self._has_changes(state["change_token"])
+            if not changed:
+                result.unchanged = len(state["files"])
+                result.seconds = time.perf_counter() - start
+                return result
+        else:
+            # Taken before listing, so changes made during the sync are seen next time
+            next_token = self._start_token()
+
+        known = state["files"]
+        remote = self._list_folder(self.folder_id)
+        stale = {
+            file_id: entry
+            for file_id, entry in remote.items()
+            if known.get(file_id) != entry
+            or not (self.local_dir / entry["path"]).exists()
+        }
+        result.unchanged = len(remote) - len(stale)
+
+        for file_id, entry in known.items():
+            if file_id not in remote or remote[file_id]["path"] != entry["path"]:
+                (self.local_dir / entry["path"]).unlink(missing_ok=True)
+                if file_id not in remote:
+                    result.removed.append(entry["path"])
+
+        with ThreadPoolExecutor(max_workers=self.max_downloads) as pool:
+            futures = {
+                file_id: pool.submit(self._download, file_id, entry)
+                for file_id, entry in stale.items()
+            }
+        files = {
+            file_id: entry for file_id, entry in remote.items() if file_id not in stale
+        }
+        for file_id, future in futures.items():
+            entry = stale[file_id]
+            try:
+                future.result()
+                files[file_id] = entry
+                result.downloaded.append(entry["path"])
+            except Exception as e:
+                # Left out of the state, so the next sync retries it
+                result.failed[entry["path"]] = f"{type(e).__name__}: {e}"
+
+        state.update(files=files, change_token=None if result.failed else next_token)
+        self._save_state(state)
+        result.seconds = time.perf_counter() - start
+        return result
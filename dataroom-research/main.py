@@ -1,4 +1,4 @@
-from autogen import AssistantAgent, UserProxyAgent
+from autogen import AssistantAgent, ConversableAgent, UserProxyAgent
 from autogen import GroupChat, GroupChatManager, LLMConfig
 from autogen.agents.experimental import DeepResearchAgent
 from autogen.tools.experimental.google import (
@@ -6,9 +6,26 @@
     GoogleDriveToolkit,
 )
 import os
+import re
 import datetime
 import argparse
+from pathlib import Path
+from typing import Annotated
+from dataroom_index import DataroomIndex
+from dataroom_sync import DATAROOM_DIR, DriveMirror
 from gdrive_signin import authenticate_google_drive
+from research_fanout import ResearchFanOut
+
+# Routing of the User's requests: only explicit mentions of Drive or of data
+# files, so "what drives churn" or "companies that excel at..." stay research
+DRIVE_REQUEST = re.compile(
+    r"\b(google drive|gdrive|(my|shared|the) drive|drive (folder|files?)"
+    r"|download (the |my |a |all )?(files?|folders?|documents?|dataroom))\b"
+)
+DATA_REQUEST = re.compile(
+    r"\b(dataroom|data room|csv|xlsx?|spreadsheets?"
+    r"|excel (files?|sheets?|workbooks?|spreadsheets?))\b"
+)
 
 
 def generate_filename(query):
@@ -94,6 +111,11 @@ def main():
         action="store_true",
         help="Include Google Drive agent in the conversation",
     )
+    parser.add_argument(
+        "--dataroom-folder",
+        metavar="FOLDER_ID",
+        help="Google Drive folder to mirror and index as the dataroom (requires --use-gdrive)",
+    )
     args = parser.parse_args()
 
     # Get the configuration for LLM models
@@ -116,33 +138,35 @@ def main():
 
     config_list = [llm_config]
 
-    # Agent 1: DeepResearch Agent
+    # Agent 1: Research agent, fanning a request out to several research agents
+    def make_deep_research_agent():
+        return DeepResearchAgent(
+            name="DeepResearchAgent",
+            llm_config=llm_config,
+        )
 
-    agent = DeepResearchAgent(
-        name="DeepResearchAgent",
-        llm_config=llm_config,
-    )
     # Fake Reserach Agent for testing
-    fake_agent = AssistantAgent(
-        name="FakeResearchAgent",
-        system_message="""You are a fake research agent.You don't have anything else to do but always return a made-up report about the topic you are researching.
-        As if you are the DeepResearchAgent.
-        When asked for MRR projection return this data:
-        Month 1: $25,000
-        Month 2: $28,550
-        Month 3: $32,635
-        Month 4: $37,306
-        Month 5: $42,620
-        Month 6: $48,641
-        Month 7: $55,442
-        Month 8: $63,105
-        Month 9: $71,718
-        Month 10: $81,384
-        Month 11: $92,214
-        Month 12: $104,328
-        """,
-        llm_config=llm_config,
-    )
+    def make_fake_research_agent():
+        return AssistantAgent(
+            name="FakeResearchAgent",
+            system_message="""You are a fake research agent.You don't have anything else to do but always return a made-up report about the topic you are researching.
+            As if you are the DeepResearchAgent.
+            When asked for MRR projection return this data:
+            Month 1: $25,000
+            Month 2: $28,550
+            Month 3: $32,635
+            Month 4: $37,306
+            Month 5: $42,620
+            Month 6: $48,641
+            Month 7: $55,442
+            Month 8: $63,105
+            Month 9: $71,718
+            Month 10: $81,384
+            Month 11: $92,214
+            Month 12: $104,328
+            """,
+            llm_config=llm_config,
+        )
 
     # Agent 2: Report Writer Agent
     report_writer = AssistantAgent(
@@ -157,8 +181,7 @@ def main():
            - Use code blocks with ``` when including code snippets
            - Add emphasis with **bold** and *italic* when appropriate
            - Include properly formatted [links](url) for references
-        4. Save the completed report using the save_research_to_file function - your output will be saved as .md files
-        5. Ask if the user would like more details on any specific aspect
+        4. Reply with the report only: it is saved as a .md file automatically after you reply
 
         Always ensure your reports are well-organized, readable, and include all the important information from the research.
         The report should be ready for immediate reading as a professional markdown document without requiring any additional formatting.
@@ -210,16 +233,18 @@ def main():
 
         ALWAYS USE YOUR CODE EXECUTION CAPABILITIES when complex data formatting or specialized file handling is required.
 
-        YOU ARE ALSO RESPONSIBLE FOR READING CSV AND EXCEL FILES, generate python code to read them.
-        here is an example of how to read an excel file:
+        YOU ARE ALSO RESPONSIBLE FOR ANSWERING QUESTIONS ABOUT THE DATAROOM DOCUMENTS AND CSV AND EXCEL FILES.
+        First call search_dataroom to find the relevant passages and tables. Every Excel sheet and CSV file
+        is already converted to a Parquet file, and search_dataroom gives its path; read it instead of the
+        original file:
         ```python
         import pandas as pd
 
-        # read by default 1st sheet of an excel file
-        dataframe1 = pd.read_excel({filepath})
+        dataframe1 = pd.read_parquet({parquet_path})
 
         print(dataframe1)
         ```
+        Only read a file with pd.read_excel or pd.read_csv if it is not in the dataroom index.
         """,
         llm_config=llm_config,
         code_execution_config={
@@ -241,10 +266,37 @@ def main():
     # Create group chat based on command-line argument
     if args.use_fake:
         print("Using FakeResearchAgent for testing...")
-        research_agent = fake_agent
+        fan_out = ResearchFanOut(llm_config, make_fake_research_agent)
+        research_agent_name = "FakeResearchAgent"
     else:
         print("Using DeepResearchAgent for real research...")
-        research_agent = agent
+        fan_out = ResearchFanOut(llm_config, make_deep_research_agent)
+        research_agent_name = "DeepResearchAgent"
+
+    research_agent = ConversableAgent(
+        name=research_agent_name,
+        llm_config=False,
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
+    research_agent.register_reply([ConversableAgent, None], fan_out.reply)
+
+    # Agent 5: Saves each report the ReportWriter writes, without an LLM call
+    def save_report(recipient, messages=None, sender=None, config=None):
+        requests = [m["content"] for m in messages if m.get("name") == "User"]
+        query = requests[-1] if requests else "research"
+        filepath = save_research_to_file(
+            messages[-1]["content"], filename=generate_filename(query[:60])
+        )
+        return True, f"Report saved to {filepath}"
+
+    report_saver = ConversableAgent(
+        name="ReportSaver",
+        llm_config=False,
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
+    report_saver.register_reply([ConversableAgent, None], save_report)
 
     gdrive_agent = None
     if args.use_gdrive:
@@ -282,54 +334,116 @@ def main():
             print(f"Error initializing Google Drive agent: {e}")
             print("Continuing without Google Drive agent...")
 
+    # Local dataroom: the mirrored Drive folder and files downloaded by the GoogleDriveAgent
+    dataroom_index = DataroomIndex([DATAROOM_DIR, Path("ag2_drive_downloads")])
+    mirror = None
+    if gdrive_agent and args.dataroom_folder:
+        mirror = DriveMirror(credentials, args.dataroom_folder)
+        print(mirror.sync())
+    print(f"Dataroom index: {dataroom_index.refresh()}")
+
+    @data_handler_agent.register_for_execution()
+    @data_handler_agent.register_for_llm(
+        description="Full-text search over the dataroom documents and the schemas of their tables"
+    )
+    def search_dataroom(
+        query: Annotated[
+            str, "Words to search for in the documents, sheet names and columns"
+        ],
+    ) -> str:
+        # Only new or changed files are extracted again
+        dataroom_index.refresh()
+        return dataroom_index.search(query)
+
+    if mirror:
+
+        @gdrive_agent.register_for_execution()
+        @gdrive_agent.register_for_llm(
+            description="Download new and changed files of the dataroom folder and index them"
+        )
+        def sync_dataroom() -> str:
+            result = mirror.sync()
+            return f"{result}\nIndex: {dataroom_index.refresh()}"
+
     # Register the save_research_to_file function with the user proxy and report writer
     for agent_obj in [user_proxy, report_writer, data_handler_agent]:
         agent_obj.register_function(
             function_map={"save_research_to_file": save_research_to_file}
         )
 
-    # Define a custom function for the DeepResearchAgent to call
-    def delegate_research_task(task):
-        """Delegate research task to the DeepResearchAgent and return the result."""
-        print(f"\n[System] Processing research task: {task}")
-        result = agent.run(
-            message=task,
-            tools=agent.tools,
-            max_turns=2,
-            user_input=False,
-            summary_method="reflection_with_llm",
-        )
-        result.process()
-        return result.summary
-
-    # Register the delegate_research_task function with all agents
-    for agent_obj in [user_proxy, research_agent, report_writer, data_handler_agent]:
-        agent_obj.register_function(
-            function_map={"delegate_research_task": delegate_research_task}
-        )
-
     # Create a group chat and manager
-    groupchat_agents = [user_proxy, report_writer, research_agent, data_handler_agent]
+    groupchat_agents = [
+        user_proxy,
+        report_writer,
+        research_agent,
+        report_saver,
+        data_handler_agent,
+    ]
 
     # Add Google Drive agent to the group chat if available
     if gdrive_agent:
         groupchat_agents.append(gdrive_agent)
 
+    def select_speaker(last_speaker, groupchat):
+        """
+        Deterministic flow, so no LLM call is spent choosing the next speaker:
+        User -> research -> ReportWriter -> ReportSaver -> User. Requests about
+        Drive go to the GoogleDriveAgent and requests about the dataroom or
+        CSV/Excel data to the DataHandlerAgent instead of research. Code the
+        User ran, and tool results it returned, go back to the agent that asked.
+        The opening greeting and empty replies were not typed by the human, so
+        the User speaks again instead of starting research.
+        """
+        last = groupchat.messages[-1]
+
+        if last_speaker is user_proxy:
+            content = last.get("content")
+            content = content.lower() if isinstance(content, str) else ""
+            if len(groupchat.messages) > 1 and (
+                content.startswith("exitcode:") or last.get("tool_responses")
+            ):
+                requester = groupchat.agent_by_name(groupchat.messages[-2].get("name"))
+                if requester is not None and requester is not user_proxy:
+                    return requester
+            if len(groupchat.messages) == 1 or not content.strip():
+                return user_proxy
+            if gdrive_agent and DRIVE_REQUEST.search(content):
+                return gdrive_agent
+            if DATA_REQUEST.search(content):
+                return data_handler_agent
+            return research_agent
+
+        # Tool calls are executed by the agent that made them
+        if last_speaker in (gdrive_agent, data_handler_agent) and last.get(
+            "tool_calls"
+        ):
+            return last_speaker
+
+        if last_speaker is research_agent:
+            return report_writer
+
+        if last_speaker is report_writer:
+            return report_saver
+
+        return user_proxy
+
     group_chat = GroupChat(
         agents=groupchat_agents,
         messages=[],
         max_round=50,
-        speaker_selection_method="auto",
-        allow_repeat_speaker=False,
+        speaker_selection_method=select_speaker,
     )
     group_chat_manager = GroupChatManager(
         groupchat=group_chat, llm_config={"config_list": config_list}
     )
 
     # Start the conversation
-    user_proxy.initiate_chat(
-        group_chat_manager, message="What would you like to research deeply"
-    )
+    try:
+        user_proxy.initiate_chat(
+            group_chat_manager, message="What would you like to research deeply"
+        )
+    finally:
+        dataroom_index.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""
+Research fan-out: splits a research request into sub-tasks and researches them
+concurrently on a bounded pool of research agents, then merges the findings.
+
+One LLM call plans the sub-tasks. Each sub-task then runs on its own research
+agent (a DeepResearchAgent, or the fake agent with --use-fake). Agents are
+built on first use and reused, at most one per worker, since one agent can
+only run one chat at a time.
+"""
+
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from autogen import OpenAIWrapper
+from autogen.events.agent_events import InputRequestEvent
+
+MAX_RESEARCH_WORKERS = 3
+MAX_SUBTASKS = 4
+
+PLANNER_PROMPT = """You split research requests into independent sub-tasks that can be researched in parallel.
+Return at most {max_subtasks} sub-tasks as a JSON list of strings and nothing else.
+Each sub-task must be a complete, self-contained research question (repeat the company, product or topic it is about).
+If the request is narrow enough to research in one go, return a list with the request itself."""
+
+
+class ResearchFanOut:
+    def __init__(
+        self,
+        llm_config,
+        make_agent: Callable[[], object],
+        max_workers: int = MAX_RESEARCH_WORKERS,
+        max_subtasks: int = MAX_SUBTASKS,
+    ):
+        self.client = OpenAIWrapper(config_list=[llm_config])
+        self.make_agent = make_agent
+        self.max_workers = max_workers
+        self.max_subtasks = max_subtasks
+        self._agents: queue.Queue = queue.Queue()
+        self._built = 0
+        self._lock = threading.Lock()
+
+    # -------------- Planning --------------
+    def plan(self, request: str) -> list[str]:
+        """Sub-tasks for the request; the request itself if planning fails."""
+        try:
+            response = self.client.create(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": PLANNER_PROMPT.format(
+                            max_subtasks=self.max_subtasks
+                        ),
+                    },
+                    {"role": "user", "content": request},
+                ]
+            )
+            text = self.client.extract_text_or_completion_object(response)[0]
+            match = re.search(r"\[.*\]", text, re.DOTALL)
+            subtasks = json.loads(match.group(0)) if match else []
+            subtasks = [s.strip() for s in subtasks if isinstance(s, str) and s.strip()]
+        except Exception as e:
+            print(
+                f"[Research] Planning failed, researching the request as one task: {e}"
+            )
+            subtasks = []
+        return subtasks[: self.max_subtasks] or [request]
+
+    # -------------- Research --------------
+    def _acquire(self):
+        try:
+            return self._agents.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                build = self._built < self.max_workers
+                self._built += build
+            if not build:
+                return self._agents.get()
+            try:
+                return self.make_agent()
+            except Exception:
+                # Free the slot, or later sub-tasks wait for an agent never built
+                with self._lock:
+                    self._built -= 1
+                raise
+
+    def research(self, number: int, subtask: str) -> str:
+        """Researches one sub-task; returns its summary."""
+        agent = self._acquire()
+        start = time.perf_counter()
+        print(f"[Research {number}] {subtask}")
+
+        def log(*objects, sep=" ", end="\n", flush=False):
+            text = sep.join(map(str, objects)) + end
+            print(f"[Research {number}] {text}", end="", flush=flush)
+
+        try:
+            result = agent.run(
+                message=subtask,
+                tools=agent.tools,
+                max_turns=2,
+                user_input=False,
+                summary_method="reflection_with_llm",
+            )
+            for event in result.events:
+                if isinstance(event, InputRequestEvent):
+                    event.content.respond("")
+                else:
+                    event.print(f=log)
+            return result.summary or ""
+        finally:
+            print(f"[Research {number}] done in {time.perf_counter() - start:.0f}s")
+            self._agents.put(agent)
+
+    def run(self, request: str) -> str:
+        """Plans, researches the sub-tasks concurrently and merges the findings."""
+        subtasks = self.plan(request)
+        print(
+            f"[Research] {len(subtasks)} sub-task(s), up to {self.max_workers} at a time"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                pool.submit(self.research, number, subtask)
+                for number, subtask in enumerate(subtasks, 1)
+            ]
+
+        sections = [f"# Research findings: {request}"]
+        for number, (subtask, future) in enumerate(zip(subtasks, futures), 1):
+            try:
+                findings = future.result()
+            except Exception as e:
+                findings = f"Research failed: {type(e).__name__}: {e}"
+            sections.append(f"## {number}. {subtask}\n\n{findings}")
+        return "\n\n".join(sections)
+
+    def reply(self, recipient, messages=None, sender=None, config=None):
+        """Reply function for the research agent in the group chat."""
+        return True, self.run(messages[-1]["content"])
@@ -1,58 +1,283 @@
-from fastapi import FastAPI, Request
-from autogen.agents.experimental import DeepResearchAgent
+"""
+FastAPI backend for the DeepResearchAgent.
+
+Research runs as background jobs on a bounded worker pool, so the event loop
+never blocks on a research run:
+
+- POST /jobs starts a job and returns its id
+- GET /jobs/{id} returns its status, and its result once finished
+- GET /jobs/{id}/events streams its output and status over Server-Sent Events
+
+Each job captures its own output by printing the agent's events into the job's
+log, instead of redirecting the process-wide stdout. The LLM config is built
+once, and each worker thread builds its agent once and reuses it.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
 from autogen import LLMConfig
-import nest_asyncio
-import io
-import contextlib
+from autogen.agents.experimental import DeepResearchAgent
+from autogen.events.agent_events import InputRequestEvent
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
+MAX_CONCURRENT_JOBS = 4
+# Jobs waiting for a worker beyond this are rejected with 429
+MAX_QUEUED_JOBS = 32
+# Finished jobs kept for GET /jobs/{id}, oldest dropped first, and for at most
+# FINISHED_JOB_TTL_SECONDS; checked on submit and every PRUNE_INTERVAL_SECONDS
+MAX_FINISHED_JOBS = 200
+FINISHED_JOB_TTL_SECONDS = 3600
+PRUNE_INTERVAL_SECONDS = 60
+SSE_KEEPALIVE_SECONDS = 15
 
-nest_asyncio.apply()
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
 
-app = FastAPI()
+llm_config = LLMConfig(
+    {"api_type": "openai", "model": "gpt-5-nano", "temperature": 1, "timeout": 120}
+)
 
+executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix="research"
+)
+_worker = threading.local()
 
-def run_agent(user_query):
-    """Runs the agent synchronously and returns the final JSON result."""
-    # Initialize DeepResearchAgent
-    llm_config = LLMConfig(
-        {"api_type": "openai", "model": "gpt-5-nano", "temperature": 1, "timeout": 120}
-    )
 
-    agent = DeepResearchAgent(
-        name="DeepResearchAgent",
-        llm_config=llm_config,
-    )
+def get_agent() -> DeepResearchAgent:
+    """The calling worker thread's agent, built on its first job."""
+    if not hasattr(_worker, "agent"):
+        _worker.agent = DeepResearchAgent(
+            name="DeepResearchAgent",
+            llm_config=llm_config,
+        )
+    return _worker.agent
 
-    # Run the agent (synchronous call)
-    final_result = agent.run(
-        message=user_query,
-        tools=agent.tools,
-        max_turns=2,
-        user_input=False,
-        summary_method="reflection_with_llm",
-    )
 
-    final_result.process()
+@dataclass
+class Job:
+    id: str
+    query: str
+    loop: asyncio.AbstractEventLoop
+    status: str = "queued"  # queued -> running -> done | failed
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    log: list[str] = field(default_factory=list)
+    summary: str | None = None
+    cost: Any = None
+    error: str | None = None
+    # One Event per listener, so one listener clearing its Event can't make
+    # another miss a change
+    _listeners: set[asyncio.Event] = field(default_factory=set, repr=False)
 
-    return final_result
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
 
+    def _notify(self) -> None:
+        # Called from worker threads; the Events belong to the event loop
+        self.loop.call_soon_threadsafe(self._wake)
 
-@app.post("/chat")
-async def chat(request: Request):
-    """API Endpoint that returns only the final result as JSON."""
+    def _wake(self) -> None:
+        for changed in self._listeners:
+            changed.set()
+
+    @contextmanager
+    def listen(self) -> Iterator[asyncio.Event]:
+        """An Event of the caller's own that is set on every change to the job."""
+        changed = asyncio.Event()
+        self._listeners.add(changed)
+        try:
+            yield changed
+        finally:
+            self._listeners.discard(changed)
+
+    def print(self, *objects, sep=" ", end="\n", flush=False) -> None:
+        """print() replacement that the agent's events write into."""
+        self.log.append(ANSI_ESCAPE.sub("", sep.join(map(str, objects)) + end))
+        self._notify()
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+        if status == "running":
+            self.started = time.time()
+        elif self.done:
+            self.finished = time.time()
+        self._notify()
+
+    def as_dict(self, with_log: bool = True) -> dict[str, Any]:
+        result = {
+            "id": self.id,
+            "query": self.query,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+        if self.done:
+            result.update(
+                final_result_summary=self.summary,
+                final_result_cost=jsonable_encoder(self.cost),
+                error=self.error,
+            )
+            if with_log:
+                result["captured_output"] = "".join(self.log)
+        return result
+
+
+jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+
+def run_job(job: Job) -> None:
+    """Runs in a worker thread."""
+    job.set_status("running")
+    try:
+        agent = get_agent()
+        response = agent.run(
+            message=job.query,
+            tools=agent.tools,
+            max_turns=2,
+            user_input=False,
+            summary_method="reflection_with_llm",
+        )
+        for event in response.events:
+            if isinstance(event, InputRequestEvent):
+                event.content.respond("")  # no human in the loop
+            else:
+                event.print(f=job.print)
+        job.summary = response.summary
+        job.cost = response.cost
+        job.set_status("done")
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.set_status("failed")
+
+
+def _prune_finished() -> None:
+    expired = time.time() - FINISHED_JOB_TTL_SECONDS
+    finished = [job_id for job_id, job in jobs.items() if job.done]
+    excess = max(0, len(finished) - MAX_FINISHED_JOBS)
+    for i, job_id in enumerate(finished):
+        if i < excess or jobs[job_id].finished < expired:
+            del jobs[job_id]
+
+
+async def _prune_periodically() -> None:
+    while True:
+        await asyncio.sleep(PRUNE_INTERVAL_SECONDS)
+        _prune_finished()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pruner = asyncio.create_task(_prune_periodically())
+    yield
+    pruner.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def submit_job(query: str) -> Job:
+    queued = sum(job.status == "queued" for job in jobs.values())
+    if queued >= MAX_QUEUED_JOBS:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many research jobs waiting, try again later",
+            headers={"Retry-After": "30"},
+        )
+    _prune_finished()
+    job = Job(id=uuid.uuid4().hex, query=query, loop=asyncio.get_running_loop())
+    jobs[job.id] = job
+    job.loop.run_in_executor(executor, run_job, job)
+    return job
+
+
+def _get_job(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job {job_id}")
+    return job
+
+
+async def _query(request: Request) -> str:
     data = await request.json()
-    user_query = data.get("message", "")
+    query = (data.get("message") or "").strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="message is required")
+    return query
+
 
-    # Capture stdout without modifying the function
-    buffer = io.StringIO()
-    with contextlib.redirect_stdout(buffer):
-        final_result = run_agent(user_query)
+@app.post("/jobs", status_code=202)
+async def create_job(request: Request):
+    """Starts a research job and returns its id."""
+    job = submit_job(await _query(request))
+    return {"id": job.id, "status": job.status}
 
-    captured_output = buffer.getvalue()
 
-    results = {
-        "final_result_summary": final_result.summary,
-        "final_result_cost": final_result.cost,
-        "captured_output": captured_output,
-    }
-    return results
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    return _get_job(job_id).as_dict()
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Streams a "log" event per line of output, "status" events on status
+    changes, and a final "result" event with the body of GET /jobs/{id}
+    minus the captured output.
+    """
+    job = _get_job(job_id)
+
+    async def stream():
+        sent, status = 0, None
+        with job.listen() as changed:
+            while True:
+                changed.clear()
+                lines = job.log[sent:]
+                sent += len(lines)
+                for line in lines:
+                    yield _sse("log", {"line": line})
+                if job.status != status:
+                    status = job.status
+                    yield _sse("status", {"status": status})
+                if job.done:
+                    yield _sse("result", job.as_dict(with_log=False))
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/chat")
+async def chat(request: Request):
+    """Runs a research job and returns only the final result as JSON."""
+    job = submit_job(await _query(request))
+    with job.listen() as changed:
+        while not job.done:
+            changed.clear()
+            if not job.done:
+                await changed.wait()
+    return job.as_dict()
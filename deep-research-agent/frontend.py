@@ -9,17 +9,39 @@
 user_input = st.text_input("Enter your deep research question:", key="user_input")
 
 
-def fetch_research_results(user_query):
+BACKEND_URL = "http://127.0.0.1:8000"
+
+
+def stream_research_events(job_id):
+    """Yields (event, data) pairs from the job's Server-Sent Events stream."""
+    with requests.get(
+        f"{BACKEND_URL}/jobs/{job_id}/events", stream=True, timeout=1800
+    ) as response:
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: ") :]
+            elif line.startswith("data: "):
+                yield event, json.loads(line[len("data: ") :])
+
+
+def fetch_research_results(user_query, output_placeholder):
     response = requests.post(
-        "http://127.0.0.1:8000/chat",
-        json={"message": user_query},
-        timeout=1800,
+        f"{BACKEND_URL}/jobs", json={"message": user_query}, timeout=30
     )
+    if response.status_code != 202:
+        return {"error": "Failed to start research"}
+    job_id = response.json()["id"]
 
-    if response.status_code == 200:
-        return response.json()
-    else:
-        return {"error": "Failed to fetch response"}
+    # Show the output live while the research runs
+    captured_output = ""
+    for event, data in stream_research_events(job_id):
+        if event == "log":
+            captured_output += data["line"]
+            output_placeholder.code(captured_output, height=400, language="shell")
+        elif event == "result":
+            return {**data, "captured_output": captured_output}
+    return {"error": "Lost connection to the research job"}
 
 
 if st.button("Send"):
@@ -30,12 +52,17 @@ def fetch_research_results(user_query):
         # Show the loading message
         loading_message.subheader("🔍 Researching...")
 
-        final_result_json = fetch_research_results(user_input)
+        output_placeholder = st.empty()
+        final_result_json = fetch_research_results(user_input, output_placeholder)
+        output_placeholder.empty()
         final_result_summary = final_result_json.get("final_result_summary", {})
         final_result_cost = final_result_json.get("final_result_cost", {})
         captured_output = final_result_json.get("captured_output", "")
         loading_message.empty()
 
+        if final_result_json.get("error"):
+            st.error(final_result_json["error"])
+
         if captured_output:
             # Display summary separately
             if final_result_summary:
@@ -0,0 +1,143 @@
+"""
+Benchmark for the scrape cache using a fake TinyFish scraper (no API keys needed).
+
+Replays the scrape pattern of the pipeline for many companies: the seed crawl,
+the prefetch of seed-discovered pages, and six specialists in parallel threads,
+including the overlapping pages they share. Runs it three ways:
+
+  - no cache: every scrape hits the (fake) scraper
+  - cold cache: single-flight and the memory tier dedupe within the batch
+  - warm cache: a fresh process re-screening the same companies (disk tier)
+
+    python benchmark_scrape_cache.py --companies 50 --latency 0.2
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prompts import PRESS_PAGE_GOAL, TEAM_PAGE_GOAL
+from scrape_cache import ScrapeCache, ScrapeStats
+
+SEED_GOAL = "Extract: company name, tagline, description, founding year, HQ location"
+
+
+class FakeScraper:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str, goal: str) -> dict:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency * random.uniform(0.5, 1.5))
+        return {"url": url, "goal": goal, "content": "x" * 2000}
+
+
+def _specialist_scrapes(company: int) -> list[list[tuple[str, str]]]:
+    """Per specialist, the (url, goal) pairs it scrapes, overlapping like the real prompts."""
+    site = f"https://company{company}.example.com"
+    slug = f"company{company}"
+    team = [(f"{site}/about", TEAM_PAGE_GOAL), (f"{site}/team", TEAM_PAGE_GOAL)]
+    press = [(f"{site}/press", PRESS_PAGE_GOAL)]
+    linkedin = f"https://www.linkedin.com/company/{slug}"
+    crunchbase = f"https://www.crunchbase.com/organization/{slug}"
+    github = f"https://github.com/{slug}"
+    return [
+        # Founders & Team: known team pages (twice: LLMs often re-check a page), LinkedIn
+        team + team[:1] + [(f"{linkedin}/people", "Extract employee names and titles")],
+        # Investors: Crunchbase
+        [(crunchbase, "Extract all funding rounds, investors, amounts, dates")],
+        # Press: known press pages, Google News
+        press
+        + [(f"https://news.google.com/search?q={slug}", "Extract all article titles")],
+        # Financials: Yahoo lookup, Crunchbase again for revenue estimates
+        [
+            (f"https://finance.yahoo.com/lookup?s={slug}", "Is this company public?"),
+            (crunchbase, "Extract all funding rounds, investors, amounts, dates"),
+        ],
+        # Tech stack: BuiltWith, GitHub, a job page
+        [
+            (
+                f"https://builtwith.com/company{company}.example.com",
+                "Extract technologies",
+            ),
+            (github, "List all public repositories and their primary languages"),
+            (f"{site}/careers", "Extract technology requirements"),
+        ],
+        # Social: LinkedIn, GitHub (same page and goal as the tech stack agent)
+        [
+            (linkedin, "Extract follower count, employee count, specialties"),
+            (github, "List all public repositories and their primary languages"),
+        ],
+    ]
+
+
+def _run_company(company: int, scrape, prefetch) -> None:
+    site = f"https://company{company}.example.com"
+    scrape(site, SEED_GOAL)  # Stage 1, before anything else
+    specialists = _specialist_scrapes(company)
+    with ThreadPoolExecutor(max_workers=len(specialists) + 1) as executor:
+        executor.submit(
+            prefetch,
+            [
+                (f"{site}/about", TEAM_PAGE_GOAL),
+                (f"{site}/team", TEAM_PAGE_GOAL),
+                (f"{site}/press", PRESS_PAGE_GOAL),
+            ],
+        )
+        for pages in specialists:
+            executor.submit(lambda pages=pages: [scrape(*page) for page in pages])
+
+
+def _run_batch(companies: int, concurrency: int, scrape, prefetch) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(
+            executor.map(lambda c: _run_company(c, scrape, prefetch), range(companies))
+        )
+    return time.perf_counter() - start
+
+
+def main(companies: int, concurrency: int, latency: float) -> None:
+    random.seed(0)
+    print(
+        f"Benchmark: {companies} companies, {concurrency} pipelines at a time, "
+        f"~{latency:.2f}s per scrape\n"
+    )
+
+    scraper = FakeScraper(latency)
+    # Without a cache there is nothing to prefetch into
+    elapsed = _run_batch(companies, concurrency, scraper, lambda pages: None)
+    print(f"{'no cache':<12} {elapsed:7.2f}s  {scraper.calls:5d} scrapes")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ("cold cache", "warm cache"):
+            scraper = FakeScraper(latency)
+            cache = ScrapeCache(scraper, cache_dir=cache_dir)
+            stats = ScrapeStats()
+            elapsed = _run_batch(
+                companies,
+                concurrency,
+                lambda url, goal: cache.scrape(url, goal, stats=stats),
+                lambda pages: cache.prefetch(pages, stats=stats),
+            )
+            print(
+                f"{label:<12} {elapsed:7.2f}s  {scraper.calls:5d} scrapes  "
+                f"({stats.summary()})"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the TinyFish scrape cache.")
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="fake scrape latency (s)"
+    )
+    args = parser.parse_args()
+    main(args.companies, args.concurrency, args.latency)
@@ -6,18 +6,27 @@
 Architecture:
   1. Coordinator agent receives a company URL
   2. Spawns 6 specialist agents in parallel threads
-  3. Each specialist calls tinyfish as a tool to deep-scrape relevant sources
+  3. Each specialist calls tinyfish as a tool to deep-scrape relevant sources,
+     through a shared scrape cache (see scrape_cache.py)
   4. Validator agent checks for gaps and contradictions
   5. Synthesis agent produces the final report
 
+Each stage is checkpointed to checkpoint.json in the output directory together
+with a hash of its inputs, so resuming only re-runs stages whose inputs changed.
+Batch mode runs many company pipelines concurrently, with global caps on
+concurrent LLM chats and scrapes, and resumes unfinished companies when re-run.
+
 Usage:
   export OPENAI_API_KEY=...
   export TINYFISH_API_KEY=...
   python due_diligence.py --url https://example.com
+  python due_diligence.py --urls-file companies.txt
+  python due_diligence.py --resume ./due_diligence_acme_20260311_120000/
   python due_diligence.py --report-path ./due_diligence_acme_20260311_120000/
 """
 
 import argparse
+import hashlib
 import json
 import os
 import re
@@ -26,7 +35,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Annotated, Any, Callable
 
 from autogen import AssistantAgent, LLMConfig, UserProxyAgent, register_function
 from autogen.tools.experimental import TinyFishTool
@@ -38,18 +47,27 @@
     FOUNDERS_TEAM_MSG,
     INVESTORS,
     INVESTORS_MSG,
+    PACKED_DATA_NOTE,
     PRESS,
     PRESS_MSG,
+    PRESS_PAGE_GOAL,
     QA_ANALYST,
+    QA_FOLLOW_UP_MSG,
+    SECTION_SUMMARIZER,
+    SECTION_SUMMARIZER_MSG,
     SEED_CRAWLER,
     SEED_CRAWLER_MSG,
     SOCIAL,
     SOCIAL_MSG,
     SYNTHESIS,
+    TEAM_PAGE_GOAL,
     TECH_STACK,
     TECH_STACK_MSG,
     VALIDATOR,
 )
+from prompt_packing import PackedPrompt, pack_sections
+from report_index import ReportIndex, is_report_file
+from scrape_cache import ScrapeCache, ScrapeStats
 
 # ---------------------------------------------------------------------------
 # Config
@@ -63,10 +81,40 @@
     }
 )
 
+# Process-wide caps, shared by every pipeline running in this process
+MAX_CONCURRENT_CHATS = 8
+MAX_CONCURRENT_SCRAPES = 8
+MAX_CONCURRENT_COMPANIES = 4
+
+# Token budgets for the packed research data in the validator and synthesis prompts
+VALIDATOR_TOKEN_BUDGET = 12_000
+SYNTHESIS_TOKEN_BUDGET = 16_000
+# Earlier Q&A turns passed along with each question (answers only, not tool output)
+QA_HISTORY_TURNS = 3
+
+LLM_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_CHATS)
+SCRAPE_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_SCRAPES)
+
+
+def set_concurrency_limits(max_chats: int, max_scrapes: int) -> None:
+    """Resize the global chat and scrape caps. Call before starting any pipeline."""
+    global LLM_SLOTS, SCRAPE_SLOTS
+    LLM_SLOTS = threading.BoundedSemaphore(max_chats)
+    SCRAPE_SLOTS = threading.BoundedSemaphore(max_scrapes)
+
+
 tinyfish_tool = TinyFishTool()
 
+
+def _scrape_with_tinyfish(url: str, goal: str) -> Any:
+    with SCRAPE_SLOTS:
+        return tinyfish_tool(url=url, goal=goal)
+
+
+scrape_cache = ScrapeCache(_scrape_with_tinyfish)
+
 # ---------------------------------------------------------------------------
-# Shared results store (thread-safe)
+# Per-run results store (thread-safe)
 # ---------------------------------------------------------------------------
 
 SPECIALIST_KEYS = [
@@ -79,8 +127,21 @@
 ]
 
 
+CHECKPOINT_FILE = "checkpoint.json"
+# Files holding the complete output of each non-specialist stage; a specialist's
+# is <result_key>.json (see _stage_file)
+STAGE_FILES = {
+    "seed": "company_profile.json",
+    "validator": "validation_notes.json",
+    "synthesis": "report.md",
+}
+
+
 @dataclass
 class DueDiligenceResults:
+    """Everything one pipeline run collects. Each run gets its own instance."""
+
+    company_url: str = ""
     seed: dict[str, Any] = field(default_factory=dict)
     founders_team: dict[str, Any] = field(default_factory=dict)
     investors: dict[str, Any] = field(default_factory=dict)
@@ -91,10 +152,12 @@ class DueDiligenceResults:
     validation_notes: list[str] = field(default_factory=list)
     final_report: str = ""
     output_dir: str = ""
+    scrape_stats: ScrapeStats = field(default_factory=ScrapeStats)
+    # The checkpoint manifest, mirrored to checkpoint.json (see _save_checkpoint)
+    checkpoint: dict[str, Any] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
 
 
-results = DueDiligenceResults()
-results_lock = threading.Lock()
 references_lock = threading.Lock()
 
 
@@ -108,7 +171,7 @@ def _save_agent_output(
     files: list[tuple[str, Any, str]],
     section_title: str,
 ) -> None:
-    """Save agent output files and append entries to references.md."""
+    """Save agent output files and add their section to references.md."""
     ref_lines = [f"\n### {section_title}\n"]
     for rel_path, data, description in files:
         full_path = Path(output_dir) / rel_path
@@ -120,16 +183,45 @@ def _save_agent_output(
         ref_lines.append(f"- [{rel_path}]({rel_path}) — {description}\n")
 
     with references_lock:
-        with open(Path(output_dir) / "references.md", "a") as f:
-            f.writelines(ref_lines)
+        refs_path = Path(output_dir) / "references.md"
+        text = refs_path.read_text() if refs_path.exists() else ""
+        # A stage re-run on resume replaces its section instead of adding another
+        heading = ref_lines[0]
+        if heading in text:
+            start = text.index(heading)
+            end = text.find("\n### ", start + len(heading))
+            text = text[:start] + (text[end:] if end >= 0 else "")
+        refs_path.write_text(text + "".join(ref_lines))
+
+
+def _claim_output_dir(
+    company_name: str, output_root: str = ".", rename_from: str | None = None
+) -> str:
+    """
+    Create a timestamped output directory (or move rename_from there), adding a
+    numeric suffix if a concurrent run already claimed the name.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "_", company_name.lower()).strip("_")
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = Path(output_root) / f"due_diligence_{slug}_{ts}"
+    for n in range(1, 100):
+        path = base if n == 1 else base.with_name(f"{base.name}_{n}")
+        if path.exists():
+            continue
+        try:
+            if rename_from:
+                Path(rename_from).rename(path)
+            else:
+                path.mkdir(parents=True)
+        except OSError:
+            continue  # claimed by a concurrent run in the meantime
+        return str(path)
+    raise RuntimeError(f"Could not create an output directory under {base}")
 
 
-def _init_output_dir(company_name: str) -> str:
+def _init_output_dir(company_name: str, output_root: str = ".") -> str:
     """Create a timestamped output directory and initialise references.md."""
-    slug = re.sub(r"[^a-z0-9]+", "_", company_name.lower()).strip("_")
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    dirname = f"due_diligence_{slug}_{ts}"
-    os.makedirs(dirname, exist_ok=True)
+    dirname = _claim_output_dir(company_name, output_root)
 
     header = (
         f"# Due Diligence Report — {company_name}\n"
@@ -141,6 +233,138 @@ def _init_output_dir(company_name: str) -> str:
     return dirname
 
 
+def _input_hash(*inputs: Any) -> str:
+    """Fingerprint of everything a stage's output depends on (prompts and data)."""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _stage_file(stage: str) -> str:
+    """The file in the output dir that holds a stage's complete output."""
+    if stage.startswith("specialist:"):
+        return f"{stage.split(':', 1)[1]}.json"
+    return STAGE_FILES[stage]
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def _read_stage_file(output_dir: str, rel_path: str) -> Any:
+    path = Path(output_dir) / rel_path
+    return json.loads(path.read_text()) if path.suffix == ".json" else path.read_text()
+
+
+def _load_checkpoint(output_dir: str) -> dict[str, Any]:
+    path = Path(output_dir) / CHECKPOINT_FILE
+    if path.is_file():
+        return json.loads(path.read_text())
+    # Output dirs from before checkpoints: the seed output names the company, and
+    # the stage files are adopted as each stage comes up (see _checkpointed_output)
+    profile = Path(output_dir) / STAGE_FILES["seed"]
+    if profile.is_file():
+        return {"company_url": json.loads(profile.read_text()).get("seed_url")}
+    return {}
+
+
+def _save_checkpoint(
+    results: DueDiligenceResults,
+    stage: str,
+    input_hash: str,
+    error: str | None = None,
+) -> None:
+    """
+    Record a stage in checkpoint.json. The manifest looks like:
+
+      {"company_url": ..., "stages": {"seed": {"status": "complete",
+        "input_hash": ..., "path": "company_profile.json", "output_hash": ...,
+        "error": null, "updated": ...}, ...}}
+
+    with one stage per specialist ("specialist:<result_key>"). Outputs stay in
+    their stage files; output_hash catches a file that was edited or replaced.
+    """
+    with results.lock:
+        rel_path = _stage_file(stage)
+        results.checkpoint["company_url"] = results.company_url
+        results.checkpoint.setdefault("stages", {})[stage] = {
+            "status": "failed" if error else "complete",
+            "input_hash": input_hash,
+            "path": None if error else rel_path,
+            "output_hash": (
+                None if error else _file_hash(Path(results.output_dir) / rel_path)
+            ),
+            "error": error,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        path = Path(results.output_dir) / CHECKPOINT_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(results.checkpoint, indent=2))
+        os.replace(tmp, path)
+
+
+def _checkpointed_output(
+    results: DueDiligenceResults, stage: str, input_hash: str
+) -> Any | None:
+    """The stage's saved output if it completed with the same inputs, else None."""
+    entry = results.checkpoint.get("stages", {}).get(stage)
+    if entry is None:
+        return _adopt_stage_file(results, stage, input_hash)
+    if entry["status"] != "complete" or entry["input_hash"] != input_hash:
+        return None
+    if "output" in entry:  # manifests that held the outputs inline
+        return entry["output"]
+    path = Path(results.output_dir) / entry["path"]
+    if not path.is_file() or _file_hash(path) != entry["output_hash"]:
+        return None
+    return _read_stage_file(results.output_dir, entry["path"])
+
+
+def _adopt_stage_file(
+    results: DueDiligenceResults, stage: str, input_hash: str
+) -> Any | None:
+    """
+    Seed the checkpoint from a stage file that has no record, as in output dirs
+    written before checkpoints. Its inputs weren't recorded, so they are taken
+    to be the current ones.
+    """
+    rel_path = _stage_file(stage)
+    if not results.output_dir or not (Path(results.output_dir) / rel_path).is_file():
+        return None
+    try:
+        output = _read_stage_file(results.output_dir, rel_path)
+    except (OSError, ValueError):
+        return None
+    _save_checkpoint(results, stage, input_hash)
+    print(f"\n📥 [{stage}] Seeded checkpoint from existing {rel_path}")
+    return output
+
+
+def _failed_stages(results: DueDiligenceResults) -> dict[str, str]:
+    """Stages whose latest run failed, with their errors."""
+    return {
+        stage: entry["error"]
+        for stage, entry in results.checkpoint.get("stages", {}).items()
+        if entry["status"] == "failed"
+    }
+
+
+def _run_stage(
+    results: DueDiligenceResults, stage: str, input_hash: str, run: Callable[[], Any]
+) -> Any:
+    """Return the checkpointed output if the inputs are unchanged, else run the stage."""
+    output = _checkpointed_output(results, stage, input_hash)
+    if output is not None:
+        print(f"\n⏭️  [{stage}] Inputs unchanged, loaded from checkpoint")
+        return output
+    try:
+        output = run()
+    except Exception as e:
+        _save_checkpoint(results, stage, input_hash, error=str(e))
+        raise
+    _save_checkpoint(results, stage, input_hash)
+    return output
+
+
 def _extract_json(text: str) -> dict | None:
     """Try to extract a JSON object from a string."""
     try:
@@ -158,9 +382,10 @@ def _extract_json(text: str) -> dict | None:
 # ---------------------------------------------------------------------------
 
 
-def make_agent_pair(name: str, system_message: str):
+def make_agent_pair(name: str, system_message: str, stats: ScrapeStats | None = None):
     """
     Returns an (AssistantAgent, UserProxyAgent) pair with tinyfish registered.
+    Scrapes go through the shared scrape cache and are counted in the run's stats.
     """
     assistant = AssistantAgent(
         name=name,
@@ -178,15 +403,30 @@ def make_agent_pair(name: str, system_message: str):
         code_execution_config=False,
     )
 
-    tinyfish_tool.register_for_llm(assistant)
-    tinyfish_tool.register_for_execution(proxy)
+    def tinyfish_scrape(
+        url: Annotated[str, "URL of the page to scrape"],
+        goal: Annotated[str, "What to extract from the page"],
+    ) -> str:
+        result = scrape_cache.scrape(url, goal, stats=stats)
+        return result if isinstance(result, str) else json.dumps(result, default=str)
+
+    register_function(
+        tinyfish_scrape,
+        caller=assistant,
+        executor=proxy,
+        name=tinyfish_tool.name,
+        description=tinyfish_tool.description,
+    )
     return assistant, proxy
 
 
-def _run_agent_chat(name: str, system_message: str, message: str) -> dict:
+def _run_agent_chat(
+    name: str, system_message: str, message: str, stats: ScrapeStats | None = None
+) -> dict:
     """Run a single agent conversation and return extracted JSON."""
-    assistant, proxy = make_agent_pair(name, system_message)
-    proxy.initiate_chat(assistant, message=message)
+    assistant, proxy = make_agent_pair(name, system_message, stats)
+    with LLM_SLOTS:
+        proxy.initiate_chat(assistant, message=message)
     last_msg = proxy.last_message(assistant)["content"]
     return _extract_json(last_msg) or {"raw": last_msg}
 
@@ -196,24 +436,25 @@ def _run_agent_chat(name: str, system_message: str, message: str) -> dict:
 # ---------------------------------------------------------------------------
 
 
-def run_seed_crawler(company_url: str, output_dir: str) -> dict:
+def run_seed_crawler(results: DueDiligenceResults) -> dict:
     """Crawl the company's own website to build initial CompanyProfile."""
     print("\n" + "=" * 60)
-    print("STAGE 1: Seed Crawler")
+    print(f"STAGE 1: Seed Crawler ({results.company_url})")
     print("=" * 60)
 
     profile = _run_agent_chat(
         "SeedCrawler",
         SEED_CRAWLER,
-        SEED_CRAWLER_MSG.format(url=company_url),
+        SEED_CRAWLER_MSG.format(url=results.company_url),
+        results.scrape_stats,
     )
 
-    profile["seed_url"] = company_url
-    with results_lock:
+    profile["seed_url"] = results.company_url
+    with results.lock:
         results.seed = profile
 
     _save_agent_output(
-        output_dir,
+        results.output_dir,
         [
             (
                 "company_profile.json",
@@ -251,6 +492,7 @@ def run_seed_crawler(company_url: str, output_dir: str) -> dict:
             company_name=p["company_name"],
             seed_url=p["seed_url"],
             team_urls=", ".join(p.get("team_page_urls") or []) or "none found",
+            team_goal=TEAM_PAGE_GOAL,
         ),
         "build_output": lambda data: (
             [
@@ -305,6 +547,7 @@ def run_seed_crawler(company_url: str, output_dir: str) -> dict:
         "build_message": lambda p, _: PRESS_MSG.format(
             company_name=p["company_name"],
             press_urls=", ".join(p.get("press_page_urls") or []) or "none found",
+            press_goal=PRESS_PAGE_GOAL,
         ),
         "build_output": lambda data: (
             [
@@ -385,58 +628,127 @@ def run_seed_crawler(company_url: str, output_dir: str) -> dict:
 ]
 
 
-def _run_specialist(spec: dict, profile: dict, output_dir: str) -> dict:
+def _seed_pages(profile: dict) -> list[tuple[str, str]]:
+    """The (url, goal) pairs specialists will scrape for pages the seed crawler found."""
+    return [(url, TEAM_PAGE_GOAL) for url in profile.get("team_page_urls") or []] + [
+        (url, PRESS_PAGE_GOAL) for url in profile.get("press_page_urls") or []
+    ]
+
+
+def _run_specialist(spec: dict, results: DueDiligenceResults) -> dict:
     """Run a single specialist agent: chat, store results, save files."""
     label = spec["section_title"]
     print(f"\n  🔍 [{label}] Starting...")
 
-    message = spec["build_message"](profile, output_dir)
-    data = _run_agent_chat(spec["name"], spec["system_msg"], message)
+    message = spec["build_message"](results.seed, results.output_dir)
+    data = _run_agent_chat(
+        spec["name"], spec["system_msg"], message, results.scrape_stats
+    )
 
-    with results_lock:
+    with results.lock:
         setattr(results, spec["result_key"], data)
 
     output_files = spec["build_output"](data)
-    _save_agent_output(output_dir, output_files, label)
+    # The checkpoint needs the complete output in one file, even when it is split
+    stage_file = _stage_file(f"specialist:{spec['result_key']}")
+    if stage_file not in [path for path, _, _ in output_files]:
+        output_files.append((stage_file, data, f"Complete {label.lower()} data"))
+    _save_agent_output(results.output_dir, output_files, label)
 
     print(f"  ✅ [{label}] Complete")
     return data
 
 
+# ---------------------------------------------------------------------------
+# Prompt packing (validator and synthesis inputs)
+# ---------------------------------------------------------------------------
+
+
+def _summarize_section(section: str, text: str, max_tokens: int) -> str:
+    """One summarizer call of the map-reduce step in prompt_packing.summarize_section."""
+    assistant = AssistantAgent(
+        name="SectionSummarizer",
+        system_message=SECTION_SUMMARIZER,
+        llm_config=LLM_CONFIG,
+    )
+    proxy = UserProxyAgent(
+        name="summarizer_proxy",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=0,
+        code_execution_config=False,
+    )
+    with LLM_SLOTS:
+        proxy.initiate_chat(
+            assistant,
+            message=SECTION_SUMMARIZER_MSG.format(
+                section=section, max_tokens=max_tokens, data=text
+            ),
+            max_turns=1,
+        )
+    return proxy.last_message(assistant)["content"].strip()
+
+
+def _pack_prompt_data(
+    results: DueDiligenceResults, stage: str, sections: dict[str, Any], budget: int
+) -> PackedPrompt:
+    """Pack the sections for a stage prompt and record the token counts."""
+    packed = pack_sections(sections, budget, _summarize_section)
+    print(f"  📦 [{stage}] Prompt data packed: {packed.summary()}")
+    _save_agent_output(
+        results.output_dir,
+        [
+            (
+                f"prompt_packing/{stage}.json",
+                packed.as_dict(),
+                f"Token counts per section: {packed.summary()}",
+            )
+        ],
+        f"Prompt Packing ({stage.title()})",
+    )
+    return packed
+
+
 # ---------------------------------------------------------------------------
 # Stage 3: Validator Agent
 # ---------------------------------------------------------------------------
 
 
-def run_validator(company_name: str, output_dir: str) -> list[str]:
+def _validation_notes(data: dict) -> list[str]:
+    return [
+        *data.get("contradictions", []),
+        *data.get("missing_critical", []),
+        data.get("gaps_summary", ""),
+    ]
+
+
+def _validator_sections(results: DueDiligenceResults) -> dict[str, Any]:
+    return {
+        "company": results.seed.get("company_name", "Unknown Company"),
+        **{key: getattr(results, key) for key in SPECIALIST_KEYS},
+    }
+
+
+def run_validator(results: DueDiligenceResults) -> dict:
     print("\n" + "=" * 60)
     print("STAGE 3: Validator")
     print("=" * 60)
 
-    summary = json.dumps(
-        {
-            "company": company_name,
-            **{key: getattr(results, key) for key in SPECIALIST_KEYS},
-        },
-        indent=2,
+    packed = _pack_prompt_data(
+        results, "validator", _validator_sections(results), VALIDATOR_TOKEN_BUDGET
     )
-
     data = _run_agent_chat(
         "ValidatorAgent",
         VALIDATOR,
-        f"Validate this due diligence data and flag issues:\n\n{summary}",
+        f"Validate this due diligence data and flag issues.\n"
+        f"{PACKED_DATA_NOTE}\n\n{packed.text}",
+        results.scrape_stats,
     )
 
-    notes = [
-        *data.get("contradictions", []),
-        *data.get("missing_critical", []),
-        data.get("gaps_summary", ""),
-    ]
-    with results_lock:
-        results.validation_notes = notes
+    with results.lock:
+        results.validation_notes = _validation_notes(data)
 
     _save_agent_output(
-        output_dir,
+        results.output_dir,
         [
             (
                 "validation_notes.json",
@@ -450,7 +762,7 @@ def run_validator(company_name: str, output_dir: str) -> list[str]:
     print(
         f"  ✅ Validation complete. Confidence: {data.get('overall_confidence', 'unknown')}"
     )
-    return notes
+    return data
 
 
 # ---------------------------------------------------------------------------
@@ -458,7 +770,16 @@ def run_validator(company_name: str, output_dir: str) -> list[str]:
 # ---------------------------------------------------------------------------
 
 
-def run_synthesis(company_name: str, output_dir: str) -> str:
+def _synthesis_sections(results: DueDiligenceResults) -> dict[str, Any]:
+    return {
+        "company_name": results.seed.get("company_name", "Unknown Company"),
+        "seed": results.seed,
+        **{key: getattr(results, key) for key in SPECIALIST_KEYS},
+        "validation_notes": results.validation_notes,
+    }
+
+
+def run_synthesis(results: DueDiligenceResults) -> str:
     print("\n" + "=" * 60)
     print("STAGE 4: Synthesis")
     print("=" * 60)
@@ -477,26 +798,24 @@ def run_synthesis(company_name: str, output_dir: str) -> str:
         code_execution_config=False,
     )
 
-    all_data = {
-        "company_name": company_name,
-        "seed": results.seed,
-        **{key: getattr(results, key) for key in SPECIALIST_KEYS},
-        "validation_notes": results.validation_notes,
-    }
-
-    proxy.initiate_chat(
-        assistant,
-        message=f"Write a due diligence report from this data:\n\n{json.dumps(all_data, indent=2)}",
+    packed = _pack_prompt_data(
+        results, "synthesis", _synthesis_sections(results), SYNTHESIS_TOKEN_BUDGET
     )
+    with LLM_SLOTS:
+        proxy.initiate_chat(
+            assistant,
+            message=f"Write a due diligence report from this data.\n"
+            f"{PACKED_DATA_NOTE}\n\n{packed.text}",
+        )
 
     report = (
         proxy.last_message(assistant)["content"].replace("TASK_COMPLETE", "").strip()
     )
-    with results_lock:
+    with results.lock:
         results.final_report = report
 
     _save_agent_output(
-        output_dir,
+        results.output_dir,
         [("report.md", report, "Synthesized due diligence report")],
         "Final Report",
     )
@@ -509,8 +828,129 @@ def run_synthesis(company_name: str, output_dir: str) -> str:
 # ---------------------------------------------------------------------------
 
 
-def run_due_diligence(company_url: str) -> str:
-    """Run the full due diligence pipeline. Returns the output directory path."""
+def run_pipeline(results: DueDiligenceResults, output_root: str = ".") -> None:
+    """
+    Run (or resume) the pipeline for results.company_url.
+
+    Every stage is keyed by a hash of its inputs (prompts plus upstream outputs).
+    Stages in results.checkpoint that completed with the same inputs are loaded
+    instead of re-run, so a resume only repeats failed or missing stages and
+    whatever depends on an output that changed.
+    """
+    # Stage 1 — Seed crawl (must happen first, provides context to specialists)
+    seed_message = SEED_CRAWLER_MSG.format(url=results.company_url)
+    seed_hash = _input_hash(SEED_CRAWLER, seed_message)
+    seed = _checkpointed_output(results, "seed", seed_hash)
+    if seed is not None:
+        results.seed = seed
+        print("\n⏭️  [seed] Inputs unchanged, loaded from checkpoint")
+    else:
+        created_dir = not results.output_dir
+        if created_dir:
+            results.output_dir = _init_output_dir("unknown", output_root)
+        profile = _run_stage(
+            results, "seed", seed_hash, lambda: run_seed_crawler(results)
+        )
+
+        if created_dir:
+            # Rename the output dir now that we know the company name
+            company_name = profile.get("company_name", "Unknown Company")
+            output_dir = _claim_output_dir(
+                company_name, output_root, rename_from=results.output_dir
+            )
+            refs_path = Path(output_dir) / "references.md"
+            refs_path.write_text(
+                refs_path.read_text().replace(
+                    "Due Diligence Report — unknown",
+                    f"Due Diligence Report — {company_name}",
+                )
+            )
+            with results.lock:
+                results.output_dir = output_dir
+
+    # Stage 2 — Run the specialists without an up-to-date checkpoint in parallel threads
+    pending = []
+    for spec in SPECIALISTS:
+        stage = f"specialist:{spec['result_key']}"
+        input_hash = _input_hash(
+            spec["system_msg"], spec["build_message"](results.seed, results.output_dir)
+        )
+        data = _checkpointed_output(results, stage, input_hash)
+        if data is None:
+            pending.append((spec, stage, input_hash))
+        else:
+            setattr(results, spec["result_key"], data)
+
+    print("\n" + "=" * 60)
+    print(
+        f"STAGE 2: Parallel Specialist Agents ({len(pending)} threads, "
+        f"{len(SPECIALISTS) - len(pending)} loaded from checkpoint)"
+    )
+    print("=" * 60)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending) + 1) as executor:
+            # Warm the cache with the seed-discovered pages alongside the specialists;
+            # a specialist asking for one of them while it is in flight waits for it.
+            executor.submit(
+                scrape_cache.prefetch, _seed_pages(results.seed), results.scrape_stats
+            )
+            futures = {
+                executor.submit(
+                    _run_stage,
+                    results,
+                    stage,
+                    input_hash,
+                    lambda spec=spec: _run_specialist(spec, results),
+                ): spec
+                for spec, stage, input_hash in pending
+            }
+            for future in as_completed(futures):
+                spec = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"  ❌ [{spec['section_title']}] Failed: {e}")
+                    with results.lock:
+                        setattr(results, spec["result_key"], {"error": str(e)})
+
+    # Stage 3 — Validate
+    validation = _run_stage(
+        results,
+        "validator",
+        _input_hash(VALIDATOR, VALIDATOR_TOKEN_BUDGET, _validator_sections(results)),
+        lambda: run_validator(results),
+    )
+    results.validation_notes = _validation_notes(validation)
+
+    # Stage 4 — Synthesize
+    results.final_report = _run_stage(
+        results,
+        "synthesis",
+        _input_hash(SYNTHESIS, SYNTHESIS_TOKEN_BUDGET, _synthesis_sections(results)),
+        lambda: run_synthesis(results),
+    )
+
+    stats = results.scrape_stats
+    if stats.requests:
+        _save_agent_output(
+            results.output_dir,
+            [
+                (
+                    "scrape_cache.json",
+                    stats.as_dict(),
+                    f"Scrape cache: {stats.summary()}",
+                )
+            ],
+            "Scrape Cache",
+        )
+    print(f"\n🗄️  Scrape cache: {stats.summary()}")
+
+
+def run_due_diligence(
+    company_url: str, output_dir: str | None = None, output_root: str = "."
+) -> DueDiligenceResults:
+    """Run the full due diligence pipeline, resuming from output_dir if given."""
     print(
         f"""
 ╔══════════════════════════════════════════════════════════╗
@@ -522,62 +962,141 @@ def run_due_diligence(company_url: str) -> str:
 """
     )
 
-    # Stage 1 — Seed crawl (must happen first, provides context to specialists)
-    temp_dir = _init_output_dir("unknown")
-    profile = run_seed_crawler(company_url, temp_dir)
-
-    company_name = profile.get("company_name", "Unknown Company")
-
-    # Rename the output dir now that we know the company name
-    slug = re.sub(r"[^a-z0-9]+", "_", company_name.lower()).strip("_")
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_dir = f"due_diligence_{slug}_{ts}"
-    Path(temp_dir).rename(output_dir)
-
-    refs_path = Path(output_dir) / "references.md"
-    refs_path.write_text(
-        refs_path.read_text().replace(
-            "Due Diligence Report — unknown",
-            f"Due Diligence Report — {company_name}",
+    results = DueDiligenceResults(company_url=company_url)
+    if output_dir:
+        results.output_dir = output_dir
+        results.checkpoint = _load_checkpoint(output_dir)
+    run_pipeline(results, output_root)
+
+    failed = _failed_stages(results)
+    if failed:
+        print(
+            f"\n⚠️  Report is partial, {', '.join(failed)} failed. "
+            f"Re-run with --resume {results.output_dir} to retry."
         )
-    )
+    print(f"\n📄 Report and data saved to: {results.output_dir}/")
+    return results
 
-    with results_lock:
-        results.output_dir = output_dir
 
-    # Stage 2 — Run all specialist agents in parallel threads
-    print("\n" + "=" * 60)
-    print(f"STAGE 2: Parallel Specialist Agents ({len(SPECIALISTS)} threads)")
-    print("=" * 60)
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
 
-    with ThreadPoolExecutor(max_workers=len(SPECIALISTS)) as executor:
-        futures = {
-            executor.submit(_run_specialist, spec, profile, output_dir): spec
-            for spec in SPECIALISTS
-        }
-        for future in as_completed(futures):
-            spec = futures[future]
-            try:
-                future.result()
-            except Exception as e:
-                print(f"  ❌ [{spec['section_title']}] Failed: {e}")
-                with results_lock:
-                    setattr(results, spec["result_key"], {"error": str(e)})
 
-    # Stage 3 — Validate
-    run_validator(company_name, output_dir)
+def _read_urls(urls_file: str) -> list[str]:
+    """One URL per line; blank lines and # comments are ignored, duplicates dropped."""
+    urls = []
+    for line in Path(urls_file).read_text().splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            urls.append(line)
+    return list(dict.fromkeys(urls))
+
+
+def _write_batch_index(batch_dir: Path, index: dict[str, dict]) -> None:
+    """index.json drives resuming; index.md is the human-readable summary."""
+    tmp = batch_dir / "index.json.tmp"
+    tmp.write_text(json.dumps(index, indent=2))
+    os.replace(tmp, batch_dir / "index.json")
+
+    counts: dict[str, int] = {}
+    for entry in index.values():
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    lines = [
+        f"# Due Diligence Batch — {batch_dir.name}\n",
+        f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n",
+        ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) + "\n\n",
+        "| Company | URL | Status | Confidence | Output |\n",
+        "|---|---|---|---|---|\n",
+    ]
+    for url, entry in index.items():
+        output = entry.get("output_dir")
+        target = "report.md" if entry["status"] in ("complete", "partial") else ""
+        link = f"[{Path(output).name}]({Path(output).name}/{target})" if output else ""
+        status = entry["status"]
+        if entry.get("error"):
+            status += f": {entry['error'][:80]}"
+        lines.append(
+            f"| {entry.get('company_name') or ''} | {url} | {status} "
+            f"| {entry.get('confidence') or ''} | {link} |\n"
+        )
+    (batch_dir / "index.md").write_text("".join(lines))
 
-    # Stage 4 — Synthesize
-    report = run_synthesis(company_name, output_dir)
 
-    print("\n" + "=" * 60)
-    print("FINAL REPORT")
-    print("=" * 60)
-    print(report)
+def run_batch(urls_file: str, max_companies: int = MAX_CONCURRENT_COMPANIES) -> str:
+    """
+    Run the pipeline for every URL in urls_file, max_companies at a time.
 
-    print(f"\n📄 Report and data saved to: {output_dir}/")
+    Outputs go to due_diligence_batch_<file stem>/. A company whose report was
+    written while a specialist stage failed is marked "partial". Re-running the
+    same file skips completed companies and resumes the others (failed, partial
+    or interrupted) from their checkpoints, which retries only the failed stages.
+    Returns the batch directory.
+    """
+    urls = _read_urls(urls_file)
+    batch_dir = Path(f"due_diligence_batch_{Path(urls_file).stem}")
+    batch_dir.mkdir(exist_ok=True)
+    index_path = batch_dir / "index.json"
+    index: dict[str, dict] = (
+        json.loads(index_path.read_text()) if index_path.exists() else {}
+    )
+    index_lock = threading.Lock()
+
+    def update_index(url: str, **entry: Any) -> None:
+        with index_lock:
+            index[url] = {**index.get(url, {}), **entry}
+            _write_batch_index(batch_dir, index)
+
+    def run_company(url: str) -> None:
+        entry = index.get(url, {})
+        results = DueDiligenceResults(company_url=url)
+        if entry.get("output_dir") and Path(entry["output_dir"]).is_dir():
+            results.output_dir = entry["output_dir"]
+            results.checkpoint = _load_checkpoint(results.output_dir)
+        update_index(url, status="running", error=None)
+        try:
+            run_pipeline(results, output_root=str(batch_dir))
+            # Failed specialists don't stop the pipeline; the report lacks their sections
+            failed = _failed_stages(results)
+            update_index(
+                url,
+                status="partial" if failed else "complete",
+                error="; ".join(f"{stage}: {e}" for stage, e in failed.items()) or None,
+                company_name=results.seed.get("company_name"),
+                confidence=_read_stage_file(
+                    results.output_dir, STAGE_FILES["validator"]
+                ).get("overall_confidence"),
+                output_dir=results.output_dir,
+                scrape_cache=results.scrape_stats.summary(),
+                completed_at=datetime.now().isoformat(timespec="seconds"),
+            )
+        except Exception as e:
+            print(f"❌ {url} failed: {e}")
+            update_index(
+                url,
+                status="failed",
+                error=str(e),
+                company_name=results.seed.get("company_name"),
+                output_dir=results.output_dir or None,
+            )
+            return
+        print(f"{'⚠️ ' if failed else '✅'} {url} → {results.output_dir}")
 
-    return output_dir
+    todo = [url for url in urls if index.get(url, {}).get("status") != "complete"]
+    print(
+        f"Batch: {len(urls)} companies, {len(urls) - len(todo)} already complete, "
+        f"{max_companies} at a time"
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=max_companies) as executor:
+            list(executor.map(run_company, todo))
+    finally:
+        # Also on Ctrl+C or an unexpected error, so no finished company is lost
+        with index_lock:
+            _write_batch_index(batch_dir, index)
+    print(f"\n🗄️  Scrape cache (all companies): {scrape_cache.stats.summary()}")
+    print(f"📋 Batch index: {batch_dir / 'index.md'}")
+    return str(batch_dir)
 
 
 # ---------------------------------------------------------------------------
@@ -596,11 +1115,18 @@ def run_qa_session(output_dir: str) -> None:
     # Build a file listing so the agent knows what's available
     available_files: list[str] = []
     for fpath in sorted(output_path.rglob("*")):
-        if fpath.is_file() and fpath.suffix in (".json", ".md"):
+        if is_report_file(output_path, fpath):
             available_files.append(str(fpath.relative_to(output_path)))
 
     file_listing = "\n".join(f"  - {f}" for f in available_files)
 
+    index = ReportIndex.load_or_build(output_dir)
+    print(f"🔎 Indexed {len(index.chunks)} snippets from {len(index.files)} files")
+
+    def search_report(query: str, k: int = 5) -> str:
+        """Search the report for snippets relevant to the query. Returns the top k with file and path references."""
+        return index.format_results(query, max(1, min(k, 20)))
+
     def read_report_file(filename: str) -> str:
         """Read a file from the due diligence report directory. Pass the relative path (e.g. 'investors.json')."""
         target = output_path / filename
@@ -635,6 +1161,13 @@ def is_termination_msg(msg: dict) -> bool:
         code_execution_config=False,
     )
 
+    register_function(
+        search_report,
+        caller=assistant,
+        executor=proxy,
+        name="search_report",
+        description="Keyword search over the due diligence report. Returns the k most relevant snippets, each with its file and JSON path or section heading.",
+    )
     register_function(
         read_report_file,
         caller=assistant,
@@ -648,6 +1181,8 @@ def is_termination_msg(msg: dict) -> bool:
     print('Type your questions below. Type "exit" or "quit" to stop.')
     print("=" * 60)
 
+    history: list[tuple[str, str]] = []
+
     while True:
         try:
             question = input("\nQ: ").strip()
@@ -658,8 +1193,19 @@ def is_termination_msg(msg: dict) -> bool:
             print("Exiting Q&A.")
             break
 
-        proxy.initiate_chat(assistant, message=question, clear_history=False)
+        # Each question starts a fresh chat so earlier tool output (search results,
+        # whole files) isn't resent; the last few answers are kept for follow-ups
+        message = question
+        if history:
+            message = QA_FOLLOW_UP_MSG.format(
+                history="\n\n".join(
+                    f"Q: {q}\nA: {a}" for q, a in history[-QA_HISTORY_TURNS:]
+                ),
+                question=question,
+            )
+        proxy.initiate_chat(assistant, message=message, clear_history=True)
         answer = assistant.last_message(proxy)["content"]
+        history.append((question, answer.removesuffix("<END>").strip()))
         print(f"\nA: {answer}")
 
 
@@ -670,18 +1216,65 @@ def is_termination_msg(msg: dict) -> bool:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run due diligence on a company.")
     parser.add_argument("--url", help="Company website URL (runs the full pipeline)")
+    parser.add_argument(
+        "--urls-file",
+        help="File with one company URL per line (runs the pipelines concurrently, no Q&A)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="OUTPUT_DIR",
+        help="Resume an interrupted run from its output folder, re-running only "
+        "failed, missing or out-of-date stages",
+    )
     parser.add_argument(
         "--report-path",
         help="Path to an existing report folder (skips pipeline, enters Q&A directly)",
     )
+    parser.add_argument(
+        "--max-companies",
+        type=int,
+        default=MAX_CONCURRENT_COMPANIES,
+        help="Batch mode: company pipelines to run at once",
+    )
+    parser.add_argument(
+        "--max-chats",
+        type=int,
+        default=MAX_CONCURRENT_CHATS,
+        help="Cap on concurrent LLM chats across all pipelines",
+    )
+    parser.add_argument(
+        "--max-scrapes",
+        type=int,
+        default=MAX_CONCURRENT_SCRAPES,
+        help="Cap on concurrent TinyFish scrapes across all pipelines",
+    )
     args = parser.parse_args()
+    set_concurrency_limits(args.max_chats, args.max_scrapes)
 
     if args.report_path:
         if not Path(args.report_path).is_dir():
             parser.error(f"Report directory not found: {args.report_path}")
         run_qa_session(args.report_path)
-    elif args.url:
-        output_dir = run_due_diligence(args.url)
-        run_qa_session(output_dir)
+    elif args.urls_file:
+        if not Path(args.urls_file).is_file():
+            parser.error(f"URLs file not found: {args.urls_file}")
+        run_batch(args.urls_file, args.max_companies)
+    elif args.url or args.resume:
+        if args.resume:
+            checkpoint = _load_checkpoint(args.resume)
+            if not checkpoint.get("company_url"):
+                parser.error(f"No {CHECKPOINT_FILE} found in {args.resume}")
+            results = run_due_diligence(checkpoint["company_url"], args.resume)
+        else:
+            results = run_due_diligence(args.url)
+
+        print("\n" + "=" * 60)
+        print("FINAL REPORT")
+        print("=" * 60)
+        print(results.final_report)
+
+        run_qa_session(results.output_dir)
     else:
-        parser.error("Either --url or --report-path is required.")
+        parser.error(
+            "One of --url, --urls-file, --resume or --report-path is required."
+        )
@@ -0,0 +1,324 @@
+"""
+Packs the collected due diligence data into the validator and synthesis prompts.
+
+Dumping every specialist's output with indent=2 wastes tokens on whitespace,
+repeats the same people and investors across sections, and lets one large
+LinkedIn or press list push the prompt past the context window. pack_sections:
+
+  1. de-duplicates entities (dicts with a name, url or title) across sections,
+     replacing repeats with a reference to the first occurrence that is kept
+     verbatim (never one in a section that gets summarized or truncated)
+  2. drops empty fields and serializes compactly
+  3. splits the token budget across sections (small sections keep all they need,
+     the rest is shared by the large ones)
+  4. summarizes sections over their budget map-reduce style: pieces of the
+     section are summarized in parallel, then the partial summaries are merged
+     until they fit
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection
+
+from autogen.token_count_utils import count_token
+
+TOKEN_MODEL = "gpt-4o"
+# Largest piece of a section sent to one summarizer call in the map step
+MAP_PIECE_TOKENS = 6000
+MAX_REDUCE_ROUNDS = 3
+ENTITY_KEYS = ("name", "url", "title")
+
+# (section name, text, target tokens) -> summary text
+Summarizer = Callable[[str, str, int], str]
+
+
+def count_tokens(text: str) -> int:
+    return count_token(text, model=TOKEN_MODEL)
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# ---------------------------------------------------------------------------
+# De-duplication and pruning
+# ---------------------------------------------------------------------------
+
+_DROP = object()
+
+
+def _entity_key(value: dict) -> tuple[str, str] | None:
+    for key in ENTITY_KEYS:
+        if isinstance(value.get(key), str) and value[key].strip():
+            return key, " ".join(value[key].lower().split())
+    return None
+
+
+def dedupe_entities(
+    sections: dict[str, Any], shrunk: Collection[str] = ()
+) -> tuple[dict[str, Any], int]:
+    """
+    Replaces repeated entities with {"name": ..., "see": "<path of first>"} plus
+    any fields that differ from the first occurrence. Exact repeats within the
+    same list are dropped. Entities in the shrunk sections are never referred
+    to, as they will not survive packing. Returns the new sections and the
+    number of repeats.
+    """
+    seen: dict[tuple[str, str], tuple[str, dict]] = {}
+    repeats = 0
+
+    def walk(
+        value: Any, path: str, referable: bool, parent_list: str | None = None
+    ) -> Any:
+        nonlocal repeats
+        if isinstance(value, list):
+            items = (
+                walk(item, f"{path}[{i}]", referable, path)
+                for i, item in enumerate(value)
+            )
+            return [item for item in items if item is not _DROP]
+        if not isinstance(value, dict):
+            return value
+
+        key = _entity_key(value)
+        if key is not None:
+            if key in seen:
+                first_path, first = seen[key]
+                repeats += 1
+                extra = {
+                    k: v for k, v in value.items() if k != key[0] and first.get(k) != v
+                }
+                if (
+                    not extra
+                    and parent_list
+                    and first_path.startswith(parent_list + "[")
+                ):
+                    return _DROP
+                return {key[0]: value[key[0]], "see": first_path, **extra}
+            if referable:
+                seen[key] = (path, value)
+        return {k: walk(v, f"{path}.{k}", referable) for k, v in value.items()}
+
+    deduped = {
+        name: walk(value, name, name not in shrunk) for name, value in sections.items()
+    }
+    return deduped, repeats
+
+
+def prune_empty(value: Any) -> Any:
+    """Drops None, empty strings, lists and dicts from objects, recursively."""
+    if isinstance(value, dict):
+        pruned = {k: prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [prune_empty(v) for v in value]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Budgeting
+# ---------------------------------------------------------------------------
+
+
+def allocate_budget(sizes: dict[str, int], total: int) -> dict[str, int]:
+    """
+    Water-filling split of total tokens: sections under the fair share get their
+    full size, and what they leave over is shared among the larger ones.
+    """
+    budgets: dict[str, int] = {}
+    remaining = dict(sizes)
+    left = total
+    while remaining:
+        share = left / len(remaining)
+        small = {name: size for name, size in remaining.items() if size <= share}
+        if not small:
+            budgets.update({name: int(share) for name in remaining})
+            break
+        for name, size in small.items():
+            budgets[name] = size
+            left -= size
+            del remaining[name]
+    return budgets
+
+
+# ---------------------------------------------------------------------------
+# Map-reduce summarization
+# ---------------------------------------------------------------------------
+
+
+def _split(value: Any, max_tokens: int) -> list[str]:
+    """Splits a section into compact JSON pieces of at most ~max_tokens each."""
+    if isinstance(value, dict):
+        items = [{k: v} for k, v in value.items()]
+    elif isinstance(value, list):
+        items = value
+    else:
+        items = [value]
+
+    pieces, current, current_tokens = [], [], 0
+    for item in items:
+        text = compact_json(item)
+        tokens = count_tokens(text)
+        if tokens > max_tokens:
+            # A single huge entry (e.g. {"articles": [...]}) is split on its own
+            inner = item
+            if isinstance(inner, dict) and len(inner) == 1:
+                inner = next(iter(inner.values()))
+            if isinstance(inner, (dict, list)) and len(inner) > 1:
+                pieces.extend(_split(inner, max_tokens))
+                continue
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(compact_json(current))
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        pieces.append(compact_json(current))
+    return pieces
+
+
+def summarize_section(name: str, value: Any, budget: int, summarize: Summarizer) -> str:
+    """Map: summarize each piece of the section. Reduce: merge until it fits."""
+    pieces = _split(value, MAP_PIECE_TOKENS)
+    per_piece = max(200, budget // len(pieces))
+    with ThreadPoolExecutor(max_workers=min(4, len(pieces))) as executor:
+        partials = list(
+            executor.map(lambda piece: summarize(name, piece, per_piece), pieces)
+        )
+
+    for _ in range(MAX_REDUCE_ROUNDS):
+        combined = "\n".join(partials)
+        if len(partials) == 1 or count_tokens(combined) <= budget:
+            break
+        # Merge neighbouring partial summaries pairwise
+        groups = ["\n".join(partials[i : i + 2]) for i in range(0, len(partials), 2)]
+        per_group = max(200, budget // len(groups))
+        with ThreadPoolExecutor(max_workers=min(4, len(groups))) as executor:
+            partials = list(
+                executor.map(lambda group: summarize(name, group, per_group), groups)
+            )
+    return "\n".join(partials)
+
+
+# ---------------------------------------------------------------------------
+# Packing
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class PackedPrompt:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    repeated_entities: int = 0
+    # section -> {"before", "after", "budget", "summarized"}
+    sections: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        summarized = [n for n, s in self.sections.items() if s["summarized"]]
+        return (
+            f"{self.tokens_before:,} → {self.tokens_after:,} tokens "
+            f"({self.repeated_entities} repeated entities folded"
+            + (f", summarized: {', '.join(summarized)}" if summarized else "")
+            + ")"
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "repeated_entities": self.repeated_entities,
+            "sections": self.sections,
+        }
+
+
+def pack_sections(
+    sections: dict[str, Any], budget: int, summarize: Summarizer | None = None
+) -> PackedPrompt:
+    """
+    Packs sections into compact JSON of roughly at most budget tokens.
+    Without a summarizer, oversized list sections are cut to fit instead.
+    """
+    tokens_before = count_tokens(json.dumps(sections, indent=2, default=str))
+
+    # Repeats may only point at entities that are kept verbatim. Expanding the
+    # references into a shrunk section makes the others larger, which can push
+    # another section over its budget, so repeat until the set is stable.
+    shrunk: set[str] = set()
+    while True:
+        deduped, repeats = dedupe_entities(sections, shrunk)
+        pruned = {name: prune_empty(value) for name, value in deduped.items()}
+        pruned = {
+            name: value
+            for name, value in pruned.items()
+            if value not in (None, "", [], {})
+        }
+        sizes = {
+            name: count_tokens(compact_json(value)) for name, value in pruned.items()
+        }
+        budgets = allocate_budget(sizes, budget)
+        oversized = [name for name in pruned if sizes[name] > budgets[name]]
+        if shrunk.issuperset(oversized):
+            break
+        shrunk.update(oversized)
+
+    packed = dict(pruned)
+    summarized: set[str] = set()
+
+    def shrink(name: str) -> Any:
+        if summarize is not None:
+            try:
+                value = summarize_section(name, pruned[name], budgets[name], summarize)
+                summarized.add(name)
+                return value
+            except Exception as e:
+                print(f"  ⚠️  Summarizing {name} failed, truncating instead: {e}")
+        return _truncate(pruned[name], budgets[name])
+
+    if oversized:
+        with ThreadPoolExecutor(max_workers=len(oversized)) as executor:
+            for name, value in zip(oversized, executor.map(shrink, oversized)):
+                packed[name] = value
+
+    text = compact_json(packed)
+    return PackedPrompt(
+        text=text,
+        tokens_before=tokens_before,
+        tokens_after=count_tokens(text),
+        repeated_entities=repeats,
+        sections={
+            name: {
+                "before": count_tokens(
+                    json.dumps(sections[name], indent=2, default=str)
+                ),
+                "after": count_tokens(compact_json(packed[name])),
+                "budget": budgets[name],
+                "summarized": name in summarized,
+            }
+            for name in packed
+        },
+    )
+
+
+def _truncate(value: Any, budget: int) -> Any:
+    """Keeps the leading entries of the longest lists until the value fits."""
+    if isinstance(value, list):
+        kept = list(value)
+        while len(kept) > 1 and count_tokens(compact_json(kept)) > budget:
+            kept = kept[: max(1, len(kept) * 3 // 4)]
+        if len(kept) < len(value):
+            kept.append({"_truncated": len(value) - len(kept)})
+        return kept
+    if isinstance(value, dict):
+        result = dict(value)
+        for key in sorted(result, key=lambda k: -count_tokens(compact_json(result[k]))):
+            if count_tokens(compact_json(result)) <= budget:
+                break
+            others = count_tokens(
+                compact_json({k: v for k, v in result.items() if k != key})
+            )
+            result[key] = _truncate(result[key], max(50, budget - others))
+        return result
+    text = str(value)
+    return text[: budget * 4]
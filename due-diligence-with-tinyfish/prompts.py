@@ -23,6 +23,15 @@
 
 SEED_CRAWLER_MSG = "Crawl this company URL and extract the CompanyProfile: {url}"
 
+# Goals used to pre-fetch the pages the seed crawler discovers. Specialists are
+# told to reuse them verbatim so their scrapes are served from the scrape cache.
+TEAM_PAGE_GOAL = (
+    "Extract all people named on this page with their titles and profile links."
+)
+PRESS_PAGE_GOAL = (
+    "Extract all article titles, publication names, dates, URLs, and summaries."
+)
+
 # ---------------------------------------------------------------------------
 # Stage 2: Specialist agents
 # ---------------------------------------------------------------------------
@@ -50,7 +59,8 @@
 Seed URL: {seed_url}
 Known team pages: {team_urls}
 
-Use tinyfish to scrape those pages and LinkedIn for employee data."""
+Use tinyfish to scrape those pages and LinkedIn for employee data.
+For the known team pages, use exactly this goal: "{team_goal}\""""
 
 INVESTORS = """\
 You are an investment research specialist. Your job is to find all \
@@ -97,7 +107,8 @@
 Research all press coverage for: {company_name}
 Known press pages: {press_urls}
 
-Scrape the press pages and Google News for coverage."""
+Scrape the press pages and Google News for coverage.
+For the known press pages, use exactly this goal: "{press_goal}\""""
 
 FINANCIALS = """\
 You are a financial research specialist. Your job is to find \
@@ -240,6 +251,28 @@
 Be factual, concise, and note where data was unavailable or uncertain.
 End with TASK_COMPLETE."""
 
+# ---------------------------------------------------------------------------
+# Prompt packing (for the validator and synthesis inputs)
+# ---------------------------------------------------------------------------
+
+PACKED_DATA_NOTE = """\
+The data is compact JSON, one key per research section. An entity that appears \
+more than once is written in full only the first time; later copies are \
+{{"name": ..., "see": "<path of the first copy>"}} plus any fields that differ. \
+Sections that were too large are given as summaries instead of raw JSON."""
+
+SECTION_SUMMARIZER = """\
+You compress due diligence research data so it fits in another analyst's prompt.
+Keep every concrete fact: names with titles, amounts, dates, counts, sources and \
+URLs of the most important items, and any conflicting values. Drop repetition, \
+boilerplate and low-value items first. Output compact JSON only, no commentary."""
+
+SECTION_SUMMARIZER_MSG = """\
+Section: {section}
+Compress this data to at most about {max_tokens} tokens:
+
+{data}"""
+
 # ---------------------------------------------------------------------------
 # Q&A
 # ---------------------------------------------------------------------------
@@ -250,9 +283,19 @@
 
 {file_listing}
 
-Use the read_report_file tool to load any file you need to answer the user's \
-question. You can call it multiple times. Be selective — only load what's relevant.
+Start with the search_report tool: it returns only the most relevant snippets, \
+each with its file and JSON path or section. Search with specific keywords \
+(names, companies, metrics) and search again with other keywords if needed. \
+Use read_report_file only when you need a whole file, for example to count or \
+list every entry. Be selective — only load what's relevant.
 
 If the data doesn't contain the answer, say so.
 
 Terminate your answer with <END> so the user proxy knows when you're done."""
+
+QA_FOLLOW_UP_MSG = """\
+Earlier questions and answers in this session, for context:
+
+{history}
+
+New question: {question}"""
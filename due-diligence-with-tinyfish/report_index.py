@@ -0,0 +1,241 @@
+"""
+Keyword retrieval over a due diligence report directory, for the Q&A session.
+
+Files are split into small chunks that each remember where they came from:
+JSON files are split along their structure (one chunk per list item or per
+group of scalar fields, with a JSON path like $.rounds[2]), markdown files by
+heading and paragraph. Chunks are ranked with BM25. The index is saved as
+report_index.json next to references.md and rebuilt only when a file changes.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+INDEX_FILE = "report_index.json"
+INDEX_VERSION = 1
+# Pipeline bookkeeping, not report content
+EXCLUDED_FILES = {INDEX_FILE, "checkpoint.json", "scrape_cache.json"}
+EXCLUDED_DIRS = {"prompt_packing"}
+MAX_CHUNK_CHARS = 800
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_STOPWORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "by",
+    "did",
+    "do",
+    "does",
+    "for",
+    "from",
+    "has",
+    "have",
+    "how",
+    "in",
+    "is",
+    "it",
+    "its",
+    "many",
+    "much",
+    "of",
+    "on",
+    "or",
+    "the",
+    "their",
+    "they",
+    "this",
+    "to",
+    "was",
+    "were",
+    "what",
+    "when",
+    "where",
+    "which",
+    "who",
+    "with",
+}
+
+
+def _tokens(text: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS]
+
+
+def is_report_file(root: Path, path: Path) -> bool:
+    return (
+        path.is_file()
+        and path.suffix in (".json", ".md")
+        and path.name not in EXCLUDED_FILES
+        and not EXCLUDED_DIRS & set(path.relative_to(root).parts[:-1])
+    )
+
+
+@dataclass
+class Chunk:
+    file: str
+    path: str  # JSON path ($.rounds[2]) or markdown heading (# Executive Summary)
+    text: str
+
+
+# ---------------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------------
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _chunk_json(file: str, value: Any, path: str = "$") -> list[Chunk]:
+    """Keeps a node whole if it is small enough, otherwise splits it by child."""
+    text = _compact(value)
+    if len(text) <= MAX_CHUNK_CHARS or not isinstance(value, (dict, list)):
+        return [Chunk(file, path, text[: MAX_CHUNK_CHARS * 4])]
+
+    chunks = []
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            chunks.extend(_chunk_json(file, item, f"{path}[{i}]"))
+        return chunks
+
+    # Scalar fields of a large object stay together so they keep their context
+    scalars = {k: v for k, v in value.items() if not isinstance(v, (dict, list))}
+    if scalars:
+        chunks.append(Chunk(file, path, _compact(scalars)))
+    for key, child in value.items():
+        if isinstance(child, (dict, list)):
+            chunks.extend(_chunk_json(file, child, f"{path}.{key}"))
+    return chunks
+
+
+def _chunk_markdown(file: str, text: str) -> list[Chunk]:
+    chunks = []
+    heading = ""
+    for section in re.split(r"\n(?=#{1,6} )", text):
+        lines = section.strip().splitlines()
+        if not lines:
+            continue
+        if lines[0].startswith("#"):
+            heading = lines[0].lstrip("#").strip()
+            lines = lines[1:]
+        buffer = ""
+        for paragraph in re.split(r"\n\s*\n", "\n".join(lines)):
+            paragraph = paragraph.strip()
+            if buffer and len(buffer) + len(paragraph) > MAX_CHUNK_CHARS:
+                chunks.append(Chunk(file, f"# {heading}", buffer))
+                buffer = ""
+            buffer = f"{buffer}\n\n{paragraph}".strip()
+        if buffer:
+            chunks.append(Chunk(file, f"# {heading}", buffer))
+    return chunks
+
+
+def chunk_file(root: Path, path: Path) -> list[Chunk]:
+    rel = str(path.relative_to(root))
+    text = path.read_text()
+    if path.suffix == ".json":
+        try:
+            return _chunk_json(rel, json.loads(text))
+        except json.JSONDecodeError:
+            pass
+    return _chunk_markdown(rel, text)
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+class ReportIndex:
+    """BM25 index over the chunks of one report directory."""
+
+    def __init__(self, chunks: list[Chunk], files: dict[str, list[int]]):
+        self.chunks = chunks
+        self.files = files  # rel path -> [size, mtime_ns] the index was built from
+        self.postings: dict[str, dict[int, int]] = {}
+        self.lengths: list[int] = []
+        for i, chunk in enumerate(chunks):
+            # The file name and path are searchable too ("investors", "rounds")
+            tokens = _tokens(f"{chunk.file} {chunk.path} {chunk.text}")
+            self.lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, {})[i] = tf
+        self.avg_length = sum(self.lengths) / len(self.lengths) if chunks else 0.0
+
+    @staticmethod
+    def _report_files(root: Path) -> dict[str, list[int]]:
+        files = {}
+        for path in sorted(root.rglob("*")):
+            if is_report_file(root, path):
+                stat = path.stat()
+                files[str(path.relative_to(root))] = [stat.st_size, stat.st_mtime_ns]
+        return files
+
+    @classmethod
+    def build(cls, output_dir: str) -> "ReportIndex":
+        root = Path(output_dir)
+        files = cls._report_files(root)
+        chunks = [c for rel in files for c in chunk_file(root, root / rel)]
+        return cls(chunks, files)
+
+    @classmethod
+    def load_or_build(cls, output_dir: str) -> "ReportIndex":
+        """Loads the cached index, rebuilding it if any report file changed."""
+        root = Path(output_dir)
+        cache_path = root / INDEX_FILE
+        try:
+            cached = json.loads(cache_path.read_text())
+            if cached["version"] == INDEX_VERSION and cached[
+                "files"
+            ] == cls._report_files(root):
+                return cls([Chunk(**c) for c in cached["chunks"]], cached["files"])
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            pass
+
+        index = cls.build(output_dir)
+        cache_path.write_text(
+            json.dumps(
+                {
+                    "version": INDEX_VERSION,
+                    "files": index.files,
+                    "chunks": [c.__dict__ for c in index.chunks],
+                }
+            )
+        )
+        return index
+
+    def search(self, query: str, k: int = 5) -> list[tuple[float, Chunk]]:
+        n = len(self.chunks)
+        scores: dict[int, float] = {}
+        for term in set(_tokens(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings.items():
+                norm = BM25_K1 * (
+                    1 - BM25_B + BM25_B * self.lengths[i] / self.avg_length
+                )
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(score, self.chunks[i]) for i, score in ranked]
+
+    def format_results(self, query: str, k: int = 5) -> str:
+        hits = self.search(query, k)
+        if not hits:
+            return f"No matches for {query!r}. Try other keywords or read_report_file."
+        return "\n\n".join(
+            f"[{rank}] {chunk.file} {chunk.path} (score {score:.2f})\n{chunk.text}"
+            for rank, (score, chunk) in enumerate(hits, 1)
+        )
@@ -0,0 +1,251 @@
+"""
+Shared cache in front of the TinyFish scrape tool.
+
+Specialists running in parallel threads often scrape the same pages (the team
+and press pages found by the seed crawler, LinkedIn, Crunchbase). The cache
+makes each (url, goal) pair cost one TinyFish call:
+
+  - single-flight: concurrent requests for the same key wait for the one in flight
+  - memory tier for the current process, disk tier (one JSON file per key) across runs
+  - per-domain TTLs, so fast-moving sources like news are re-scraped sooner
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlsplit, urlunsplit
+
+CACHE_DIR = os.environ.get("TINYFISH_CACHE_DIR", ".tinyfish_cache")
+DEFAULT_TTL = float(os.environ.get("TINYFISH_CACHE_TTL_HOURS", "168")) * 3600
+
+# Domain suffix -> TTL in seconds, for sources that change faster than company sites
+TTL_OVERRIDES = {
+    "news.google.com": 6 * 3600,
+    "finance.yahoo.com": 6 * 3600,
+    "twitter.com": 24 * 3600,
+    "x.com": 24 * 3600,
+    "linkedin.com": 3 * 24 * 3600,
+}
+
+Scraper = Callable[[str, str], Any]
+
+
+def normalize_url(url: str) -> str:
+    """Lowercases scheme and host, drops the fragment and any trailing slash."""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    netloc = parts.netloc.lower()
+    if not netloc and parts.path:
+        # "example.com/about" without a scheme
+        netloc, _, path = parts.path.partition("/")
+        path = "/" + path
+    else:
+        path = parts.path
+    return urlunsplit((scheme, netloc, path.rstrip("/") or "/", parts.query, ""))
+
+
+def cache_key(url: str, goal: str) -> str:
+    canonical = normalize_url(url) + "\n" + " ".join(goal.split()).lower()
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def ttl_for(url: str, default: float = DEFAULT_TTL) -> float:
+    host = urlsplit(normalize_url(url)).netloc.split(":")[0]
+    for domain, ttl in TTL_OVERRIDES.items():
+        if host == domain or host.endswith("." + domain):
+            return ttl
+    return default
+
+
+@dataclass
+class ScrapeStats:
+    """Counters for one pipeline run (or for the whole cache)."""
+
+    requests: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    errors: int = 0
+    prefetched: int = 0
+    scrape_seconds: float = 0.0
+    saved_seconds: float = 0.0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def record(self, outcome: str, seconds: float = 0.0) -> None:
+        with self._lock:
+            self.requests += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if outcome in ("misses", "errors"):
+                self.scrape_seconds += seconds
+            else:
+                self.saved_seconds += seconds
+
+    @property
+    def served_from_cache(self) -> int:
+        return self.memory_hits + self.disk_hits + self.coalesced
+
+    def as_dict(self) -> dict[str, Any]:
+        data = {
+            f.name: getattr(self, f.name) for f in fields(self) if f.name != "_lock"
+        }
+        data["served_from_cache"] = self.served_from_cache
+        data["scrape_seconds"] = round(self.scrape_seconds, 1)
+        data["saved_seconds"] = round(self.saved_seconds, 1)
+        return data
+
+    def summary(self) -> str:
+        if not self.requests:
+            return "no scrapes"
+        return (
+            f"{self.served_from_cache} of {self.requests} scrapes served from cache "
+            f"({self.memory_hits} memory, {self.disk_hits} disk, {self.coalesced} shared "
+            f"with a concurrent request), ~{self.saved_seconds:.0f}s of scraping saved"
+        )
+
+
+class ScrapeCache:
+    def __init__(
+        self,
+        scraper: Scraper,
+        cache_dir: str | None = CACHE_DIR,
+        default_ttl: float = DEFAULT_TTL,
+    ):
+        self.scraper = scraper
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.stats = ScrapeStats()
+        self._memory: dict[str, dict[str, Any]] = {}
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    # -------------- Tiers --------------
+    def _fresh(self, entry: dict[str, Any] | None) -> bool:
+        return entry is not None and time.time() - entry["fetched_at"] < entry["ttl"]
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> dict[str, Any] | None:
+        if not self.cache_dir:
+            return None
+        try:
+            return json.loads(self._disk_path(key).read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_disk(self, key: str, entry: dict[str, Any]) -> None:
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(json.dumps(entry, default=str))
+            os.replace(tmp, path)  # atomic, so concurrent runs never read half a file
+        except OSError as e:
+            print(f"  ⚠️  Could not write scrape cache entry: {e}")
+
+    def store(self, url: str, goal: str, result: Any, elapsed: float = 0.0) -> None:
+        key = cache_key(url, goal)
+        entry = {
+            "url": url,
+            "goal": goal,
+            "result": result,
+            "fetched_at": time.time(),
+            "ttl": ttl_for(url, self.default_ttl),
+            "elapsed": elapsed,
+        }
+        with self._lock:
+            self._memory[key] = entry
+        self._write_disk(key, entry)
+
+    # -------------- Lookup --------------
+    def scrape(self, url: str, goal: str, stats: ScrapeStats | None = None) -> Any:
+        """Returns the cached result for (url, goal), scraping it at most once."""
+        key = cache_key(url, goal)
+        counters = [self.stats] + ([stats] if stats is not None else [])
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if self._fresh(entry):
+                outcome = "memory_hits"
+            else:
+                entry = self._read_disk(key)
+                if self._fresh(entry):
+                    self._memory[key] = entry
+                    outcome = "disk_hits"
+                elif key in self._inflight:
+                    future, outcome = self._inflight[key], "coalesced"
+                else:
+                    future, outcome = Future(), "misses"
+                    self._inflight[key] = future
+
+        if outcome in ("memory_hits", "disk_hits"):
+            for s in counters:
+                s.record(outcome, entry.get("elapsed", 0.0))
+            return entry["result"]
+
+        if outcome == "coalesced":
+            # re-raises the leader's error, if any
+            result, elapsed = future.result()
+            for s in counters:
+                s.record(outcome, elapsed)
+            return result
+
+        start = time.perf_counter()
+        try:
+            result = self.scraper(url, goal)
+            if inspect.isawaitable(result):
+                result = asyncio.run(result)
+        except BaseException as e:
+            # Failures are not cached: waiters get the error, the next call retries
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            for s in counters:
+                s.record("errors", time.perf_counter() - start)
+            raise
+        elapsed = time.perf_counter() - start
+        self.store(url, goal, result, elapsed)
+        with self._lock:
+            del self._inflight[key]
+        future.set_result((result, elapsed))
+        for s in counters:
+            s.record("misses", elapsed)
+        return result
+
+    def prefetch(
+        self,
+        pages: list[tuple[str, str]],
+        stats: ScrapeStats | None = None,
+        max_workers: int = 4,
+    ) -> None:
+        """Warms the cache for (url, goal) pairs in parallel; errors are only logged."""
+        pages = list(dict.fromkeys(pages))
+
+        def fetch(page: tuple[str, str]) -> None:
+            try:
+                self.scrape(*page, stats=stats)
+            except Exception as e:
+                print(f"  ⚠️  Prefetch failed for {page[0]}: {e}")
+
+        if not pages:
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pages))) as executor:
+            list(executor.map(fetch, pages))
+        if stats is not None:
+            with stats._lock:
+                stats.prefetched += len(pages)
@@ -0,0 +1,68 @@
+"""Tests for packing the due diligence sections into the validator prompt."""
+
+import json
+
+from prompt_packing import dedupe_entities, pack_sections
+
+JANE = {"name": "Jane Doe", "role": "CEO", "linkedin": "https://linkedin.com/in/jane"}
+
+
+def _founders(count: int) -> list[dict]:
+    return [JANE] + [
+        {"name": f"Founder {i}", "bio": f"Founder {i} previously built " + "x " * 80}
+        for i in range(count)
+    ]
+
+
+def _summarize(name: str, text: str, target: int) -> str:
+    return f"{name} summary"
+
+
+def test_repeats_refer_to_the_first_occurrence():
+    sections = {"founders_team": {"founders": [JANE]}, "social": {"people": [JANE]}}
+
+    deduped, repeats = dedupe_entities(sections)
+
+    assert repeats == 1
+    assert deduped["social"]["people"] == [
+        {"name": "Jane Doe", "see": "founders_team.founders[0]"}
+    ]
+
+
+def test_repeats_of_a_summarized_section_keep_the_full_entity():
+    sections = {
+        "founders_team": {"founders": _founders(40)},
+        "social": {"people": [JANE]},
+    }
+
+    packed = pack_sections(sections, budget=600, summarize=_summarize)
+    result = json.loads(packed.text)
+
+    assert result["founders_team"] == "founders_team summary"
+    assert result["social"]["people"] == [JANE]
+    assert "see" not in packed.text
+    assert packed.sections["founders_team"]["summarized"]
+    assert not packed.sections["social"]["summarized"]
+
+
+def test_truncated_sections_are_not_reported_as_summarized():
+    def failing(name: str, text: str, target: int) -> str:
+        raise RuntimeError("LLM unavailable")
+
+    sections = {"founders_team": {"founders": _founders(40)}, "social": [JANE]}
+
+    packed = pack_sections(sections, budget=600, summarize=failing)
+    result = json.loads(packed.text)
+
+    assert result["founders_team"]["founders"][-1]["_truncated"] > 0
+    assert not packed.sections["founders_team"]["summarized"]
+    assert result["social"] == [JANE]
+
+
+def test_empty_sections_are_dropped():
+    sections = {"funding": {"rounds": [], "notes": ""}, "social": [JANE], "news": None}
+
+    packed = pack_sections(sections, budget=2000)
+
+    assert json.loads(packed.text) == {"social": [JANE]}
+    assert set(packed.sections) == {"social"}
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: list-based email lookups (the old main.py approach) vs EmailIndex.
+
+Runs offline on synthetic emails, no Gmail access needed:
+
+    uv run python benchmark_email_index.py --emails 50000
+"""
+
+import argparse
+import random
+import time
+
+from email_index import EmailIndex
+
+
+def make_emails(n: int, senders: int = 500):
+    return [
+        {
+            "message_id": f"msg{i:06d}",
+            "thread_id": f"thr{i // 3:06d}",
+            "from": f"Sender {i % senders} <sender{i % senders}@example.com>",
+            "subject": f"Subject {i}",
+            "body": "lorem ipsum " * 20,
+        }
+        for i in range(n)
+    ]
+
+
+def timed(label: str, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} {elapsed * 1000:10.2f} ms")
+    return elapsed
+
+
+def bench_list(emails, lookups, to_remove):
+    unread = list(emails)
+    read_ids = []
+
+    def get_bodies():
+        for msg_id in lookups:
+            next(e["body"] for e in unread if e["message_id"] == msg_id)
+
+    def mark_and_remove():
+        read_ids.extend(to_remove)
+        for email in list(unread):
+            if email["message_id"] in read_ids:
+                unread.remove(email)
+
+    print("list + list-of-read-ids:")
+    return timed(f"get_email_body x{len(lookups)}", get_bodies) + timed(
+        f"mark read + remove x{len(to_remove)}", mark_and_remove
+    )
+
+
+def bench_index(emails, lookups, to_remove):
+    index = EmailIndex()
+
+    def build():
+        for email in emails:
+            index.add(email)
+
+    def get_bodies():
+        for msg_id in lookups:
+            index.get(msg_id)["body"]
+
+    def mark_and_remove():
+        index.mark_read(to_remove)
+
+    print("EmailIndex:")
+    return (
+        timed(f"build from {len(emails)} emails", build)
+        + timed(f"get_email_body x{len(lookups)}", get_bodies)
+        + timed(f"mark read + remove x{len(to_remove)}", mark_and_remove)
+        + timed("list_emails(10)", lambda: index.first(10))
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--removals", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+    emails = make_emails(args.emails)
+    ids = [e["message_id"] for e in emails]
+    lookups = random.sample(ids, args.lookups)
+    to_remove = random.sample(ids, args.removals)
+
+    print(f"{args.emails} synthetic emails\n")
+    list_total = bench_list(emails, lookups, to_remove)
+    index_total = bench_index(emails, lookups, to_remove)
+    print(f"\nspeedup: {list_total / index_total:.0f}x")
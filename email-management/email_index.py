@@ -0,0 +1,82 @@
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+Email = Dict[str, Union[str, List[str]]]
+
+
+def sender_address(sender: str) -> str:
+    """Strips the display name, e.g. "CGE-UAW <cgepsu@mailchimpapp.com>" -> "cgepsu@mailchimpapp.com"."""
+    return sender.split("<")[1].split(">")[0] if "<" in sender else sender
+
+
+class EmailIndex:
+    """
+    In-memory working set of emails with O(1) lookup and removal.
+
+    Emails are kept in an insertion-ordered dict keyed by message ID, so iteration
+    follows the order they were added (newest first when loaded from the cache).
+    Thread and sender indexes map to ordered ID sets (dicts with None values),
+    which keeps removal O(1) without losing their order either.
+    """
+
+    def __init__(self, emails: Iterable[Email] = ()):
+        self._by_id: Dict[str, Email] = {}
+        self._by_thread: Dict[str, Dict[str, None]] = {}
+        self._by_sender: Dict[str, Dict[str, None]] = {}
+        for email in emails:
+            self.add(email)
+
+    def add(self, email: Email) -> None:
+        msg_id = email["message_id"]
+        if msg_id in self._by_id:
+            self.remove(msg_id)
+        self._by_id[msg_id] = email
+        self._by_thread.setdefault(email["thread_id"], {})[msg_id] = None
+        self._by_sender.setdefault(sender_address(email["from"]), {})[msg_id] = None
+
+    def remove(self, message_id: str) -> Optional[Email]:
+        email = self._by_id.pop(message_id, None)
+        if email is None:
+            return None
+        for index, key in (
+            (self._by_thread, email["thread_id"]),
+            (self._by_sender, sender_address(email["from"])),
+        ):
+            ids = index[key]
+            del ids[message_id]
+            if not ids:
+                del index[key]
+        return email
+
+    def mark_read(self, message_ids: Iterable[str]) -> None:
+        """Drops emails that were marked as read from the unread working set."""
+        for msg_id in message_ids:
+            self.remove(msg_id)
+
+    def get(self, message_id: str) -> Optional[Email]:
+        return self._by_id.get(message_id)
+
+    def first(self, count: int) -> List[Email]:
+        return list(islice(self._by_id.values(), count))
+
+    def by_thread(self, thread_id: str) -> List[Email]:
+        return [self._by_id[i] for i in self._by_thread.get(thread_id, ())]
+
+    def by_sender(self, sender: str) -> List[Email]:
+        """Emails from a sender address (display name stripped)."""
+        return [self._by_id[i] for i in self._by_sender.get(sender_address(sender), ())]
+
+    def senders_by_count(self) -> List[str]:
+        """Sender addresses, those with the most emails first."""
+        return sorted(
+            self._by_sender, key=lambda s: len(self._by_sender[s]), reverse=True
+        )
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self._by_id
+
+    def __iter__(self) -> Iterator[Email]:
+        return iter(list(self._by_id.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
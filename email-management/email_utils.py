@@ -1,8 +1,19 @@
 import base64
+import json
 import os
-from typing import Dict, List, Optional, Union, Tuple
+import uuid
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Union, Tuple
 from collections import defaultdict
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build, Resource
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -12,6 +23,11 @@
 
 SCOPES = ["https://mail.google.com/"]
 
+# Gmail accepts at most 100 calls per batch request and 1000 IDs per batchModify.
+GMAIL_BATCH_LIMIT = 100
+GMAIL_BATCH_MODIFY_LIMIT = 1000
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
 
 def get_user_email(gmail: Resource) -> str:
     profile = gmail.users().getProfile(userId="me").execute()
@@ -75,16 +91,19 @@ def extract_email_body_and_attachments(
 
     # Remove previous messages in the thread (if exclude_prev_msg=True)
     if exclude_prev_msg and body:
-        body_lines = body.splitlines()
-        filtered_lines = []
-        for line in body_lines:
-            if line.startswith(">"):
-                break  # Stop at the first quoted message
-            filtered_lines.append(line)
-        body = "\n".join(filtered_lines).strip()
+        body = strip_quoted_reply(body)
 
     return body, attachments
-    return body
+
+
+def strip_quoted_reply(body: str) -> str:
+    """Removes previous messages from an email body (everything from the first '>' line)."""
+    filtered_lines = []
+    for line in body.splitlines():
+        if line.startswith(">"):
+            break  # Stop at the first quoted message
+        filtered_lines.append(line)
+    return "\n".join(filtered_lines).strip()
 
 
 def fetch_email_thread(
@@ -172,6 +191,7 @@ def fetch_emails(
     gmail: Resource,
     page_token: Optional[str],
     filter_by: Optional[Union[str, List[str]]] = ["UNREAD"],
+    max_results: Optional[int] = None,
 ) -> Tuple[List[Dict[str, Union[str, List[str]]]], Optional[str]]:
     try:
         results = (
@@ -181,6 +201,7 @@ def fetch_emails(
                 userId="me",
                 labelIds=filter_by if filter_by else [],
                 pageToken=page_token,  # Include the page token in the request if there is one
+                maxResults=max_results,
             )
             .execute()
         )
@@ -215,7 +236,7 @@ def convert_timestamp_to_local(timestamp_ms):
     return formatted_time
 
 
-def get_gmail_service():
+def get_gmail_credentials() -> Credentials:
     creds = None
     # The file token.json stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first time.
@@ -232,7 +253,11 @@ def get_gmail_service():
         with open("token.json", "w") as token:
             token.write(creds.to_json())
 
-    return build("gmail", "v1", credentials=creds)
+    return creds
+
+
+def get_gmail_service(creds: Optional[Credentials] = None) -> Resource:
+    return build("gmail", "v1", credentials=creds or get_gmail_credentials())
 
 
 def parse_email_data(
@@ -250,6 +275,11 @@ def parse_email_data(
         print(f"Failed to fetch email data: {e}")
         return {}
 
+    return parse_message(msg)
+
+
+def parse_message(msg: Dict) -> Dict[str, Union[str, List[str]]]:
+    """Parses a `messages.get(format="full")` response into the email dict used by the agents."""
     try:
         headers = msg["payload"]["headers"]
         subject = next(
@@ -260,6 +290,10 @@ def parse_email_data(
         cc = next(
             (header["value"] for header in headers if header["name"] == "Cc"), None
         )
+        date = next(
+            (header["value"] for header in headers if header["name"] == "Date"),
+            "Unknown",
+        )
         msg_id = msg["id"]
         thread_id = msg["threadId"]
         receive_time = convert_timestamp_to_local(int(msg["internalDate"]))
@@ -283,7 +317,9 @@ def parse_email_data(
         "to": to,
         "from": sender,
         "cc": cc,
+        "date": date,
         "received_time": receive_time,
+        "internal_date": int(msg["internalDate"]),
         "labels": msg.get("labelIds", []),
         "body": body,
         "attachments": attachments,  # List of attachment filenames
@@ -292,6 +328,202 @@ def parse_email_data(
     return email_data_parsed
 
 
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _thread_http(
+    credentials: Optional[Credentials], local: threading.local
+) -> httplib2.Http:
+    """Returns this worker thread's own Http (httplib2 connections are not thread-safe)."""
+    http = getattr(local, "http", None)
+    if http is None:
+        http = httplib2.Http(timeout=60)
+        if credentials is not None:
+            http = AuthorizedHttp(credentials, http=http)
+        local.http = http
+    return http
+
+
+def _execute_batch(
+    gmail: Resource,
+    message_ids: List[str],
+    make_request: Callable[[str], HttpRequest],
+    http: Optional[httplib2.Http] = None,
+    max_retries: int = 5,
+    backoff: float = 1.0,
+) -> Dict[str, Dict]:
+    """
+    Runs one per-message API call for up to GMAIL_BATCH_LIMIT messages in a single batch HTTP request.
+
+    Sub-requests that fail with 429/5xx (or a batch that fails as a whole) are
+    retried with exponential backoff and jitter; other errors are reported and skipped.
+
+    Args:
+        gmail (Resource): Gmail API service instance.
+        message_ids (List[str]): Message IDs, at most GMAIL_BATCH_LIMIT.
+        make_request (Callable[[str], HttpRequest]): Builds the API call for one message ID.
+        http (Optional[httplib2.Http]): Http to send the batch on. Defaults to the service's own.
+
+    Returns:
+        Dict[str, Dict]: Successful responses keyed by message ID.
+    """
+    fetched: Dict[str, Dict] = {}
+    pending = list(message_ids)
+    for attempt in range(max_retries + 1):
+        retry: List[str] = []
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                fetched[request_id] = response
+            elif (
+                isinstance(exception, HttpError)
+                and exception.resp.status in RETRYABLE_STATUS
+            ):
+                retry.append(request_id)
+            else:
+                print(f"Gmail request for {request_id} failed: {exception}")
+
+        batch = gmail.new_batch_http_request(callback=callback)
+        for msg_id in pending:
+            batch.add(make_request(msg_id), request_id=msg_id)
+        try:
+            batch.execute(http=http)
+        except HttpError as e:
+            if e.resp.status not in RETRYABLE_STATUS:
+                print(f"Gmail batch request failed: {e}")
+                return fetched
+            retry = [msg_id for msg_id in pending if msg_id not in fetched]
+        except (httplib2.HttpLib2Error, OSError) as e:
+            print(f"Gmail batch request failed, retrying: {e}")
+            retry = [msg_id for msg_id in pending if msg_id not in fetched]
+
+        if not retry:
+            return fetched
+        pending = retry
+        if attempt < max_retries:
+            time.sleep(backoff * 2**attempt + random.uniform(0, backoff))
+
+    print(f"Giving up on {len(pending)} messages after {max_retries} retries.")
+    return fetched
+
+
+def _fetch_and_parse(
+    gmail: Resource,
+    message_ids: List[str],
+    credentials: Optional[Credentials],
+    local: threading.local,
+) -> Dict[str, Dict]:
+    raw = _execute_batch(
+        gmail,
+        message_ids,
+        lambda msg_id: gmail.users()
+        .messages()
+        .get(userId="me", id=msg_id, format="full"),
+        http=_thread_http(credentials, local),
+    )
+    return {msg_id: parse_message(msg) for msg_id, msg in raw.items()}
+
+
+def fetch_messages_bulk(
+    gmail: Resource,
+    message_ids: List[str],
+    credentials: Optional[Credentials] = None,
+    batch_size: int = GMAIL_BATCH_LIMIT,
+    max_workers: int = 4,
+) -> List[Dict[str, Union[str, List[str]]]]:
+    """
+    Fetches and parses known message IDs with concurrent Gmail batch requests.
+
+    Each worker thread sends its batches on its own Http, authorized with
+    `credentials` (unauthenticated if None, e.g. against a local test server).
+
+    Returns:
+        List[Dict[str, Union[str, List[str]]]]: Parsed emails, in the order of `message_ids`.
+    """
+    batch_size = max(1, min(batch_size, GMAIL_BATCH_LIMIT))
+    local = threading.local()
+    parsed: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_fetch_and_parse, gmail, chunk, credentials, local)
+            for chunk in _chunks(message_ids, batch_size)
+        ]
+        for future in as_completed(futures):
+            parsed.update(future.result())
+    return [parsed[msg_id] for msg_id in message_ids if parsed.get(msg_id)]
+
+
+def fetch_emails_bulk(
+    gmail: Resource,
+    filter_by: Optional[Union[str, List[str]]] = ["UNREAD"],
+    limit: Optional[int] = None,
+    credentials: Optional[Credentials] = None,
+    batch_size: int = GMAIL_BATCH_LIMIT,
+    max_workers: int = 4,
+) -> List[Dict[str, Union[str, List[str]]]]:
+    """
+    Lists and fetches emails using Gmail batch requests instead of one `messages.get` per email.
+
+    Page listing runs on the calling thread and hands each full batch of IDs to a
+    bounded pool of workers as soon as it is available, so listing and fetching overlap.
+
+    Args:
+        gmail (Resource): Gmail API service instance.
+        filter_by (Optional[Union[str, List[str]]]): Label IDs to filter by.
+        limit (Optional[int]): Maximum number of emails to fetch. None fetches all matches.
+        credentials (Optional[Credentials]): Authorize the workers' own Http connections.
+        batch_size (int): Messages per batch request, capped at GMAIL_BATCH_LIMIT.
+        max_workers (int): Number of batch requests in flight at once.
+
+    Returns:
+        List[Dict[str, Union[str, List[str]]]]: Parsed emails, in the order Gmail listed them.
+    """
+    batch_size = max(1, min(batch_size, GMAIL_BATCH_LIMIT))
+    local = threading.local()
+    start = time.perf_counter()
+
+    message_ids: List[str] = []
+    parsed: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        pending: List[str] = []
+        page_token = None
+        while limit is None or len(message_ids) < limit:
+            remaining = None if limit is None else limit - len(message_ids)
+            messages, page_token = fetch_emails(
+                gmail,
+                page_token,
+                filter_by=filter_by,
+                max_results=500 if remaining is None else min(500, remaining),
+            )
+            for msg in messages[:remaining]:
+                message_ids.append(msg["id"])
+                pending.append(msg["id"])
+                if len(pending) == batch_size:
+                    futures.append(
+                        pool.submit(
+                            _fetch_and_parse, gmail, pending, credentials, local
+                        )
+                    )
+                    pending = []
+            if not page_token:
+                break
+        if pending:
+            futures.append(
+                pool.submit(_fetch_and_parse, gmail, pending, credentials, local)
+            )
+
+        for future in as_completed(futures):
+            parsed.update(future.result())
+
+    emails = [parsed[msg_id] for msg_id in message_ids if parsed.get(msg_id)]
+    elapsed = time.perf_counter() - start
+    rate = len(emails) / elapsed if elapsed > 0 else 0.0
+    print(f"Fetched {len(emails)} emails in {elapsed:.2f}s ({rate:.1f} messages/sec)")
+    return emails
+
+
 def group_emails_by_sender(
     email_list: List[Dict[str, Union[str, List[str]]]],
 ) -> Dict[str, List[Dict[str, Union[str, List[str]]]]]:
@@ -345,3 +577,240 @@ def trash_email(gmail_service, message_id):
         return f"Email {message_id} moved to trash."
     except Exception as e:
         return f"Failed to trash email: {e}"
+
+
+def batch_modify_labels(
+    gmail_service,
+    message_ids: List[str],
+    add_label_ids: Optional[List[str]] = None,
+    remove_label_ids: Optional[List[str]] = None,
+) -> int:
+    """
+    Adds/removes labels on many emails with `messages.batchModify` (up to 1000 IDs per call).
+
+    Returns:
+        int: Number of emails modified.
+    """
+    modified = 0
+    for chunk in _chunks(message_ids, GMAIL_BATCH_MODIFY_LIMIT):
+        gmail_service.users().messages().batchModify(
+            userId="me",
+            body={
+                "ids": chunk,
+                "addLabelIds": add_label_ids or [],
+                "removeLabelIds": remove_label_ids or [],
+            },
+        ).execute()
+        modified += len(chunk)
+    return modified
+
+
+def _batch_per_message(gmail_service, message_ids: List[str], method: str) -> List[str]:
+    """
+    Calls `messages.<method>` (e.g. trash/untrash) for each ID, 100 calls per batch request.
+
+    Returns:
+        List[str]: IDs of the messages the call succeeded for.
+    """
+    done: List[str] = []
+    for chunk in _chunks(message_ids, GMAIL_BATCH_LIMIT):
+        responses = _execute_batch(
+            gmail_service,
+            chunk,
+            lambda msg_id: getattr(gmail_service.users().messages(), method)(
+                userId="me", id=msg_id
+            ),
+        )
+        done += [msg_id for msg_id in chunk if msg_id in responses]
+    return done
+
+
+def _current_labels(gmail_service, message_ids: List[str]) -> Dict[str, List[str]]:
+    """Label IDs each message has right now (`format="minimal"`), 100 per batch request."""
+    labels: Dict[str, List[str]] = {}
+    for chunk in _chunks(message_ids, GMAIL_BATCH_LIMIT):
+        responses = _execute_batch(
+            gmail_service,
+            chunk,
+            lambda msg_id: gmail_service.users()
+            .messages()
+            .get(userId="me", id=msg_id, format="minimal"),
+        )
+        for msg_id, response in responses.items():
+            labels[msg_id] = response.get("labelIds", [])
+    return labels
+
+
+class BulkActionJournal:
+    """
+    Append-only JSONL log of bulk actions, so any of them can be reverted in one call.
+
+    Each entry records the action, the affected message IDs and, per message, the
+    labels the action actually removed, which is all that is needed to apply the
+    inverse operation without adding labels a message never had.
+    """
+
+    def __init__(self, path: str = "bulk_actions.jsonl"):
+        self.path = path
+
+    def record(
+        self,
+        action: str,
+        message_ids: List[str],
+        add_label_ids: Optional[List[str]] = None,
+        remove_label_ids: Optional[List[str]] = None,
+        removed_labels: Optional[Dict[str, List[str]]] = None,
+    ) -> str:
+        entry = {
+            "id": uuid.uuid4().hex[:8],
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "action": action,
+            "message_ids": message_ids,
+            "add_label_ids": add_label_ids or [],
+            "remove_label_ids": remove_label_ids or [],
+            "removed_labels": removed_labels or {},
+            "undone": False,
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        return entry["id"]
+
+    def entries(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        entries: Dict[str, Dict] = {}
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries.setdefault(entry["id"], {}).update(entry)
+        return list(entries.values())
+
+    def undo(
+        self, gmail_service, action_id: Optional[str] = None
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        Reverts the given bulk action, or the most recent one that has not been undone.
+
+        Returns:
+            Tuple[str, Optional[Dict]]: A status message, and the undone entry (None if
+            nothing was undone) so the caller can mirror the change locally. Its
+            `removed_labels` maps each message ID to the labels that were added back.
+        """
+        candidates = [e for e in self.entries() if not e["undone"]]
+        if action_id is not None:
+            candidates = [e for e in candidates if e["id"] == action_id]
+        if not candidates:
+            return "No bulk action to undo.", None
+        entry = candidates[-1]
+        # Entries written before per-message labels were journaled
+        removed_labels = entry.get("removed_labels") or {
+            msg_id: entry["remove_label_ids"] for msg_id in entry["message_ids"]
+        }
+        try:
+            if entry["action"] == "trash":
+                restored = _batch_per_message(
+                    gmail_service, entry["message_ids"], "untrash"
+                )
+            else:
+                # One batchModify per distinct set of labels to add back
+                groups: Dict[Tuple[str, ...], List[str]] = defaultdict(list)
+                for msg_id, labels in removed_labels.items():
+                    groups[tuple(labels)].append(msg_id)
+                restored = []
+                for labels, ids in groups.items():
+                    batch_modify_labels(
+                        gmail_service,
+                        ids,
+                        add_label_ids=list(labels),
+                        remove_label_ids=entry["add_label_ids"],
+                    )
+                    restored += ids
+        except Exception as e:
+            return f"Failed to undo bulk action {entry['id']}: {e}", None
+        # Later lines for the same id override earlier ones in entries().
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"id": entry["id"], "undone": True}) + "\n")
+        entry["removed_labels"] = removed_labels
+        entry["message_ids"] = restored
+        return (
+            f"Undid {entry['action']} of {len(restored)} emails ({entry['id']}).",
+            entry,
+        )
+
+
+def _remove_labels_bulk(
+    gmail_service,
+    action: str,
+    message_ids: List[str],
+    remove_label_ids: List[str],
+    journal: Optional[BulkActionJournal],
+) -> int:
+    """
+    Removes labels with batchModify and journals, per message, the labels it actually had.
+
+    Messages that had none of the labels are left out of the journal entry, so an
+    undo only adds back what this action took away.
+    """
+    if journal is None:
+        return batch_modify_labels(
+            gmail_service, message_ids, remove_label_ids=remove_label_ids
+        )
+    current = _current_labels(gmail_service, message_ids)
+    count = batch_modify_labels(
+        gmail_service, message_ids, remove_label_ids=remove_label_ids
+    )
+    removed_labels = {}
+    for msg_id in message_ids:
+        labels = [
+            label for label in remove_label_ids if label in current.get(msg_id, [])
+        ]
+        if labels:
+            removed_labels[msg_id] = labels
+    if removed_labels:
+        journal.record(
+            action,
+            list(removed_labels),
+            remove_label_ids=remove_label_ids,
+            removed_labels=removed_labels,
+        )
+    return count
+
+
+def mark_emails_as_read_bulk(
+    gmail_service, message_ids: List[str], journal: Optional[BulkActionJournal] = None
+) -> str:
+    """Marks many emails as read with batchModify."""
+    try:
+        count = _remove_labels_bulk(
+            gmail_service, "mark_read", message_ids, ["UNREAD"], journal
+        )
+    except Exception as e:
+        return f"Failed to mark emails as read: {e}"
+    return f"{count} emails marked as read."
+
+
+def archive_emails_bulk(
+    gmail_service, message_ids: List[str], journal: Optional[BulkActionJournal] = None
+) -> str:
+    """Archives many emails with batchModify (removes INBOX and UNREAD)."""
+    try:
+        count = _remove_labels_bulk(
+            gmail_service, "archive", message_ids, ["INBOX", "UNREAD"], journal
+        )
+    except Exception as e:
+        return f"Failed to archive emails: {e}"
+    return f"{count} emails archived."
+
+
+def trash_emails_bulk(
+    gmail_service, message_ids: List[str], journal: Optional[BulkActionJournal] = None
+) -> str:
+    """Moves many emails to Trash, 100 `messages.trash` calls per batch request."""
+    try:
+        trashed = _batch_per_message(gmail_service, message_ids, "trash")
+    except Exception as e:
+        return f"Failed to trash emails: {e}"
+    if journal is not None and trashed:
+        journal.record("trash", trashed)
+    return f"{len(trashed)} emails moved to trash."
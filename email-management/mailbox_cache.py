@@ -0,0 +1,382 @@
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+
+from email_utils import (
+    fetch_emails_bulk,
+    fetch_messages_bulk,
+    parse_message,
+    strip_quoted_reply,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    message_id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    subject TEXT,
+    sender TEXT,
+    to_addr TEXT,
+    cc TEXT,
+    date TEXT,
+    received_time TEXT,
+    internal_date INTEGER,
+    labels TEXT,
+    body TEXT,
+    attachments TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_thread ON messages (thread_id, internal_date);
+CREATE INDEX IF NOT EXISTS idx_messages_date ON messages (internal_date DESC);
+CREATE TABLE IF NOT EXISTS message_labels (
+    message_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (label, message_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_message_labels_id ON message_labels (message_id);
+CREATE TABLE IF NOT EXISTS synced_threads (thread_id TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5 (
+    message_id UNINDEXED, subject, body
+);
+"""
+
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+
+class MailboxCache:
+    """
+    Local SQLite copy of the parsed mailbox.
+
+    The first sync downloads matching emails in bulk and stores the mailbox
+    historyId. Later syncs call `history.list` from that historyId and only
+    fetch/delete/relabel what changed, so startup cost tracks the number of
+    changes rather than the size of the mailbox. Bodies are stored already
+    HTML-stripped, and subjects/bodies are indexed with FTS5 for `search`.
+    """
+
+    def __init__(
+        self, path: str = "mailbox.db", credentials: Optional[Credentials] = None
+    ):
+        # Authorizes the bulk fetch workers' own connections
+        self.credentials = credentials
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    # -------------- Sync --------------
+    def sync(
+        self,
+        gmail: Resource,
+        filter_by: List[str] = ["UNREAD"],
+        initial_sync_limit: Optional[int] = None,
+    ) -> None:
+        """Brings the cache up to date: a full load the first time, history deltas afterwards."""
+        start = time.perf_counter()
+        history_id = self._get_meta("history_id")
+        if history_id is not None and self._sync_history(gmail, history_id, filter_by):
+            mode = "incremental"
+        else:
+            self._full_sync(gmail, filter_by, initial_sync_limit)
+            mode = "full"
+        print(
+            f"Mailbox cache {mode} sync done in {time.perf_counter() - start:.2f}s "
+            f"({self.count()} emails cached)"
+        )
+
+    def _full_sync(
+        self, gmail: Resource, filter_by: List[str], limit: Optional[int]
+    ) -> None:
+        # Read the historyId before listing so changes made during the download
+        # are picked up by the next incremental sync.
+        history_id = gmail.users().getProfile(userId="me").execute()["historyId"]
+        emails = fetch_emails_bulk(
+            gmail, filter_by=filter_by, limit=limit, credentials=self.credentials
+        )
+        with self.conn:
+            for table in (
+                "messages",
+                "message_labels",
+                "synced_threads",
+                "messages_fts",
+            ):
+                self.conn.execute(f"DELETE FROM {table}")
+            for email in emails:
+                self._upsert(email)
+            self._set_meta("history_id", str(history_id))
+
+    def _sync_history(
+        self, gmail: Resource, start_history_id: str, filter_by: List[str]
+    ) -> bool:
+        """Applies `history.list` deltas. Returns False if the historyId has expired."""
+        added: Dict[str, Dict] = {}
+        deleted = set()
+        label_changes = []
+        page_token = None
+        latest = start_history_id
+        try:
+            while True:
+                response = (
+                    gmail.users()
+                    .history()
+                    .list(
+                        userId="me",
+                        startHistoryId=start_history_id,
+                        historyTypes=HISTORY_TYPES,
+                        pageToken=page_token,
+                    )
+                    .execute()
+                )
+                for record in response.get("history", []):
+                    for item in record.get("messagesAdded", []):
+                        added[item["message"]["id"]] = item["message"]
+                    for item in record.get("messagesDeleted", []):
+                        deleted.add(item["message"]["id"])
+                    for item in record.get("labelsAdded", []) + record.get(
+                        "labelsRemoved", []
+                    ):
+                        label_changes.append(item["message"])
+                latest = response.get("historyId", latest)
+                page_token = response.get("nextPageToken")
+                if not page_token:
+                    break
+        except HttpError as e:
+            if e.resp.status == 404:
+                print("Mailbox history expired, running a full sync.")
+                return False
+            raise
+
+        synced_threads = self._synced_threads()
+        wanted = set(filter_by)
+        to_fetch = [
+            msg_id
+            for msg_id, msg in added.items()
+            if msg_id not in deleted
+            and (
+                wanted.issubset(msg.get("labelIds", []))
+                or msg.get("threadId") in synced_threads
+            )
+        ]
+        with self.conn:
+            # Each history message carries its full label set at that point,
+            # so applying them in order leaves the latest labels.
+            for message in label_changes:
+                if message["id"] in deleted:
+                    continue
+                if self._has(message["id"]):
+                    self._set_labels(message["id"], message.get("labelIds", []))
+                elif message["id"] not in to_fetch and wanted.issubset(
+                    message.get("labelIds", [])
+                ):
+                    # e.g. an older email was marked unread again
+                    to_fetch.append(message["id"])
+            for msg_id in deleted:
+                self._delete(msg_id)
+            for email in fetch_messages_bulk(
+                gmail, to_fetch, credentials=self.credentials
+            ):
+                self._upsert(email)
+            self._set_meta("history_id", str(latest))
+        return True
+
+    # -------------- Reads --------------
+    def list_emails(
+        self, filter_by: List[str] = ["UNREAD"], limit: Optional[int] = None
+    ) -> List[Dict[str, Union[str, List[str]]]]:
+        """Cached emails carrying all of `filter_by`, newest first (Trash/Spam excluded, as in Gmail)."""
+        where, params = self._label_filter(filter_by)
+        query = f"SELECT * FROM messages WHERE {where} ORDER BY internal_date DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._row_to_email(row) for row in self.conn.execute(query, params)]
+
+    def get_email(self, message_id: str) -> Optional[Dict[str, Union[str, List[str]]]]:
+        row = self.conn.execute(
+            "SELECT * FROM messages WHERE message_id = ?", (message_id,)
+        ).fetchone()
+        return self._row_to_email(row) if row else None
+
+    def get_thread(
+        self, gmail: Resource, thread_id: str
+    ) -> List[Dict[str, Union[str, List[str]]]]:
+        """
+        Emails of a thread, oldest first, in the same shape as `fetch_email_thread`.
+
+        The thread is downloaded once; afterwards history sync keeps it current.
+        """
+        if thread_id not in self._synced_threads():
+            try:
+                thread = (
+                    gmail.users()
+                    .threads()
+                    .get(userId="me", id=thread_id, format="full")
+                    .execute()
+                )
+            except Exception as e:
+                print(f"Error fetching thread {thread_id}: {e}")
+                return []
+            with self.conn:
+                for message in thread.get("messages", []):
+                    email = parse_message(message)
+                    if email:
+                        self._upsert(email)
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO synced_threads VALUES (?)", (thread_id,)
+                )
+        rows = self.conn.execute(
+            "SELECT * FROM messages WHERE thread_id = ? ORDER BY internal_date",
+            (thread_id,),
+        )
+        thread_emails = []
+        for row in rows:
+            email = self._row_to_email(row)
+            email["body"] = strip_quoted_reply(email["body"] or "")
+            thread_emails.append(email)
+        return thread_emails
+
+    def search(
+        self, query: str, limit: int = 10
+    ) -> List[Dict[str, Union[str, List[str]]]]:
+        """Full-text search over subject and body (FTS5 query syntax), best matches first."""
+        rows = self.conn.execute(
+            "SELECT m.* FROM messages_fts f JOIN messages m USING (message_id)"
+            " WHERE messages_fts MATCH ? ORDER BY bm25(messages_fts) LIMIT ?",
+            (query, limit),
+        )
+        return [self._row_to_email(row) for row in rows]
+
+    def count(self, filter_by: Optional[List[str]] = None) -> int:
+        where, params = self._label_filter(filter_by or [])
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM messages WHERE {where}", params
+        ).fetchone()[0]
+
+    @staticmethod
+    def _label_filter(filter_by: List[str]) -> Tuple[str, list]:
+        where = (
+            "message_id NOT IN (SELECT message_id FROM message_labels"
+            " WHERE label IN ('TRASH', 'SPAM'))"
+        )
+        params: list = []
+        if filter_by:
+            placeholders = ",".join("?" * len(filter_by))
+            where += (
+                f" AND message_id IN (SELECT message_id FROM message_labels"
+                f" WHERE label IN ({placeholders}) GROUP BY message_id"
+                f" HAVING COUNT(*) = ?)"
+            )
+            params += [*filter_by, len(filter_by)]
+        return where, params
+
+    # -------------- Local writes --------------
+    def update_labels(
+        self,
+        message_ids: List[str],
+        add_label_ids: Optional[List[str]] = None,
+        remove_label_ids: Optional[List[str]] = None,
+    ) -> None:
+        """Mirrors a label change made through the API so reads stay consistent before the next sync."""
+        with self.conn:
+            for msg_id in message_ids:
+                email = self.get_email(msg_id)
+                if email is None:
+                    continue
+                labels = [
+                    label
+                    for label in email["labels"]
+                    if label not in (remove_label_ids or [])
+                ]
+                labels += [
+                    label for label in add_label_ids or [] if label not in labels
+                ]
+                self._set_labels(msg_id, labels)
+
+    def _upsert(self, email: Dict) -> None:
+        msg_id = email["message_id"]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO messages VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+            (
+                msg_id,
+                email["thread_id"],
+                email["subject"],
+                email["from"],
+                email["to"],
+                email["cc"],
+                email["date"],
+                email["received_time"],
+                email["internal_date"],
+                json.dumps(email["labels"]),
+                email["body"],
+                json.dumps(email["attachments"]),
+            ),
+        )
+        self.conn.execute("DELETE FROM messages_fts WHERE message_id = ?", (msg_id,))
+        self.conn.execute(
+            "INSERT INTO messages_fts VALUES (?,?,?)",
+            (msg_id, email["subject"], email["body"]),
+        )
+        self._set_labels(msg_id, email["labels"])
+
+    def _set_labels(self, message_id: str, labels: List[str]) -> None:
+        self.conn.execute(
+            "UPDATE messages SET labels = ? WHERE message_id = ?",
+            (json.dumps(labels), message_id),
+        )
+        self.conn.execute(
+            "DELETE FROM message_labels WHERE message_id = ?", (message_id,)
+        )
+        self.conn.executemany(
+            "INSERT INTO message_labels VALUES (?, ?)",
+            [(message_id, label) for label in labels],
+        )
+
+    def _delete(self, message_id: str) -> None:
+        for table in ("messages", "message_labels", "messages_fts"):
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE message_id = ?", (message_id,)
+            )
+
+    def _has(self, message_id: str) -> bool:
+        return (
+            self.conn.execute(
+                "SELECT 1 FROM messages WHERE message_id = ?", (message_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def _synced_threads(self) -> set:
+        return {
+            row[0] for row in self.conn.execute("SELECT thread_id FROM synced_threads")
+        }
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _row_to_email(row: sqlite3.Row) -> Dict[str, Union[str, List[str]]]:
+        return {
+            "message_id": row["message_id"],
+            "thread_id": row["thread_id"],
+            "subject": row["subject"],
+            "to": row["to_addr"],
+            "from": row["sender"],
+            "cc": row["cc"],
+            "date": row["date"],
+            "received_time": row["received_time"],
+            "internal_date": row["internal_date"],
+            "labels": json.loads(row["labels"] or "[]"),
+            "body": row["body"],
+            "attachments": json.loads(row["attachments"] or "[]"),
+        }
@@ -5,16 +5,17 @@
 load_dotenv()
 
 from email_utils import (
+    get_gmail_credentials,
     get_gmail_service,
     get_user_email,
-    fetch_emails,
-    parse_email_data,
-    group_emails_by_sender,
     mark_email_as_read,
+    mark_emails_as_read_bulk,
     archive_email,
     trash_email,
-    fetch_email_thread,
+    BulkActionJournal,
 )
+from email_index import EmailIndex
+from mailbox_cache import MailboxCache
 import autogen
 from autogen.agentchat import initiate_group_chat
 from autogen import ConversableAgent, LLMConfig
@@ -33,57 +34,38 @@
 
 max_unread_emails_limit = 20
 is_mock_read_email = False
+email_filter = ["UNREAD", "CATEGORY_PERSONAL"]
+mailbox_cache_path = "mailbox.db"
+# Emails downloaded on the first run; later runs only sync changes
+initial_sync_limit = 1000
 
 
 # -------------- Connect to Google Email --------------
 # Get the Gmail service (this will prompt you to authenticate if needed)
-gmail_service = get_gmail_service()
+gmail_credentials = get_gmail_credentials()
+gmail_service = get_gmail_service(gmail_credentials)
 
 # Get the logged-in user's email address
 user_email = get_user_email(gmail_service)
 print(f"Logged in as: {user_email}")
 
-# Fetch unread emails
-page_token = None
-unread_emails = []
-# Loop through pages to fetch all unread emails
-while True:
-    messages, page_token = fetch_emails(
-        gmail_service, page_token, filter_by=["UNREAD", "CATEGORY_PERSONAL"]
-    )
-    if not messages:
-        break
-
-    for msg in messages:
-        email_data = parse_email_data(gmail_service, msg)
-        if email_data:
-            unread_emails.append(email_data)
-        if len(unread_emails) >= max_unread_emails_limit:
-            break
-    if not page_token or len(unread_emails) >= max_unread_emails_limit:
-        break
-
-# group_by_sender
-grouped_emails = group_emails_by_sender(unread_emails)
-sorted_grouped_emails_tuple = sorted(
-    grouped_emails.items(), key=lambda x: len(x[1]), reverse=True
+# Sync the local mailbox cache (full download on the first run, history deltas afterwards)
+mailbox = MailboxCache(mailbox_cache_path, credentials=gmail_credentials)
+mailbox.sync(
+    gmail_service, filter_by=email_filter, initial_sync_limit=initial_sync_limit
+)
+# Working set of unread emails, indexed by message ID, thread and sender address
+unread_emails = EmailIndex(
+    mailbox.list_emails(filter_by=email_filter, limit=max_unread_emails_limit)
 )
 
-sorted_grouped_emails = {}
-for sender, emails in sorted_grouped_emails_tuple:
-    # strip email adress in "<>" from example "CGE-UAW at Penn State <cgepsu@138327365.mailchimpapp.com>""
-    stripped_sender = sender.split("<")[1].split(">")[0] if "<" in sender else sender
-    sorted_grouped_emails[stripped_sender] = emails
-
-
-read_email_ids = []
+bulk_journal = BulkActionJournal()
 
 
 # -------- First, sort emails by sender. Provide the option to mark all emails from a specific sender as read. --------
 def mark_all_from_sender_as_read(sender: str) -> str:
-    try:
-        emails = sorted_grouped_emails[sender]
-    except KeyError:
+    emails = unread_emails.by_sender(sender)
+    if not emails:
         return f"No emails found from {sender}."
     # print warning message: sender, first 10 email subjects and random 3 email bodies
     print("*" * 100)
@@ -101,16 +83,47 @@ def mark_all_from_sender_as_read(sender: str) -> str:
     user_input = input("Do you want to continue? (yes/no): ")
     if user_input.lower() == "yes" or user_input.lower() == "y":
         print("Marking all emails as read...")
-        # mark all emails as read
-        for email in emails:
-            read_email_ids.append(email["message_id"])
-            if not is_mock_read_email:
-                mark_email_as_read(gmail_service, email["message_id"])
-        return "All emails marked as read successfully!"
+        # mark all emails as read in one batchModify call, journaled so it can be undone
+        message_ids = [email["message_id"] for email in emails]
+        if is_mock_read_email:
+            unread_emails.mark_read(message_ids)
+            return "All emails marked as read successfully!"
+        result = mark_emails_as_read_bulk(
+            gmail_service, message_ids, journal=bulk_journal
+        )
+        if not result.startswith("Failed"):
+            unread_emails.mark_read(message_ids)
+            mailbox.update_labels(message_ids, remove_label_ids=["UNREAD"])
+        return result
     else:
         return "Operation cancelled by user."
 
 
+def undo_last_bulk_action() -> str:
+    """Revert the most recent bulk action (e.g. mark all from sender as read) in one call."""
+    if is_mock_read_email:
+        return "Nothing to undo in mock mode."
+    result, entry = bulk_journal.undo(gmail_service)
+    if entry is None:
+        return result
+    # Mirror the undo in the mailbox cache, then put emails that match the
+    # filter again back into the working set
+    if entry["action"] == "trash":
+        mailbox.update_labels(entry["message_ids"], remove_label_ids=["TRASH"])
+    else:
+        for msg_id in entry["message_ids"]:
+            mailbox.update_labels(
+                [msg_id],
+                add_label_ids=entry["removed_labels"][msg_id],
+                remove_label_ids=entry["add_label_ids"],
+            )
+    for msg_id in entry["message_ids"]:
+        email = mailbox.get_email(msg_id)
+        if email is not None and set(email_filter).issubset(email["labels"]):
+            unread_emails.add(email)
+    return result
+
+
 user_proxy = autogen.UserProxyAgent(
     name="user_proxy",
     human_input_mode="ALWAYS",
@@ -127,6 +140,7 @@ def mark_all_from_sender_as_read(sender: str) -> str:
 This is the complete data you have — you cannot fetch additional emails or access the inbox directly.
 
 Your only available action is mark_all_from_sender_as_read, which marks all unread emails from a given sender as read.
+If the user changes their mind, undo_last_bulk_action reverts the most recent bulk mark-as-read.
 
 Your workflow:
 1. Review the provided sender list and identify low-priority senders whose emails can be safely marked as read in bulk (e.g. newsletters, notifications, automated alerts).
@@ -135,12 +149,13 @@ def mark_all_from_sender_as_read(sender: str) -> str:
 4. After processing all confirmed senders, reply with TERMINATE.
 
 Do not claim capabilities you don't have. If the user asks for something outside your scope (e.g. listing all emails, archiving, deleting), explain that this step only handles bulk mark-as-read by sender, and that individual email actions are available in the next step.""",
-    functions=[mark_all_from_sender_as_read],
+    functions=[mark_all_from_sender_as_read, undo_last_bulk_action],
 )
 
 # construct input string
 input_str = ""
-for sender, emails in sorted_grouped_emails.items():
+for sender in unread_emails.senders_by_count():
+    emails = unread_emails.by_sender(sender)
     if len(emails) <= 1:
         continue
     input_str += f"{sender}: {len(emails)} emails\n"
@@ -176,16 +191,11 @@ def mark_all_from_sender_as_read(sender: str) -> str:
 else:
     print("No senders with multiple emails found. Skipping bulk filtering.")
 
-# remove read emails from unread_emails
-for email in unread_emails:
-    if email["message_id"] in read_email_ids:
-        unread_emails.remove(email)
-
 
 # -------------- Part 2: Email Assistant to help with reading emails one by one, marking as read, and drafting responses --------------
 def list_emails(count: int = 10) -> str:
     """List unread emails with their ID, sender, subject, and received time. Use count to limit results."""
-    emails_to_show = unread_emails[:count]
+    emails_to_show = unread_emails.first(count)
     if not emails_to_show:
         return "No unread emails."
     result = f"Showing {len(emails_to_show)} of {len(unread_emails)} unread emails:\n\n"
@@ -198,24 +208,45 @@ def list_emails(count: int = 10) -> str:
 
 
 def mark_one_email_as_read(email_id: str) -> str:
-    read_email_ids.append(email_id)
     if is_mock_read_email:
+        unread_emails.mark_read([email_id])
         return "Successfully marked email as read."
-    return mark_email_as_read(
+    result = mark_email_as_read(
         gmail_service, email_id
     )  # send request to mark email as read
+    if not result.startswith("Failed"):
+        unread_emails.mark_read([email_id])
+        mailbox.update_labels([email_id], remove_label_ids=["UNREAD"])
+    return result
 
 
 def get_email_body(email_id: str) -> str:
-    for email in unread_emails:
-        if email["message_id"] == email_id:
-            return email["body"]
-    return "Email not found."
+    email = unread_emails.get(email_id) or mailbox.get_email(email_id)
+    if email is None:
+        return "Email not found."
+    return email["body"]
+
+
+def search_emails(query: str, count: int = 10) -> str:
+    """Full-text search over the subject and body of cached emails. Returns the best matches first."""
+    try:
+        matches = mailbox.search(query, limit=count)
+    except Exception as e:
+        return f"Search failed: {e}"
+    if not matches:
+        return f"No emails matching '{query}'."
+    result = f"Found {len(matches)} emails matching '{query}':\n\n"
+    for i, email in enumerate(matches, 1):
+        result += f"{i}. [{email['message_id']}] (thread {email['thread_id']})\n"
+        result += f"   From: {email['from']}\n"
+        result += f"   Subject: {email['subject']}\n"
+        result += f"   Received: {email.get('received_time', 'N/A')}\n\n"
+    return result
 
 
 def get_full_thread(email_thread_id: str) -> str:
     """Get the full thread of an email as a formatted string for the agent."""
-    thread_emails = fetch_email_thread(gmail_service, email_thread_id)
+    thread_emails = mailbox.get_thread(gmail_service, email_thread_id)
     if not thread_emails:
         return "No thread found or error fetching thread."
 
@@ -239,15 +270,25 @@ def get_full_thread(email_thread_id: str) -> str:
 def archive_one_email(email_id: str) -> str:
     """Archive an email — removes it from Inbox but keeps it in All Mail."""
     if is_mock_read_email:
+        unread_emails.remove(email_id)
         return "Successfully archived email (mock)."
-    return archive_email(gmail_service, email_id)
+    result = archive_email(gmail_service, email_id)
+    if not result.startswith("Failed"):
+        unread_emails.remove(email_id)
+        mailbox.update_labels([email_id], remove_label_ids=["INBOX", "UNREAD"])
+    return result
 
 
 def trash_one_email(email_id: str) -> str:
     """Move an email to Trash. It will be permanently deleted after 30 days."""
     if is_mock_read_email:
+        unread_emails.remove(email_id)
         return "Successfully moved email to trash (mock)."
-    return trash_email(gmail_service, email_id)
+    result = trash_email(gmail_service, email_id)
+    if not result.startswith("Failed"):
+        unread_emails.remove(email_id)
+        mailbox.update_labels([email_id], add_label_ids=["TRASH"])
+    return result
 
 
 email_assistant = ConversableAgent(
@@ -263,6 +304,7 @@ def trash_one_email(email_id: str) -> str:
 - trash_one_email: move email to Trash (deleted after 30 days)
 - get_email_body: fetch the body of a specific email
 - get_full_thread: fetch the full conversation thread of an email
+- search_emails(query, count): full-text search over the subject and body of emails
 
 Your workflow:
 1. Classify ALL provided emails into:
@@ -285,6 +327,7 @@ def trash_one_email(email_id: str) -> str:
         trash_one_email,
         get_email_body,
         get_full_thread,
+        search_emails,
     ],
 )
 
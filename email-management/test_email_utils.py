@@ -0,0 +1,342 @@
+"""Tests for the Gmail bulk fetch against a local fake Gmail API server.
+
+The server publishes the Gmail discovery document with its own address as the
+rootUrl, so the real googleapiclient service (and its batch requests) talk to it.
+"""
+
+import base64
+import email
+import json
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import googleapiclient
+import httplib2
+import pytest
+from googleapiclient.discovery import build
+
+import email_utils
+from email_utils import (
+    BulkActionJournal,
+    archive_emails_bulk,
+    fetch_emails_bulk,
+    fetch_messages_bulk,
+    mark_emails_as_read_bulk,
+    trash_emails_bulk,
+)
+
+DISCOVERY_DOC = os.path.join(
+    os.path.dirname(googleapiclient.__file__),
+    "discovery_cache",
+    "documents",
+    "gmail.v1.json",
+)
+PAGE_SIZE = 100
+
+
+def make_message(msg_id, labels=("UNREAD", "INBOX")):
+    body = base64.urlsafe_b64encode(f"Body of {msg_id}".encode()).decode()
+    return {
+        "id": msg_id,
+        "threadId": f"t-{msg_id}",
+        "labelIds": list(labels),
+        "internalDate": "1700000000000",
+        "payload": {
+            "headers": [
+                {"name": "Subject", "value": f"Subject {msg_id}"},
+                {"name": "To", "value": "me@example.com"},
+                {"name": "From", "value": "sender@example.com"},
+                {"name": "Date", "value": "Tue, 14 Nov 2023 22:13:20 +0000"},
+            ],
+            "parts": [{"mimeType": "text/plain", "body": {"data": body}}],
+        },
+    }
+
+
+class FakeGmail:
+    """Messages, failures to inject, and a record of the requests received."""
+
+    def __init__(self, message_ids):
+        self.message_ids = list(message_ids)
+        self.labels = {msg_id: ["UNREAD", "INBOX"] for msg_id in message_ids}
+        self.lock = threading.Lock()
+        self.batches = []  # message IDs of each batch request
+        self.gets = Counter()  # batched calls per message ID
+        self.sub_request_failures = {}  # message ID -> statuses to return in order
+        self.batch_failures = []  # statuses to return for whole batch requests
+        self.missing = set()  # message IDs answered with a 404
+
+
+def make_handler(gmail):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json"):
+            data = body.encode() if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/discovery/v1/apis/gmail/v1/rest":
+                with open(DISCOVERY_DOC) as f:
+                    doc = json.load(f)
+                root = f"http://127.0.0.1:{self.server.server_port}/"
+                doc["rootUrl"] = doc["baseUrl"] = root
+                self._send(200, json.dumps(doc))
+            elif url.path == "/gmail/v1/users/me/messages":
+                start = int(query.get("pageToken", ["0"])[0])
+                size = min(int(query.get("maxResults", [PAGE_SIZE])[0]), PAGE_SIZE)
+                page = gmail.message_ids[start : start + size]
+                response = {"messages": [{"id": i, "threadId": i} for i in page]}
+                if start + size < len(gmail.message_ids):
+                    response["nextPageToken"] = str(start + size)
+                self._send(200, json.dumps(response))
+            else:
+                self._send(404, json.dumps({"error": {"code": 404}}))
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if path == "/gmail/v1/users/me/messages/batchModify":
+                request = json.loads(body)
+                with gmail.lock:
+                    for msg_id in request["ids"]:
+                        labels = [
+                            label
+                            for label in gmail.labels[msg_id]
+                            if label not in request["removeLabelIds"]
+                        ]
+                        labels += [
+                            label
+                            for label in request["addLabelIds"]
+                            if label not in labels
+                        ]
+                        gmail.labels[msg_id] = labels
+                self._send(204, "")
+                return
+            if path != "/batch":
+                self._send(404, json.dumps({"error": {"code": 404}}))
+                return
+            multipart = email.message_from_bytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+            )
+            parts = multipart.get_payload()
+            # Sub-requests are messages.get (.../messages/<id>) or
+            # messages.trash/untrash (.../messages/<id>/<method>)
+            paths = [part.get_payload().split()[1].split("?")[0] for part in parts]
+            calls = [
+                (
+                    (p.split("/")[-2], p.split("/")[-1])
+                    if p.endswith("trash")
+                    else (p.split("/")[-1], "get")
+                )
+                for p in paths
+            ]
+            ids = [msg_id for msg_id, _ in calls]
+            with gmail.lock:
+                gmail.batches.append(ids)
+                batch_status = (
+                    gmail.batch_failures.pop(0) if gmail.batch_failures else None
+                )
+            if batch_status:
+                self._send(batch_status, json.dumps({"error": {"code": batch_status}}))
+                return
+
+            boundary = "fake_gmail_batch"
+            out = []
+            for part, (msg_id, method) in zip(parts, calls):
+                with gmail.lock:
+                    gmail.gets[msg_id] += 1
+                    failures = gmail.sub_request_failures.get(msg_id)
+                    status = failures.pop(0) if failures else 200
+                    if msg_id in gmail.missing:
+                        status = 404
+                    labels = gmail.labels.setdefault(msg_id, ["UNREAD", "INBOX"])
+                    if status == 200 and method == "trash":
+                        labels.append("TRASH")
+                    elif status == 200 and method == "untrash":
+                        labels.remove("TRASH")
+                    payload = (
+                        make_message(msg_id, labels)
+                        if status == 200
+                        else {"error": {"code": status}}
+                    )
+                content_id = part["Content-ID"].replace("<", "<response-", 1)
+                out.append(
+                    f"--{boundary}\r\n"
+                    "Content-Type: application/http\r\n"
+                    f"Content-ID: {content_id}\r\n\r\n"
+                    f"HTTP/1.1 {status} Status\r\n"
+                    "Content-Type: application/json\r\n\r\n"
+                    f"{json.dumps(payload)}\r\n"
+                )
+            out.append(f"--{boundary}--\r\n")
+            self._send(200, "".join(out), f"multipart/mixed; boundary={boundary}")
+
+    return Handler
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(email_utils.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def serve(message_ids):
+    """Starts a fake Gmail server; returns it with a service built from its discovery document."""
+    gmail = FakeGmail(message_ids)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(gmail))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service = build(
+        "gmail",
+        "v1",
+        http=httplib2.Http(timeout=10),
+        discoveryServiceUrl=f"http://127.0.0.1:{server.server_port}/discovery/v1/apis/{{api}}/{{apiVersion}}/rest",
+        static_discovery=False,
+        cache_discovery=False,
+    )
+    return server, gmail, service
+
+
+@pytest.fixture
+def fake_gmail():
+    servers = []
+
+    def start(message_ids):
+        server, gmail, service = serve(message_ids)
+        servers.append(server)
+        return gmail, service
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fetch_emails_bulk_pages_and_batches(fake_gmail):
+    ids = [f"m{i:03d}" for i in range(250)]
+    gmail, service = fake_gmail(ids)
+
+    emails = fetch_emails_bulk(service, filter_by=["UNREAD"], batch_size=100)
+
+    assert [e["message_id"] for e in emails] == ids
+    assert emails[0]["subject"] == "Subject m000"
+    assert emails[0]["body"] == "Body of m000"
+    assert sorted(len(batch) for batch in gmail.batches) == [50, 100, 100]
+    assert set(gmail.gets.values()) == {1}
+
+
+def test_fetch_emails_bulk_respects_limit(fake_gmail):
+    ids = [f"m{i:03d}" for i in range(250)]
+    gmail, service = fake_gmail(ids)
+
+    emails = fetch_emails_bulk(service, limit=120, batch_size=50)
+
+    assert [e["message_id"] for e in emails] == ids[:120]
+    assert sum(len(batch) for batch in gmail.batches) == 120
+
+
+def test_throttled_sub_requests_are_retried(fake_gmail, no_backoff):
+    ids = [f"m{i:03d}" for i in range(30)]
+    gmail, service = fake_gmail(ids)
+    gmail.sub_request_failures = {"m003": [429], "m007": [500, 503], "m011": [429]}
+
+    emails = fetch_emails_bulk(service, batch_size=30)
+
+    assert [e["message_id"] for e in emails] == ids
+    assert gmail.batches[1] == ["m003", "m007", "m011"]
+    assert gmail.batches[2] == ["m007"]
+    assert gmail.gets["m007"] == 3
+    assert len(no_backoff) == 2
+
+
+def test_failed_batch_is_retried_whole(fake_gmail, no_backoff):
+    ids = [f"m{i:03d}" for i in range(10)]
+    gmail, service = fake_gmail(ids)
+    gmail.batch_failures = [503, 429]
+
+    emails = fetch_messages_bulk(service, ids)
+
+    assert [e["message_id"] for e in emails] == ids
+    assert gmail.batches == [ids, ids, ids]
+    assert len(no_backoff) == 2
+
+
+def test_client_errors_are_skipped_not_retried(fake_gmail, no_backoff):
+    ids = [f"m{i:03d}" for i in range(5)]
+    gmail, service = fake_gmail(ids)
+    gmail.missing = {"m002"}
+
+    emails = fetch_messages_bulk(service, ids)
+
+    assert [e["message_id"] for e in emails] == ["m000", "m001", "m003", "m004"]
+    assert len(gmail.batches) == 1
+    assert no_backoff == []
+
+
+def test_undo_archive_adds_back_only_the_labels_each_email_had(fake_gmail, tmp_path):
+    ids = ["m0", "m1", "m2"]
+    gmail, service = fake_gmail(ids)
+    gmail.labels["m1"] = ["INBOX"]  # already read
+    gmail.labels["m2"] = ["UNREAD", "CATEGORY_UPDATES"]  # not in the inbox
+    journal = BulkActionJournal(str(tmp_path / "journal.jsonl"))
+
+    assert archive_emails_bulk(service, ids, journal=journal) == "3 emails archived."
+    assert gmail.labels == {"m0": [], "m1": [], "m2": ["CATEGORY_UPDATES"]}
+
+    result, entry = journal.undo(service)
+
+    assert result.startswith("Undid archive of 3 emails")
+    assert {msg_id: set(labels) for msg_id, labels in gmail.labels.items()} == {
+        "m0": {"UNREAD", "INBOX"},
+        "m1": {"INBOX"},
+        "m2": {"CATEGORY_UPDATES", "UNREAD"},
+    }
+    assert entry["removed_labels"] == {
+        "m0": ["INBOX", "UNREAD"],
+        "m1": ["INBOX"],
+        "m2": ["UNREAD"],
+    }
+    assert journal.undo(service) == ("No bulk action to undo.", None)
+
+
+def test_mark_read_journals_only_unread_emails(fake_gmail, tmp_path):
+    ids = ["m0", "m1"]
+    gmail, service = fake_gmail(ids)
+    gmail.labels["m1"] = ["INBOX"]
+    journal = BulkActionJournal(str(tmp_path / "journal.jsonl"))
+
+    mark_emails_as_read_bulk(service, ids, journal=journal)
+
+    assert journal.entries()[0]["message_ids"] == ["m0"]
+    _, entry = journal.undo(service)
+    assert entry["message_ids"] == ["m0"]
+    assert gmail.labels == {"m0": ["INBOX", "UNREAD"], "m1": ["INBOX"]}
+
+
+def test_trash_journals_only_the_emails_that_were_trashed(fake_gmail, tmp_path):
+    ids = ["m0", "m1", "m2"]
+    gmail, service = fake_gmail(ids)
+    gmail.missing = {"m1"}
+    journal = BulkActionJournal(str(tmp_path / "journal.jsonl"))
+
+    assert (
+        trash_emails_bulk(service, ids, journal=journal) == "2 emails moved to trash."
+    )
+    assert journal.entries()[0]["message_ids"] == ["m0", "m2"]
+
+    result, entry = journal.undo(service)
+
+    assert result.startswith("Undid trash of 2 emails")
+    assert entry["message_ids"] == ["m0", "m2"]
+    assert "TRASH" not in gmail.labels["m0"] + gmail.labels["m2"]
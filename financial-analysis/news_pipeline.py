@@ -0,0 +1,248 @@
+"""
+Async Yahoo Finance news pipeline: list a ticker's recent articles, fetch them
+concurrently through one pooled HTTP client, extract their text in a worker
+pool, and return every summary in a single tool call.
+
+Extracted article text is cached on disk keyed by URL and modifiedDate, so an
+article is only downloaded again when Yahoo reports that it changed.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from lxml import etree
+from lxml import html as lxml_html
+
+YAHOO_BASE_URL = "https://ca.finance.yahoo.com"
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:130.0) Gecko/20100101 Firefox/130.0"
+)
+NEWS_CACHE_DIR = "news_cache"
+
+
+@dataclass
+class Article:
+    url: str
+    title: str
+    modified: str
+    text: str = ""
+    from_cache: bool = False
+    error: str | None = None
+
+    def summary(self, summary_length: int = 1000) -> str:
+        if self.error:
+            return f"Error fetching article: {self.error}"
+        return textwrap.fill(self.text[:summary_length], width=80)
+
+
+def extract_article_text(page: str) -> str:
+    """Paragraph text of an article page. lxml parses in C and releases the GIL."""
+    if not page.strip():
+        return ""
+    tree = lxml_html.fromstring(page)
+    paragraphs = tree.xpath("//article//p") or tree.xpath("//p")
+    texts = (" ".join(p.text_content().split()) for p in paragraphs)
+    return "\n".join(t for t in texts if t)
+
+
+class ArticleCache:
+    """One JSON file per (url, modifiedDate)."""
+
+    def __init__(self, cache_dir: str = NEWS_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str, modified: str) -> Path:
+        key = hashlib.sha256(f"{url}\n{modified}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str, modified: str) -> str | None:
+        try:
+            return json.loads(self._path(url, modified).read_text())["text"]
+        except (OSError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, url: str, modified: str, text: str) -> None:
+        self._path(url, modified).write_text(
+            json.dumps({"url": url, "modified": modified, "text": text})
+        )
+
+
+def _parse_modified(value: str) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class NewsPipeline:
+    """
+    Holds the pooled client, the parser pool and the article cache for a run.
+    The client is created lazily inside the running event loop; call aclose()
+    before the loop ends.
+    """
+
+    def __init__(
+        self,
+        base_url: str = YAHOO_BASE_URL,
+        cache_dir: str = NEWS_CACHE_DIR,
+        max_concurrency: int = 8,
+        parser_workers: int = 4,
+        timeout: float = 15.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cache = ArticleCache(cache_dir)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._parser_pool = ThreadPoolExecutor(max_workers=parser_workers)
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT},
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._parser_pool.shutdown(wait=False)
+
+    # -------------- Listing --------------
+    # code retrieved and modified from https://stackoverflow.com/questions/79019497/retrieving-news-articles-from-yahoo-finance-canada-website
+    async def get_uuids(self, company_code: str) -> str:
+        url = (
+            f"{self.base_url}/_finance_doubledown/api/resource"
+            "?bkt=finance-CA-en-CA-def&device=desktop&ecma=modern"
+        )
+        data = {
+            "requests": {
+                "g0": {
+                    "resource": "StreamService",
+                    "operation": "read",
+                    "params": {
+                        "forceJpg": True,
+                        "releasesParams": {"limit": 50, "offset": 0},
+                        "ncpParams": {
+                            "query": {
+                                "id": "tickers-news-stream",
+                                "version": "v1",
+                                "namespace": "finance",
+                                "listAlias": "finance-CA-en-CA-ticker-news",
+                            }
+                        },
+                        "useNCP": True,
+                        "batches": {
+                            "pagination": True,
+                            "size": 10,
+                            "timeout": 1500,
+                            "total": 170,
+                        },
+                        "category": f"YFINANCE:{company_code}",
+                    },
+                }
+            }
+        }
+        response = await self.client.post(url, json=data)
+        response.raise_for_status()
+        uuids = response.json()["g0"]["data"]["stream_pagination"]["gqlVariables"][
+            "tickerStream"
+        ]["pagination"]["uuids"]
+        return ",".join(uuids) if isinstance(uuids, list) else uuids
+
+    async def list_articles(
+        self, company_code: str, max_news: int = 5, max_age_days: int = 365
+    ) -> list[Article]:
+        """The most recent articles for a ticker, newest first as Yahoo returns them."""
+        uuids = re.sub(":STORY|:VIDEO", "", await self.get_uuids(company_code))
+        response = await self.client.get(
+            f"{self.base_url}/caas/content/article/",
+            params={"uuid": uuids, "appid": "article2_csn"},
+        )
+        response.raise_for_status()
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        articles = []
+        for item in response.json().get("items", []):
+            partner = (item.get("data") or {}).get("partnerData") or {}
+            modified = partner.get("modifiedDate")
+            if not (modified and partner.get("finalUrl")):
+                continue
+            modified_at = _parse_modified(modified)
+            if modified_at is not None and modified_at < cutoff:
+                continue
+            articles.append(
+                Article(
+                    url=partner["finalUrl"],
+                    title=partner.get("pageTitle", ""),
+                    modified=modified,
+                )
+            )
+            if len(articles) == max_news:
+                break
+        return articles
+
+    # -------------- Fetching --------------
+    async def _fetch_text(self, article: Article, slots: asyncio.Semaphore) -> Article:
+        cached = self.cache.get(article.url, article.modified)
+        if cached is not None:
+            article.text, article.from_cache = cached, True
+            return article
+        try:
+            async with slots:
+                response = await self.client.get(article.url)
+                response.raise_for_status()
+            loop = asyncio.get_running_loop()
+            article.text = await loop.run_in_executor(
+                self._parser_pool, extract_article_text, response.text
+            )
+        except (httpx.HTTPError, ValueError, etree.LxmlError) as e:
+            # e.g. a page lxml can't parse ("Document is empty") fails only this article
+            article.error = str(e) or type(e).__name__
+            return article
+        self.cache.put(article.url, article.modified, article.text)
+        return article
+
+    async def fetch_articles(self, articles: list[Article]) -> list[Article]:
+        slots = asyncio.Semaphore(self.max_concurrency)
+        return list(
+            await asyncio.gather(*(self._fetch_text(a, slots) for a in articles))
+        )
+
+    async def news_summaries(
+        self, company_code: str, max_news: int = 5, summary_length: int = 1000
+    ) -> str:
+        """Lists, fetches and summarizes the top articles. Used as the agent's news tool."""
+        try:
+            articles = await self.list_articles(company_code, max_news)
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            return f"Error listing news for {company_code}: {e}"
+        if not articles:
+            return (
+                "No news found. The company code may be incorrect, "
+                "or please use a different way to search for news."
+            )
+        articles = await self.fetch_articles(articles)
+        return "\n\n".join(
+            f"News URL:  {a.url}\nModifiedDate: {a.modified}\nTitle: {a.title}\n"
+            f"Summary:\n{a.summary(summary_length)}"
+            for a in articles
+        )
@@ -0,0 +1,186 @@
+"""
+Stock price analytics computed locally, so the research assistant no longer
+writes and executes its own data fetching and plotting code on every run.
+
+Daily OHLC bars are cached as one Parquet file per ticker in price_cache/.
+A cached ticker is only topped up with the bars since its last cached date.
+The returns, volatility and drawdown for all requested tickers are computed
+together on one aligned DataFrame.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+PRICE_CACHE_DIR = "price_cache"
+OHLC_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+# A little over a year, so the 1-year change always has a starting bar
+LOOKBACK_DAYS = 400
+# A cache file younger than this is used as is
+REFRESH_AFTER = timedelta(hours=12)
+TRADING_DAYS = 252
+
+# (ticker, start date or None for the full lookback) -> OHLC bars indexed by date
+Fetcher = Callable[[str, "pd.Timestamp | None"], pd.DataFrame]
+
+
+def fetch_yahoo(ticker: str, start: pd.Timestamp | None) -> pd.DataFrame:
+    import yfinance as yf
+
+    if start is None:
+        start = pd.Timestamp.today().normalize() - pd.Timedelta(days=LOOKBACK_DAYS)
+    return yf.Ticker(ticker).history(start=start.date(), auto_adjust=True)
+
+
+def _normalize(bars: pd.DataFrame) -> pd.DataFrame:
+    bars = bars[[c for c in OHLC_COLUMNS if c in bars.columns]].copy()
+    index = pd.DatetimeIndex(bars.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    bars.index = index.normalize().rename("Date")
+    return bars[~bars.index.duplicated(keep="last")].sort_index()
+
+
+class PriceCache:
+    """Per-ticker Parquet files of daily bars, updated incrementally."""
+
+    def __init__(self, cache_dir: str = PRICE_CACHE_DIR, fetch: Fetcher = fetch_yahoo):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fetch = fetch
+
+    def _path(self, ticker: str) -> Path:
+        return self.cache_dir / f"{ticker.upper()}.parquet"
+
+    def bars(self, ticker: str) -> pd.DataFrame:
+        path = self._path(ticker)
+        cached = pd.read_parquet(path) if path.exists() else None
+        if cached is not None and not cached.empty:
+            age = datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)
+            if age < REFRESH_AFTER:
+                return cached
+            # Re-fetch the last cached bar too: it may have been a partial day
+            try:
+                new = self.fetch(ticker, cached.index[-1])
+            except Exception as e:
+                print(f"⚠️  Updating {ticker} failed, using cached prices: {e}")
+                return cached
+        else:
+            cached, new = None, self.fetch(ticker, None)
+
+        new = _normalize(new) if new is not None and not new.empty else None
+        if new is None:
+            if cached is None:
+                raise ValueError(f"No price data for {ticker}")
+            bars = cached
+        elif cached is None:
+            bars = new
+        else:
+            bars = pd.concat([cached, new])
+            bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+
+        tmp = path.with_suffix(".tmp")
+        bars.to_parquet(tmp)
+        os.replace(tmp, path)
+        return bars
+
+    def closes(self, tickers: list[str]) -> tuple[pd.DataFrame, dict[str, str]]:
+        """Aligned close prices (one column per ticker) and per-ticker errors."""
+        with ThreadPoolExecutor(max_workers=min(8, len(tickers))) as executor:
+            futures = {t: executor.submit(self.bars, t) for t in tickers}
+        columns, errors = {}, {}
+        for ticker, future in futures.items():
+            try:
+                columns[ticker] = future.result()["Close"]
+            except Exception as e:
+                errors[ticker] = str(e) or type(e).__name__
+        # Markets close on different holidays: carry the last close forward
+        closes = pd.DataFrame(columns).sort_index().ffill()
+        return closes, errors
+
+
+def _close_on_or_before(closes: pd.DataFrame, when: pd.Timestamp) -> pd.Series:
+    before = closes.loc[:when]
+    if before.empty:
+        return pd.Series(np.nan, index=closes.columns)
+    return before.iloc[-1]
+
+
+def price_metrics(closes: pd.DataFrame) -> pd.DataFrame:
+    """Monthly, 3-month, YTD and 1-year change, volatility and drawdown per ticker."""
+    latest_date = closes.index[-1]
+    latest = closes.iloc[-1]
+    anchors = {
+        "1M %": latest_date - pd.DateOffset(months=1),
+        "3M %": latest_date - pd.DateOffset(months=3),
+        # YTD is measured from the last close of the previous year
+        "YTD %": pd.Timestamp(latest_date.year - 1, 12, 31),
+        "1Y %": latest_date - pd.DateOffset(years=1),
+    }
+    metrics = pd.DataFrame(
+        {
+            label: (latest / _close_on_or_before(closes, when) - 1) * 100
+            for label, when in anchors.items()
+        }
+    )
+
+    year = closes.loc[anchors["1Y %"] :]
+    log_returns = np.log(year).diff()
+    metrics["Volatility %"] = log_returns.std() * np.sqrt(TRADING_DAYS) * 100
+    metrics["Max drawdown %"] = (year / year.cummax() - 1).min() * 100
+    metrics.insert(0, "Last close", latest)
+    return metrics
+
+
+def plot_price_change(closes: pd.DataFrame, path: str) -> None:
+    """One line per ticker: % change over the last year."""
+    year = closes.loc[closes.index[-1] - pd.DateOffset(years=1) :]
+    change = (year / year.bfill().iloc[0] - 1) * 100
+
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    for ticker in change.columns:
+        ax.plot(change.index, change[ticker], linewidth=1.5, label=ticker)
+    ax.legend()
+    ax.axhline(0, color="grey", linewidth=0.8)
+    ax.set_title(f"1-year price change: {', '.join(closes.columns)}")
+    ax.set_ylabel("Change (%)")
+    ax.grid(alpha=0.3)
+    fig.tight_layout()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, dpi=120)
+
+
+def _markdown_table(metrics: pd.DataFrame) -> str:
+    header = ["Ticker", *metrics.columns]
+    rows = [
+        [ticker, *("n/a" if pd.isna(v) else f"{v:,.2f}" for v in values)]
+        for ticker, values in zip(metrics.index, metrics.to_numpy())
+    ]
+    return "\n".join(
+        "| " + " | ".join(row) + " |" for row in [header, ["---"] * len(header), *rows]
+    )
+
+
+def analyze_prices(cache: PriceCache, tickers: list[str], plot_path: str) -> str:
+    """Markdown table of the price metrics, plus where the plot was saved."""
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    if not tickers:
+        return "No tickers given."
+    closes, errors = cache.closes(tickers)
+    lines = []
+    if not closes.empty:
+        metrics = price_metrics(closes)
+        lines.append(f"Prices as of {closes.index[-1].date()}:\n")
+        lines.append(_markdown_table(metrics))
+        plot_price_change(closes, plot_path)
+        lines.append(f"\n1-year price change plot saved to `{plot_path}`.")
+    for ticker, error in errors.items():
+        lines.append(f"Error getting prices for {ticker}: {error}")
+    return "\n".join(lines)
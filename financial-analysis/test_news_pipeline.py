@@ -0,0 +1,207 @@
+"""Tests for news_pipeline against a local fixture server standing in for Yahoo."""
+
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from news_pipeline import NewsPipeline, extract_article_text
+
+RECENT = (datetime.now(timezone.utc) - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+STALE = (datetime.now(timezone.utc) - timedelta(days=800)).strftime(
+    "%Y-%m-%dT%H:%M:%SZ"
+)
+
+
+class FixtureYahoo(BaseHTTPRequestHandler):
+    """Serves the stream service, the article list and the article pages."""
+
+    articles: dict[str, tuple[str, str, str]] = {}  # uuid -> (path, title, modified)
+    hits: dict[str, int] = {}
+    delay = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: str, content_type: str) -> None:
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        uuids = ",".join(f"{uuid}:STORY" for uuid in self.articles)
+        body = {
+            "g0": {
+                "data": {
+                    "stream_pagination": {
+                        "gqlVariables": {
+                            "tickerStream": {"pagination": {"uuids": uuids}}
+                        }
+                    }
+                }
+            }
+        }
+        self._send(200, json.dumps(body), "application/json")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        type(self).hits[url.path] = self.hits.get(url.path, 0) + 1
+        if url.path == "/caas/content/article/":
+            host = f"http://{self.headers['Host']}"
+            items = [
+                {
+                    "data": {
+                        "partnerData": {
+                            "finalUrl": host + path,
+                            "pageTitle": title,
+                            "modifiedDate": modified,
+                        }
+                    }
+                }
+                for uuid, (path, title, modified) in self.articles.items()
+                if uuid in parse_qs(url.query)["uuid"][0].split(",")
+            ]
+            self._send(
+                200, json.dumps({"items": [{"data": {}}] + items}), "application/json"
+            )
+            return
+        if url.path == "/news/missing":
+            self._send(404, "not found", "text/plain")
+            return
+        if url.path == "/news/unparsable":
+            self._send(200, "<!-- no document -->", "text/html")
+            return
+        threading.Event().wait(self.delay)
+        page = (
+            "<html><body><nav><p>Menu</p></nav><article>"
+            f"<h1>{url.path}</h1><p>First   paragraph of {url.path}.</p>"
+            "<p>Second paragraph.</p></article></body></html>"
+        )
+        self._send(200, page, "text/html")
+
+
+class FixtureServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # clients that timed out hang up mid-response
+
+
+@pytest.fixture
+def yahoo():
+    FixtureYahoo.articles = {
+        f"uuid{i}": (f"/news/article-{i}", f"Article {i}", RECENT) for i in range(6)
+    }
+    FixtureYahoo.hits = {}
+    FixtureYahoo.delay = 0.0
+    server = FixtureServer(("127.0.0.1", 0), FixtureYahoo)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _summaries(base_url: str, cache_dir, **kwargs) -> str:
+    async def run():
+        pipeline = NewsPipeline(base_url=base_url, cache_dir=str(cache_dir), **kwargs)
+        try:
+            return await pipeline.news_summaries("AAPL")
+        finally:
+            await pipeline.aclose()
+
+    return asyncio.run(run())
+
+
+def test_extract_article_text_prefers_article_body():
+    page = "<p>Cookie banner</p><article><p>Body  text</p><p></p></article>"
+    assert extract_article_text(page) == "Body text"
+    assert extract_article_text("<div><p>Only</p></div>") == "Only"
+    assert extract_article_text("") == ""
+
+
+def test_summaries_for_top_articles_in_one_call(yahoo, tmp_path):
+    result = _summaries(yahoo, tmp_path)
+
+    # max_news=5: the sixth article is not fetched
+    assert result.count("News URL:") == 5
+    assert "Title: Article 0" in result
+    assert "First paragraph of /news/article-0." in result
+    assert "Menu" not in result
+    assert "/news/article-5" not in FixtureYahoo.hits
+
+
+def test_stale_articles_are_skipped(yahoo, tmp_path):
+    FixtureYahoo.articles["uuid0"] = ("/news/article-0", "Old news", STALE)
+    result = _summaries(yahoo, tmp_path)
+    assert "Old news" not in result
+    assert "Title: Article 5" in result
+
+
+def test_articles_are_fetched_concurrently(yahoo, tmp_path):
+    FixtureYahoo.delay = 0.3
+
+    async def run():
+        pipeline = NewsPipeline(base_url=yahoo, cache_dir=str(tmp_path))
+        try:
+            start = asyncio.get_running_loop().time()
+            await pipeline.news_summaries("AAPL")
+            return asyncio.get_running_loop().time() - start
+        finally:
+            await pipeline.aclose()
+
+    # Five articles at 0.3s each would take 1.5s one after another
+    assert asyncio.run(run()) < 1.0
+
+
+def test_cache_keyed_by_url_and_modified_date(yahoo, tmp_path):
+    _summaries(yahoo, tmp_path)
+    _summaries(yahoo, tmp_path)
+    assert FixtureYahoo.hits["/news/article-0"] == 1
+
+    # Yahoo reports an update: only that article is downloaded again
+    newer = (datetime.now(timezone.utc) - timedelta(days=1)).strftime(
+        "%Y-%m-%dT%H:%M:%SZ"
+    )
+    FixtureYahoo.articles["uuid0"] = ("/news/article-0", "Article 0", newer)
+    _summaries(yahoo, tmp_path)
+    assert FixtureYahoo.hits["/news/article-0"] == 2
+    assert FixtureYahoo.hits["/news/article-1"] == 1
+
+
+def test_failed_article_does_not_fail_the_others(yahoo, tmp_path):
+    FixtureYahoo.articles["uuid0"] = ("/news/missing", "Gone", RECENT)
+    result = _summaries(yahoo, tmp_path)
+    assert "Error fetching article" in result
+    assert "First paragraph of /news/article-1." in result
+
+    # Errors are not cached
+    _summaries(yahoo, tmp_path)
+    assert FixtureYahoo.hits["/news/missing"] == 2
+
+
+def test_unparsable_article_is_reported_as_fetch_failure(yahoo, tmp_path):
+    FixtureYahoo.articles["uuid0"] = ("/news/unparsable", "Empty", RECENT)
+    result = _summaries(yahoo, tmp_path)
+    assert "Error fetching article: Document is empty" in result
+    assert "First paragraph of /news/article-1." in result
+
+    _summaries(yahoo, tmp_path)
+    assert FixtureYahoo.hits["/news/unparsable"] == 2
+
+
+def test_timeout_is_reported_per_article(yahoo, tmp_path):
+    FixtureYahoo.delay = 1.0
+    result = _summaries(yahoo, tmp_path, timeout=0.2)
+    assert result.count("Error fetching article") == 5
+
+
+def test_unreachable_listing_returns_error(tmp_path):
+    result = _summaries("http://127.0.0.1:9", tmp_path)
+    assert result.startswith("Error listing news for AAPL")
@@ -0,0 +1,123 @@
+"""Tests for price_analytics with a fake price fetcher instead of Yahoo."""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_analytics import PriceCache, analyze_prices, price_metrics
+
+END = pd.Timestamp("2025-06-30")
+
+
+def _bars(closes: pd.Series) -> pd.DataFrame:
+    # Like yfinance: timezone-aware timestamps
+    closes = closes.tz_localize("America/New_York")
+    return pd.DataFrame(
+        {
+            "Open": closes,
+            "High": closes * 1.01,
+            "Low": closes * 0.99,
+            "Close": closes,
+            "Volume": 1000,
+        }
+    )
+
+
+class FakeFetcher:
+    """Serves business-day bars up to END; records the start of each request."""
+
+    def __init__(self, series: dict[str, pd.Series]):
+        self.series = series
+        self.calls: list[tuple[str, pd.Timestamp | None]] = []
+
+    def __call__(self, ticker, start):
+        self.calls.append((ticker, start))
+        if ticker not in self.series:
+            return pd.DataFrame()
+        closes = self.series[ticker]
+        if start is not None:
+            closes = closes.loc[start:]
+        return _bars(closes)
+
+
+def _linear(start: float, stop: float) -> pd.Series:
+    days = pd.bdate_range(END - pd.DateOffset(days=400), END)
+    return pd.Series(np.linspace(start, stop, len(days)), index=days)
+
+
+@pytest.fixture
+def fetcher():
+    drop = _linear(100, 200)
+    drop.loc["2025-03-03":"2025-03-31"] = 120  # a ~30% drawdown in March
+    return FakeFetcher({"UP": _linear(100, 200), "DROP": drop})
+
+
+def test_metrics(fetcher, tmp_path):
+    closes, errors = PriceCache(str(tmp_path), fetch=fetcher).closes(["UP", "DROP"])
+    metrics = price_metrics(closes)
+
+    assert not errors
+    up = metrics.loc["UP"]
+    assert up["Last close"] == pytest.approx(200)
+    series = fetcher.series["UP"]
+    for label, start in [
+        ("1M %", END - pd.DateOffset(months=1)),
+        ("3M %", END - pd.DateOffset(months=3)),
+        ("YTD %", pd.Timestamp("2024-12-31")),
+        ("1Y %", END - pd.DateOffset(years=1)),
+    ]:
+        expected = (200 / series.loc[:start].iloc[-1] - 1) * 100
+        assert up[label] == pytest.approx(expected)
+    assert up["Max drawdown %"] == pytest.approx(0)
+    assert metrics.loc["DROP", "Max drawdown %"] < -25
+    assert metrics.loc["DROP", "Volatility %"] > up["Volatility %"]
+
+
+def test_cache_is_updated_incrementally(fetcher, tmp_path):
+    cache = PriceCache(str(tmp_path), fetch=fetcher)
+    full = fetcher.series["UP"]
+    fetcher.series["UP"] = full.loc[: END - pd.DateOffset(days=10)]
+    first = cache.bars("UP")
+    assert fetcher.calls == [("UP", None)]
+
+    # Fresh cache files are used as is
+    cache.bars("UP")
+    assert len(fetcher.calls) == 1
+
+    # An old one is topped up from its last cached date
+    old = time.time() - 24 * 3600
+    os.utime(tmp_path / "UP.parquet", (old, old))
+    fetcher.series["UP"] = full
+    updated = cache.bars("UP")
+    assert fetcher.calls[-1] == ("UP", first.index[-1])
+    assert updated.index[-1] == END
+    assert updated.index.is_unique
+    assert len(updated) == len(full)
+
+
+def test_cached_prices_used_when_update_fails(fetcher, tmp_path):
+    cache = PriceCache(str(tmp_path), fetch=fetcher)
+    cached = cache.bars("UP")
+    old = time.time() - 24 * 3600
+    os.utime(tmp_path / "UP.parquet", (old, old))
+
+    def offline(ticker, start):
+        raise ConnectionError("offline")
+
+    cache.fetch = offline
+    pd.testing.assert_frame_equal(cache.bars("UP"), cached, check_freq=False)
+
+
+def test_analyze_prices_reports_table_plot_and_errors(fetcher, tmp_path):
+    plot = tmp_path / "plots" / "change.png"
+    cache = PriceCache(str(tmp_path / "cache"), fetch=fetcher)
+    report = analyze_prices(cache, ["up", "DROP", "NOPE", "UP"], str(plot))
+
+    assert "| Ticker | Last close | 1M % | 3M % | YTD % | 1Y %" in report
+    assert report.count("| UP |") == 1
+    assert "| DROP |" in report
+    assert "Error getting prices for NOPE: No price data for NOPE" in report
+    assert plot.stat().st_size > 0
@@ -1,7 +1,10 @@
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel
 import requests
+from requests.adapters import HTTPAdapter
 from autogen.agentchat.group import (
     ReplyResult,
     ContextVariables,
@@ -10,6 +13,25 @@
 )
 
 _GOOGLE_MAP_API_KEY = os.environ.get("GOOGLE_MAP_API_KEY")
+# Overridable so a local stand-in for the Maps API can be used
+_GOOGLE_MAP_API_BASE = os.environ.get(
+    "GOOGLE_MAP_API_BASE", "https://maps.googleapis.com/maps/api"
+)
+_TRAVEL_TIME_CACHE_PATH = os.environ.get(
+    "TRAVEL_TIME_CACHE_PATH", "./trip_planner_data/travel_time_cache.json"
+)
+_TRAVEL_MODE = "walking"  # driving (default), bicycling, transit
+_MAX_CONCURRENT_REQUESTS = 8
+_REQUEST_TIMEOUT_SECONDS = 10
+
+# One pooled session for all Directions calls, sized for the concurrent lookups
+_session = requests.Session()
+_session.mount(
+    "https://", HTTPAdapter(pool_maxsize=_MAX_CONCURRENT_REQUESTS, max_retries=2)
+)
+_session.mount(
+    "http://", HTTPAdapter(pool_maxsize=_MAX_CONCURRENT_REQUESTS, max_retries=2)
+)
 
 
 class Event(BaseModel):
@@ -27,19 +49,24 @@ class Itinerary(BaseModel):
     days: list[Day]
 
 
-def _fetch_travel_time(origin: str, destination: str) -> dict:
+def _fetch_travel_time(origin: str, destination: str, mode: str = _TRAVEL_MODE) -> dict:
     """Retrieves route information using Google Maps Directions API.
     API documentation at https://developers.google.com/maps/documentation/directions/get-directions
     """
-    endpoint = "https://maps.googleapis.com/maps/api/directions/json"
+    endpoint = f"{_GOOGLE_MAP_API_BASE}/directions/json"
     params = {
         "origin": origin,
         "destination": destination,
-        "mode": "walking",  # driving (default), bicycling, transit
+        "mode": mode,
         "key": _GOOGLE_MAP_API_KEY,
     }
 
-    response = requests.get(endpoint, params=params)
+    try:
+        response = _session.get(
+            endpoint, params=params, timeout=_REQUEST_TIMEOUT_SECONDS
+        )
+    except requests.RequestException as e:
+        return {"error": f"Failed to retrieve the route information: {e}"}
     if response.status_code == 200:
         return response.json()
     else:
@@ -49,6 +76,84 @@ def _fetch_travel_time(origin: str, destination: str) -> dict:
         }
 
 
+class TravelTimeCache:
+    """Persistent JSON cache of route legs, keyed by normalized origin/destination and travel mode."""
+
+    def __init__(self, path: str = _TRAVEL_TIME_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self._legs: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self._legs = {}
+
+    @staticmethod
+    def key(origin: str, destination: str, mode: str) -> str:
+        def normalize(location: str) -> str:
+            return " ".join(location.lower().replace(",", " , ").split())
+
+        return f"{mode}|{normalize(origin)}|{normalize(destination)}"
+
+    def get(self, origin: str, destination: str, mode: str) -> dict | None:
+        return self._legs.get(self.key(origin, destination, mode))
+
+    def set(self, origin: str, destination: str, mode: str, leg: dict) -> None:
+        with self._lock:
+            self._legs[self.key(origin, destination, mode)] = leg
+
+    def save(self) -> None:
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._legs, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def _resolve_travel_times(
+    legs: list[tuple[str, str]],
+    mode: str = _TRAVEL_MODE,
+    cache: TravelTimeCache | None = None,
+) -> dict[tuple[str, str], dict | None]:
+    """Resolves every unique (origin, destination) leg, from the cache or concurrent Directions calls.
+
+    Only the leg's duration and distance are kept, and only successful lookups are cached.
+    """
+    cache = cache or TravelTimeCache()
+    resolved: dict[tuple[str, str], dict | None] = {}
+    misses = []
+    for leg in dict.fromkeys(legs):  # de-duplicate, keep order
+        cached = cache.get(*leg, mode)
+        if cached is not None:
+            resolved[leg] = cached
+        else:
+            misses.append(leg)
+
+    def fetch(leg: tuple[str, str]) -> dict | None:
+        response = _fetch_travel_time(origin=leg[0], destination=leg[1], mode=mode)
+        try:
+            route_leg = response["routes"][0]["legs"][0]
+            return {
+                "duration": {"text": route_leg["duration"]["text"]},
+                "distance": {"text": route_leg["distance"]["text"]},
+            }
+        except (KeyError, IndexError):
+            return None
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_REQUESTS) as pool:
+            for leg, route_leg in zip(misses, pool.map(fetch, misses)):
+                resolved[leg] = route_leg
+                if route_leg is not None:
+                    cache.set(*leg, mode, route_leg)
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"Note: Unable to save travel time cache: {e}")
+
+    return resolved
+
+
 def update_itinerary_with_travel_times(
     context_variables: ContextVariables,
 ) -> ReplyResult:
@@ -72,19 +177,31 @@ def update_itinerary_with_travel_times(
     itinerary_object = Itinerary.model_validate(
         json.loads(context_variables["structured_itinerary"])
     )
+
+    def leg_between(pre_event: Event, cur_event: Event) -> tuple[str, str]:
+        return (
+            f"{pre_event.location}, {pre_event.city}",
+            f"{cur_event.location}, {cur_event.city}",
+        )
+
+    # Look up every leg of the whole itinerary in one go (cached, de-duplicated and concurrent)
+    travel_times = _resolve_travel_times(
+        [
+            leg_between(day.events[i - 1], day.events[i])
+            for day in itinerary_object.days
+            for i in range(1, len(day.events))
+        ]
+    )
+
     for day in itinerary_object.days:
         events = day.events
         new_events = []
         for i, cur_event in enumerate(events):
             if i > 0:
                 pre_event = events[i - 1]
-                origin = f"{pre_event.location}, {pre_event.city}"
-                destination = f"{cur_event.location}, {cur_event.city}"
-                maps_api_response = _fetch_travel_time(
-                    origin=origin, destination=destination
-                )
-                try:
-                    leg = maps_api_response["routes"][0]["legs"][0]
+                origin, destination = leg_between(pre_event, cur_event)
+                leg = travel_times.get((origin, destination))
+                if leg is not None:
                     travel_time_txt = (
                         f"{leg['duration']['text']}, ({leg['distance']['text']})"
                     )
@@ -96,7 +213,7 @@ def update_itinerary_with_travel_times(
                             description=travel_time_txt,
                         )
                     )
-                except (KeyError, IndexError):
+                else:
                     print(
                         f"Note: Unable to get travel time from {origin} to {destination}"
                     )
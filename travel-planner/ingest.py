@@ -0,0 +1,291 @@
+"""Incremental, idempotent loading of the trip planner JSON data into FalkorDB.
+
+The ontology in ontology.py maps 1:1 onto the JSON fields, so records are
+written straight into the graph with batched Cypher instead of going through
+graphrag_sdk's LLM-based extraction. Every node stores a fingerprint of the
+record it came from; the set of fingerprints already in the graph is the
+manifest, so re-running only writes new or changed records.
+
+    python ingest.py                # load new/changed records
+    python ingest.py --dry-run      # show what would change
+    python ingest.py --prune        # also delete records removed from the JSON
+    python ingest.py --benchmark 100000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from falkordb import FalkorDB, Graph
+from redis.exceptions import ResponseError
+
+from ontology import get_trip_ontology
+
+GRAPH_NAME = "trip_data"
+BATCH_SIZE = 1000
+INPUT_PATHS = {
+    "Attraction": "./trip_planner_data/attractions.json",
+    "City": "./trip_planner_data/cities.json",
+    "Restaurant": "./trip_planner_data/restaurants.json",
+}
+
+# Per label: the properties copied from the JSON record, and the Cypher that
+# links a node to its parent (row.parent) after it has been merged.
+_PROPERTIES = {
+    "City": ["weather", "population"],
+    "Attraction": ["description", "type"],
+    "Restaurant": ["description", "rating", "food_type"],
+}
+_LINK = {
+    "City": "MERGE (p:Country {name: row.parent}) MERGE (n)-[:IN_COUNTRY]->(p)",
+    "Attraction": "MERGE (p:City {name: row.parent}) MERGE (n)-[:IN_CITY]->(p)",
+    "Restaurant": "MERGE (p:City {name: row.parent}) MERGE (n)-[:IN_CITY]->(p)",
+}
+_PARENT_FIELD = {"City": "country", "Attraction": "city", "Restaurant": "city"}
+
+
+def fingerprint(record: dict[str, Any]) -> str:
+    return hashlib.sha256(
+        json.dumps(record, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()[:16]
+
+
+@dataclass
+class IngestPlan:
+    added: dict[str, list[dict]] = field(default_factory=dict)
+    changed: dict[str, list[dict]] = field(default_factory=dict)
+    removed: dict[str, list[str]] = field(default_factory=dict)
+    unchanged: int = 0
+
+    def describe(self) -> str:
+        lines = []
+        for label in _PROPERTIES:
+            added = [r["name"] for r in self.added.get(label, [])]
+            changed = [r["name"] for r in self.changed.get(label, [])]
+            removed = self.removed.get(label, [])
+            lines.append(
+                f"{label}: +{len(added)} ~{len(changed)} -{len(removed)}"
+                + "".join(f"\n  + {n}" for n in added[:20])
+                + "".join(f"\n  ~ {n}" for n in changed[:20])
+                + "".join(f"\n  - {n}" for n in removed[:20])
+            )
+        lines.append(f"unchanged: {self.unchanged}")
+        return "\n".join(lines)
+
+    @property
+    def is_empty(self) -> bool:
+        return not any(
+            [*self.added.values(), *self.changed.values(), *self.removed.values()]
+        )
+
+
+def load_records(paths: dict[str, str] = INPUT_PATHS) -> dict[str, list[dict]]:
+    records = {}
+    for label, path in paths.items():
+        with open(path) as f:
+            records[label] = json.load(f)
+    return records
+
+
+def loaded_fingerprints(graph: Graph) -> dict[str, dict[str, str]]:
+    """The manifest: label -> node name -> fingerprint of the record it was loaded from."""
+    manifest: dict[str, dict[str, str]] = {label: {} for label in _PROPERTIES}
+    for label in _PROPERTIES:
+        result = graph.query(
+            f"MATCH (n:{label}) WHERE n._fingerprint IS NOT NULL "
+            "RETURN n.name, n._fingerprint"
+        )
+        manifest[label] = {name: fp for name, fp in result.result_set}
+    return manifest
+
+
+def plan(
+    records: dict[str, list[dict]], manifest: dict[str, dict[str, str]]
+) -> IngestPlan:
+    result = IngestPlan()
+    for label, rows in records.items():
+        loaded = manifest.get(label, {})
+        seen = set()
+        for record in rows:
+            seen.add(record["name"])
+            fp = fingerprint(record)
+            if record["name"] not in loaded:
+                result.added.setdefault(label, []).append(record)
+            elif loaded[record["name"]] != fp:
+                result.changed.setdefault(label, []).append(record)
+            else:
+                result.unchanged += 1
+        result.removed[label] = sorted(set(loaded) - seen)
+    return result
+
+
+def _write(graph: Graph, label: str, records: list[dict], relink: bool) -> None:
+    props = ", ".join(f"n.{p} = row.{p}" for p in _PROPERTIES[label])
+    # A changed record may have moved to another city/country: drop the old link first
+    relation = "IN_COUNTRY" if label == "City" else "IN_CITY"
+    unlink = (
+        f"WITH n, row OPTIONAL MATCH (n)-[old:{relation}]->() "
+        "DELETE old WITH DISTINCT n, row "
+        if relink
+        else "WITH n, row "
+    )
+    query = (
+        f"UNWIND $rows AS row MERGE (n:{label} {{name: row.name}}) "
+        f"SET {props}, n._fingerprint = row.fp "
+        f"{unlink}{_LINK[label]}"
+    )
+    for start in range(0, len(records), BATCH_SIZE):
+        rows = [
+            {
+                "name": r["name"],
+                "fp": fingerprint(r),
+                "parent": r[_PARENT_FIELD[label]],
+                **{p: r.get(p) for p in _PROPERTIES[label]},
+            }
+            for r in records[start : start + BATCH_SIZE]
+        ]
+        graph.query(query, {"rows": rows})
+
+
+def apply(graph: Graph, ingest_plan: IngestPlan, prune: bool = False) -> None:
+    # Cities first so restaurants/attractions link to fully populated City nodes
+    for label in ("City", "Attraction", "Restaurant"):
+        _write(graph, label, ingest_plan.added.get(label, []), relink=False)
+        _write(graph, label, ingest_plan.changed.get(label, []), relink=True)
+        if prune and ingest_plan.removed.get(label):
+            graph.query(
+                f"UNWIND $names AS name MATCH (n:{label} {{name: name}}) DETACH DELETE n",
+                {"names": ingest_plan.removed[label]},
+            )
+
+
+def ensure_schema(db: FalkorDB, graph: Graph, graph_name: str) -> None:
+    """Indexes for the MERGE keys, plus the stored ontology FalkorGraphQueryEngine.connect_db() reads."""
+    for label in ("Country", "City", "Attraction", "Restaurant"):
+        try:
+            graph.query(f"CREATE INDEX FOR (n:{label}) ON (n.name)")
+        except ResponseError as e:
+            if "already indexed" not in str(e):
+                raise
+    ontology_graph_name = f"{graph_name}_ontology"
+    if ontology_graph_name not in db.list_graphs():
+        get_trip_ontology().save_to_graph(db.select_graph(ontology_graph_name))
+
+
+def ingest_trip_data(
+    host: str,
+    port: int,
+    graph_name: str = GRAPH_NAME,
+    dry_run: bool = False,
+    prune: bool = False,
+    records: dict[str, list[dict]] | None = None,
+) -> IngestPlan:
+    """Loads new or changed trip records into FalkorDB and returns what changed."""
+    db = FalkorDB(host=host, port=port)
+    graph = db.select_graph(graph_name)
+    records = records if records is not None else load_records()
+    manifest = loaded_fingerprints(graph) if graph_name in db.list_graphs() else {}
+    ingest_plan = plan(records, manifest)
+    if dry_run or ingest_plan.is_empty:
+        return ingest_plan
+    ensure_schema(db, graph, graph_name)
+    apply(graph, ingest_plan, prune=prune)
+    return ingest_plan
+
+
+def _synthetic_records(count: int) -> dict[str, list[dict]]:
+    rng = random.Random(0)
+    cities = [
+        {
+            "id": i,
+            "name": f"City {i}",
+            "country": f"Country {i % 20}",
+            "population": rng.randint(10_000, 3_000_000),
+            "weather": "Mediterranean",
+        }
+        for i in range(max(1, count // 100))
+    ]
+    half = count // 2
+    attractions = [
+        {
+            "id": i,
+            "name": f"Attraction {i}",
+            "description": f"Synthetic attraction {i}",
+            "city": cities[i % len(cities)]["name"],
+            "type": rng.choice(["Historical", "Art", "Landmark"]),
+        }
+        for i in range(half)
+    ]
+    restaurants = [
+        {
+            "id": i,
+            "name": f"Restaurant {i}",
+            "description": f"Synthetic restaurant {i}",
+            "city": cities[i % len(cities)]["name"],
+            "rating": round(rng.uniform(3, 5), 1),
+            "food_type": rng.choice(["Italian", "Seafood", "Pizza"]),
+        }
+        for i in range(count - half)
+    ]
+    return {"City": cities, "Attraction": attractions, "Restaurant": restaurants}
+
+
+def benchmark(host: str, port: int, count: int) -> None:
+    graph_name = f"{GRAPH_NAME}_bench"
+    db = FalkorDB(host=host, port=port)
+    for name in (graph_name, f"{graph_name}_ontology"):
+        if name in db.list_graphs():
+            db.select_graph(name).delete()
+    records = _synthetic_records(count)
+
+    def timed(label: str, **kwargs) -> None:
+        start = time.perf_counter()
+        result = ingest_trip_data(host, port, graph_name, records=records, **kwargs)
+        elapsed = time.perf_counter() - start
+        written = sum(len(v) for v in result.added.values()) + sum(
+            len(v) for v in result.changed.values()
+        )
+        print(f"{label:<28} {elapsed:8.2f}s  ({written} records written)")
+
+    print(f"Benchmark: {count} POIs into graph '{graph_name}'")
+    timed("initial load")
+    timed("re-run, nothing changed")
+    for rows in records.values():
+        for record in rows[: max(1, len(rows) // 100)]:
+            record["description"] = f"{record.get('description', '')} (updated)"
+    timed("re-run, 1% changed")
+    db.select_graph(graph_name).delete()
+    db.select_graph(f"{graph_name}_ontology").delete()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="show the diff only")
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="delete records no longer in the JSON files",
+    )
+    parser.add_argument(
+        "--benchmark", type=int, metavar="N", help="time loading N synthetic POIs"
+    )
+    args = parser.parse_args()
+
+    host = os.environ.get("FALKORDB_HOST", "0.0.0.0")
+    port = int(os.environ.get("FALKORDB_PORT", "6379"))
+    if args.benchmark:
+        benchmark(host, port, args.benchmark)
+    else:
+        print(
+            ingest_trip_data(
+                host, port, dry_run=args.dry_run, prune=args.prune
+            ).describe()
+        )
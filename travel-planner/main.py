@@ -1,7 +1,5 @@
-import atexit
 import json
 import os
-import tempfile
 from typing import Any
 
 from dotenv import load_dotenv
@@ -21,7 +19,6 @@
     StringLLMCondition,
 )
 from autogen.agentchat.group.patterns import DefaultPattern
-from autogen.agentchat.contrib.graph_rag.document import Document, DocumentType
 from graphrag_sdk.models.openai import OpenAiGenerativeModel
 from autogen.agentchat.contrib.graph_rag.falkor_graph_query_engine import (
     FalkorGraphQueryEngine,
@@ -31,7 +28,9 @@
 )
 
 # local file imports
+from ingest import INPUT_PATHS, ingest_trip_data
 from ontology import get_trip_ontology
+from poi_index import PoiIndex
 from google_map_platforms import Itinerary, update_itinerary_with_travel_times
 
 # ---------------------------------------------------------------------
@@ -56,41 +55,11 @@
 falkordb_host = os.environ.get("FALKORDB_HOST", "0.0.0.0")
 falkordb_port = int(os.environ.get("FALKORDB_PORT", "6379"))
 
-_temp_files: list[str] = []
-
-
-def _cleanup_temp_files() -> None:
-    for path in _temp_files:
-        try:
-            os.unlink(path)
-        except OSError:
-            pass
-
-
-atexit.register(_cleanup_temp_files)
-
-
-def _json_to_jsonl(json_path: str) -> str:
-    """Convert a JSON array file to a JSONL temp file (required by graphrag_sdk)."""
-    with open(json_path) as f:
-        data = json.load(f)
-    tmp = tempfile.NamedTemporaryFile(mode="w", suffix=".jsonl", delete=False)
-    for item in data:
-        tmp.write(json.dumps(item) + "\n")
-    tmp.close()
-    _temp_files.append(tmp.name)
-    return tmp.name
-
-
-input_paths = [
-    "./trip_planner_data/attractions.json",
-    "./trip_planner_data/cities.json",
-    "./trip_planner_data/restaurants.json",
-]
-input_documents = [
-    Document(doctype=DocumentType.TEXT, path_or_url=_json_to_jsonl(p))
-    for p in input_paths
-]
+# Load new or changed records straight into the graph (no LLM extraction needed,
+# the ontology maps 1:1 onto the JSON fields). A no-op when nothing has changed.
+ingest_plan = ingest_trip_data(falkordb_host, falkordb_port)
+if not ingest_plan.is_empty:
+    print(f"Trip data ingested:\n{ingest_plan.describe()}")
 
 trip_data_ontology = get_trip_ontology()
 
@@ -102,8 +71,6 @@ def _json_to_jsonl(json_path: str) -> str:
     model=OpenAiGenerativeModel("gpt-4o"),
 )
 
-# Data already ingested on first run — use connect_db to reconnect.
-# To re-ingest from scratch, replace connect_db with init_db below.
 query_engine.connect_db()
 
 # ---------------------------------------------------------------------
@@ -222,6 +189,13 @@ def create_structured_itinerary(
 graph_rag_capability = FalkorGraphRagCapability(query_engine)
 graph_rag_capability.add_to_agent(graphrag_agent)
 
+# Answer common "restaurants/attractions in <city>" requests from a local index first;
+# anything the index can't answer falls through to the GraphRAG capability above
+poi_index = PoiIndex.from_files(
+    INPUT_PATHS["Attraction"], INPUT_PATHS["City"], INPUT_PATHS["Restaurant"]
+)
+poi_index.add_to_agent(graphrag_agent)
+
 customer = UserProxyAgent(name="customer", code_execution_config=False)
 
 # ---------------------------------------------------------------------
@@ -310,3 +284,5 @@ def print_itinerary(itinerary_data: dict[str, Any]) -> None:
     print_itinerary(context_variables["timed_itinerary"])
 else:
     print("No itinerary available to print.")
+
+print(poi_index.summary())
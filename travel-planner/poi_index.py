@@ -0,0 +1,378 @@
+import json
+import re
+import time
+from collections import defaultdict
+from typing import Any
+
+from autogen import Agent, ConversableAgent
+
+# Words that carry no filtering meaning in a planner's request
+_STOPWORDS = {
+    "a",
+    "about",
+    "all",
+    "also",
+    "an",
+    "and",
+    "any",
+    "are",
+    "can",
+    "could",
+    "day",
+    "for",
+    "from",
+    "get",
+    "give",
+    "good",
+    "great",
+    "have",
+    "i",
+    "in",
+    "information",
+    "is",
+    "it",
+    "list",
+    "location",
+    "me",
+    "my",
+    "need",
+    "of",
+    "on",
+    "option",
+    "or",
+    "place",
+    "please",
+    "provide",
+    "recommend",
+    "recommendation",
+    "some",
+    "that",
+    "the",
+    "there",
+    "their",
+    "them",
+    "these",
+    "to",
+    "trip",
+    "visit",
+    "want",
+    "we",
+    "what",
+    "whats",
+    "where",
+    "which",
+    "with",
+    "would",
+    "you",
+    "couple",
+    "few",
+    "best",
+    "top",
+    "popular",
+    "thing",
+    "do",
+    "see",
+    "s",
+    "itinerary",
+    "plan",
+    "planning",
+    "detail",
+    "including",
+    "include",
+    "both",
+    "separately",
+    "go",
+    "going",
+    "stay",
+    "staying",
+    "night",
+    "week",
+    "weekend",
+    "like",
+    "interested",
+    "customer",
+    "this",
+    "they",
+    "will",
+    "be",
+    "how",
+    "many",
+    "much",
+    "rated",
+    "rating",
+    "star",
+    "above",
+    "over",
+    "at",
+    "least",
+    "higher",
+    "more",
+    "better",
+}
+_RESTAURANT_WORDS = {
+    "restaurant",
+    "food",
+    "eat",
+    "eating",
+    "dining",
+    "dine",
+    "dinner",
+    "lunch",
+    "breakfast",
+    "meal",
+    "cuisine",
+}
+_ATTRACTION_WORDS = {"attraction", "sight", "sightseeing", "activity", "tourist"}
+# e.g. "rated 4.5 or above", "rating of at least 4", "4.7 stars"; a bare number
+# ("over 3 days") is not a rating
+_MIN_RATING = re.compile(
+    r"\brat(?:ed|ing)\b\D{0,16}?\b([1-5](?:\.\d+)?)\b"
+    r"(?!\s*(?:days?|nights?|weeks?|hours?|people|persons?|guests?)\b)|"
+    r"\b([1-5](?:\.\d+)?)\s*(?:stars?|or (?:above|higher|better))\b"
+)
+
+
+def _tokens(text: str) -> list[str]:
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", text.lower()):
+        # crude plural folding so "museums" matches "museum"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class PoiIndex:
+    """In-process index over the trip planner JSON data, built once at startup.
+
+    Answers the common "restaurants and/or attractions in <city>" requests
+    directly, optionally narrowed by food type, attraction type or description
+    keywords (all of which must match the same place) and a minimum rating, so
+    they don't need an LLM-generated Cypher query and an LLM answer. Anything
+    it cannot resolve returns None and is left to GraphRAG.
+    """
+
+    def __init__(
+        self,
+        attractions: list[dict[str, Any]],
+        cities: list[dict[str, Any]],
+        restaurants: list[dict[str, Any]],
+    ):
+        self.cities = {c["name"].lower(): c for c in cities}
+        # city -> attraction type -> POIs
+        self.attractions_by_city: dict[str, dict[str, list[dict]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        # city -> rating -> restaurants, best rating first
+        self.restaurants_by_city: dict[str, dict[float, list[dict]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        # city -> food type -> restaurants, best rating first
+        self.restaurants_by_food_type: dict[str, dict[str, list[dict]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        # token -> keys of POIs whose name/description/type mentions it
+        self.inverted: dict[str, set[tuple[str, int]]] = defaultdict(set)
+
+        for poi in attractions:
+            city = poi["city"].lower()
+            self.attractions_by_city[city][poi.get("type", "Other")].append(poi)
+            self._index_text(("attraction", poi["id"]), poi, poi.get("type", ""))
+        for poi in sorted(restaurants, key=lambda r: -r.get("rating", 0)):
+            city = poi["city"].lower()
+            self.restaurants_by_city[city][poi.get("rating", 0)].append(poi)
+            food_type = poi.get("food_type", "Other")
+            self.restaurants_by_food_type[city][food_type].append(poi)
+            self._index_text(("restaurant", poi["id"]), poi, poi.get("food_type", ""))
+        self.city_names = (
+            set(self.cities)
+            | set(self.attractions_by_city)
+            | set(self.restaurants_by_city)
+        )
+
+        self.query_log: list[dict[str, Any]] = []
+
+    @classmethod
+    def from_files(
+        cls, attractions_path: str, cities_path: str, restaurants_path: str
+    ) -> "PoiIndex":
+        def load(path: str) -> list[dict[str, Any]]:
+            with open(path) as f:
+                return json.load(f)
+
+        return cls(load(attractions_path), load(cities_path), load(restaurants_path))
+
+    def _index_text(self, key: tuple[str, int], poi: dict, category: str) -> None:
+        text = f"{poi['name']} {poi.get('description', '')} {category}"
+        for token in set(_tokens(text)):
+            self.inverted[token].add(key)
+
+    # -------------- Query --------------
+    def answer(self, question: str) -> str | None:
+        """Answers a planner request from the index, or returns None if it can't."""
+        start = time.perf_counter()
+        result = self._answer(question)
+        self.query_log.append(
+            {
+                "question": question[:200],
+                "hit": result is not None,
+                "latency_ms": (time.perf_counter() - start) * 1000,
+            }
+        )
+        return result
+
+    def _answer(self, question: str) -> str | None:
+        tokens = _tokens(question)
+        city_tokens = {t for name in self.city_names for t in _tokens(name)}
+        cities = [name for name in self.city_names if set(_tokens(name)) <= set(tokens)]
+        if len(cities) != 1:
+            return None  # no city, or a comparison across cities: leave to GraphRAG
+        city = cities[0]
+
+        # Food types the city has are looked up in the food type index
+        food_types = [
+            food_type
+            for food_type in self.restaurants_by_food_type.get(city, {})
+            if set(_tokens(food_type)) <= set(tokens)
+        ]
+        food_type_tokens = {t for food_type in food_types for t in _tokens(food_type)}
+
+        wants_restaurants = bool(_RESTAURANT_WORDS & set(tokens) or food_types)
+        wants_attractions = bool(_ATTRACTION_WORDS & set(tokens))
+        min_rating = None
+        if match := _MIN_RATING.search(question.lower()):
+            min_rating = float(match.group(1) or match.group(2))
+            if not wants_attractions:
+                wants_restaurants = True  # only restaurants are rated
+        keywords = [
+            t
+            for t in tokens
+            if t not in _STOPWORDS
+            and not t.isdigit()
+            and t not in city_tokens
+            and t not in food_type_tokens
+            and t not in _RESTAURANT_WORDS
+            and t not in _ATTRACTION_WORDS
+        ]
+        # Every remaining keyword must be something the index knows about,
+        # otherwise the question asks for more than the static data holds.
+        if any(t not in self.inverted for t in keywords):
+            return None
+        if not wants_restaurants and not wants_attractions:
+            wants_restaurants = wants_attractions = True
+
+        matching = None
+        if keywords:
+            # Every keyword has to describe the same place
+            matching = set.intersection(*(self.inverted[t] for t in keywords))
+            if not matching:
+                return None
+
+        sections = []
+        if wants_restaurants:
+            by_rating = self.restaurants_by_city.get(city, {})
+            if food_types:
+                by_food_type = self.restaurants_by_food_type[city]
+                by_rating = defaultdict(list)
+                for poi in sorted(
+                    (
+                        poi
+                        for food_type in food_types
+                        for poi in by_food_type[food_type]
+                    ),
+                    key=lambda r: -r.get("rating", 0),
+                ):
+                    by_rating[poi.get("rating", 0)].append(poi)
+            sections.append(
+                self._format(
+                    f"Restaurants in {city.title()}",
+                    {
+                        f"Rated {rating}": pois
+                        for rating, pois in by_rating.items()
+                        if min_rating is None or rating >= min_rating
+                    },
+                    "restaurant",
+                    matching,
+                    detail="food_type",
+                )
+            )
+        if wants_attractions:
+            sections.append(
+                self._format(
+                    f"Attractions in {city.title()}",
+                    self.attractions_by_city.get(city, {}),
+                    "attraction",
+                    matching,
+                )
+            )
+        if not any(sections):
+            return None
+        return "\n\n".join(s for s in sections if s)
+
+    @staticmethod
+    def _format(
+        title: str,
+        grouped: dict[str, list[dict]],
+        kind: str,
+        matching: set[tuple[str, int]] | None,
+        detail: str | None = None,
+    ) -> str:
+        """One block per group (in the given order), listing the POIs that match."""
+        groups = []
+        for heading, pois in grouped.items():
+            lines = []
+            for poi in pois:
+                if matching is not None and (kind, poi["id"]) not in matching:
+                    continue
+                name = (
+                    f"{poi['name']} ({poi[detail]})" if detail in poi else poi["name"]
+                )
+                lines.append(f"- {name}: {poi.get('description', '')}")
+            if lines:
+                groups.append(f"{heading}:\n" + "\n".join(lines))
+        if not groups:
+            return ""
+        return f"{title}\n" + "\n".join(groups)
+
+    # -------------- Stats --------------
+    @property
+    def hit_rate(self) -> float:
+        if not self.query_log:
+            return 0.0
+        return sum(q["hit"] for q in self.query_log) / len(self.query_log)
+
+    def summary(self) -> str:
+        if not self.query_log:
+            return "POI index: no queries."
+        latencies = [q["latency_ms"] for q in self.query_log]
+        return (
+            f"POI index: {len(self.query_log)} queries, hit rate {self.hit_rate:.0%}, "
+            f"avg lookup {sum(latencies) / len(latencies):.2f} ms"
+        )
+
+    # -------------- Agent integration --------------
+    def add_to_agent(self, agent: ConversableAgent) -> None:
+        """Registers the index as the agent's first reply function.
+
+        On a hit the agent replies from the index; on a miss the reply chain
+        continues to the next registered reply (the GraphRAG capability).
+        """
+
+        def _reply_from_index(
+            recipient: ConversableAgent,
+            messages: list[dict] | None = None,
+            sender: Agent | None = None,
+            config: Any | None = None,
+        ) -> tuple[bool, str | None]:
+            question = (messages or [{}])[-1].get("content")
+            if not isinstance(question, str):
+                return False, None
+            answer = self.answer(question)
+            latency = self.query_log[-1]["latency_ms"]
+            if answer is None:
+                print(f"[POI index] miss ({latency:.2f} ms), falling back to GraphRAG")
+                return False, None
+            print(f"[POI index] hit ({latency:.2f} ms)")
+            return True, answer
+
+        agent.register_reply([ConversableAgent, None], _reply_from_index, position=0)
@@ -0,0 +1,140 @@
+"""Tests for the travel time lookups against a local stub of the Directions API."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import google_map_platforms
+from google_map_platforms import TravelTimeCache, _resolve_travel_times
+
+UPSTREAM_SECONDS = 0.2
+
+
+class StubDirections:
+    """Answers Directions requests after a delay, recording the legs asked for."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.unknown = set()  # destinations with no route
+
+
+def make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            assert url.path == "/directions/json"
+            with stub.lock:
+                stub.requests.append((query["origin"], query["destination"]))
+                stub.in_flight += 1
+                stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+            time.sleep(UPSTREAM_SECONDS)
+            with stub.lock:
+                stub.in_flight -= 1
+
+            if query["destination"] in stub.unknown:
+                response = {"routes": [], "status": "ZERO_RESULTS"}
+            else:
+                minutes = len(query["origin"]) + len(query["destination"])
+                leg = {
+                    "duration": {"text": f"{minutes} mins", "value": minutes * 60},
+                    "distance": {"text": f"{minutes / 10} km", "value": minutes * 100},
+                    "steps": [{"html_instructions": "Walk"}],
+                }
+                response = {"routes": [{"legs": [leg]}], "status": "OK"}
+            data = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = StubDirections()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(stub))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # The GOOGLE_MAP_API_BASE override, pointed at the stub
+    monkeypatch.setattr(
+        google_map_platforms,
+        "_GOOGLE_MAP_API_BASE",
+        f"http://127.0.0.1:{server.server_port}",
+    )
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "travel_time_cache.json")
+
+
+def test_misses_are_fetched_once_and_cached(stub, cache_path):
+    legs = [
+        ("Louvre, Paris", "Eiffel Tower, Paris"),
+        ("Eiffel Tower, Paris", "Musée d'Orsay, Paris"),
+        ("Louvre, Paris", "Eiffel Tower, Paris"),
+    ]
+
+    resolved = _resolve_travel_times(legs, cache=TravelTimeCache(cache_path))
+
+    assert len(stub.requests) == 2
+    assert resolved[legs[0]] == {
+        "duration": {"text": "32 mins"},
+        "distance": {"text": "3.2 km"},
+    }
+    with open(cache_path) as f:
+        assert len(json.load(f)) == 2
+
+
+def test_cache_hits_make_no_requests(stub, cache_path):
+    legs = [("Louvre, Paris", "Eiffel Tower, Paris")]
+    first = _resolve_travel_times(legs, cache=TravelTimeCache(cache_path))
+
+    # A new cache loads the saved legs; keys ignore case and comma spacing
+    again = [("louvre ,paris", "EIFFEL TOWER,  Paris")]
+    second = _resolve_travel_times(again, cache=TravelTimeCache(cache_path))
+
+    assert len(stub.requests) == 1
+    assert second[again[0]] == first[legs[0]]
+
+
+def test_failed_lookups_are_not_cached(stub, cache_path):
+    stub.unknown = {"Atlantis"}
+    legs = [("Louvre, Paris", "Atlantis"), ("Louvre, Paris", "Eiffel Tower, Paris")]
+
+    resolved = _resolve_travel_times(legs, cache=TravelTimeCache(cache_path))
+    assert resolved[legs[0]] is None
+    assert resolved[legs[1]] is not None
+
+    _resolve_travel_times(legs, cache=TravelTimeCache(cache_path))
+    assert stub.requests.count(legs[0]) == 2
+    assert stub.requests.count(legs[1]) == 1
+
+
+def test_misses_are_resolved_in_parallel(stub, cache_path):
+    legs = [(f"Stop {i}, Paris", f"Stop {i + 1}, Paris") for i in range(8)]
+
+    start = time.perf_counter()
+    resolved = _resolve_travel_times(legs, cache=TravelTimeCache(cache_path))
+    elapsed = time.perf_counter() - start
+
+    assert all(resolved[leg] is not None for leg in legs)
+    assert sorted(stub.requests) == sorted(legs)
+    assert stub.max_in_flight > 1
+    # Sequential lookups would take 8 * UPSTREAM_SECONDS
+    assert elapsed < 4 * UPSTREAM_SECONDS
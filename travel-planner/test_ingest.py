@@ -0,0 +1,144 @@
+"""Tests for the ingest planning: fingerprints, the diff against the manifest, prune."""
+
+import copy
+import os
+
+import pytest
+from redis.exceptions import ResponseError
+
+from ingest import (
+    IngestPlan,
+    apply,
+    ensure_schema,
+    fingerprint,
+    load_records,
+    plan,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "trip_planner_data")
+
+
+class RecordingGraph:
+    """Records the Cypher it is sent; CREATE INDEX fails with index_error if set."""
+
+    def __init__(self, index_error: str | None = None):
+        self.queries = []
+        self.index_error = index_error
+
+    def query(self, query, params=None):
+        self.queries.append((query, params))
+        if self.index_error and query.startswith("CREATE INDEX"):
+            raise ResponseError(self.index_error)
+
+
+class ExistingDB:
+    """A FalkorDB whose graphs, ontology included, already exist."""
+
+    def list_graphs(self):
+        return ["trip_data", "trip_data_ontology"]
+
+
+@pytest.fixture
+def records():
+    return load_records(
+        {
+            "Attraction": os.path.join(DATA_DIR, "attractions.json"),
+            "City": os.path.join(DATA_DIR, "cities.json"),
+            "Restaurant": os.path.join(DATA_DIR, "restaurants.json"),
+        }
+    )
+
+
+def _manifest(records):
+    return {
+        label: {r["name"]: fingerprint(r) for r in rows}
+        for label, rows in records.items()
+    }
+
+
+def test_fingerprint_ignores_key_order_and_tracks_values():
+    record = {"name": "Rome", "country": "Italy", "population": 2_800_000}
+
+    assert fingerprint(record) == fingerprint(dict(reversed(record.items())))
+    assert fingerprint(record) != fingerprint({**record, "population": 2_900_000})
+    assert len(fingerprint(record)) == 16
+
+
+def test_first_load_adds_everything(records):
+    ingest_plan = plan(records, {})
+
+    assert {label: len(rows) for label, rows in ingest_plan.added.items()} == {
+        label: len(rows) for label, rows in records.items()
+    }
+    assert not ingest_plan.changed and ingest_plan.unchanged == 0
+    assert not ingest_plan.is_empty
+
+
+def test_rerun_with_the_same_data_is_empty(records):
+    ingest_plan = plan(records, _manifest(records))
+
+    assert ingest_plan.is_empty
+    assert ingest_plan.unchanged == sum(len(rows) for rows in records.values())
+
+
+def test_changed_and_removed_records_are_planned(records):
+    manifest = _manifest(records)
+    edited = copy.deepcopy(records)
+    edited["Restaurant"][0]["rating"] = 1.0
+    removed = edited["Attraction"].pop()
+
+    ingest_plan = plan(edited, manifest)
+
+    assert ingest_plan.changed == {"Restaurant": [edited["Restaurant"][0]]}
+    assert ingest_plan.removed["Attraction"] == [removed["name"]]
+    assert not ingest_plan.added
+    assert ingest_plan.describe().splitlines() == [
+        "City: +0 ~0 -0",
+        "Attraction: +0 ~0 -1",
+        f"  - {removed['name']}",
+        "Restaurant: +0 ~1 -0",
+        f"  ~ {edited['Restaurant'][0]['name']}",
+        f"unchanged: {ingest_plan.unchanged}",
+    ]
+
+
+@pytest.mark.parametrize("prune", [False, True])
+def test_removed_records_are_only_deleted_with_prune(records, prune):
+    manifest = _manifest(records)
+    edited = copy.deepcopy(records)
+    removed = edited["Attraction"].pop()
+    graph = RecordingGraph()
+
+    apply(graph, plan(edited, manifest), prune=prune)
+
+    deletes = [params for query, params in graph.queries if "DETACH DELETE" in query]
+    assert deletes == ([{"names": [removed["name"]]}] if prune else [])
+
+
+def test_changes_are_written_cities_first(records):
+    graph = RecordingGraph()
+
+    apply(graph, plan(records, {}))
+
+    labels = [query.split("MERGE (n:")[1].split(" ")[0] for query, _ in graph.queries]
+    assert labels == ["City", "Attraction", "Restaurant"]
+
+
+def test_existing_indexes_are_skipped():
+    graph = RecordingGraph(index_error="Attribute 'name' is already indexed")
+
+    ensure_schema(ExistingDB(), graph, "trip_data")
+
+    assert len(graph.queries) == 4
+
+
+def test_other_index_errors_are_raised():
+    graph = RecordingGraph(index_error="Connection reset by peer")
+
+    with pytest.raises(ResponseError):
+        ensure_schema(ExistingDB(), graph, "trip_data")
+
+
+def test_empty_plan_describes_no_changes():
+    assert IngestPlan().is_empty
+    assert IngestPlan().describe().endswith("unchanged: 0")
@@ -0,0 +1,106 @@
+"""Tests for the POI index over the trip planner data."""
+
+import os
+
+import pytest
+
+from poi_index import PoiIndex
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "trip_planner_data")
+
+
+@pytest.fixture
+def index():
+    return PoiIndex.from_files(
+        os.path.join(DATA_DIR, "attractions.json"),
+        os.path.join(DATA_DIR, "cities.json"),
+        os.path.join(DATA_DIR, "restaurants.json"),
+    )
+
+
+def test_city_request_is_a_hit_grouped_by_rating(index):
+    answer = index.answer("What restaurants are in Rome?")
+
+    assert answer.splitlines() == [
+        "Restaurants in Rome",
+        "Rated 4.8:",
+        "- Il Pagliaccio (Italian): An elegant Michelin-starred restaurant offering"
+        " contemporary Italian cuisine.",
+        "Rated 4.7:",
+        "- Tonnarello (Italian): Casual stop for pasta, meatballs & other simple"
+        " Roman dishes, plus patio seating & acoustic guitar.",
+        "Rated 4.5:",
+        "- Trattoria da Enzo (Italian): A cozy trattoria known for its traditional"
+        " Roman dishes and welcoming atmosphere.",
+        "Rated 4.3:",
+        "- Osteria delle Commari (Italian): Local home style Roman restaurant near"
+        " Vatican Museums.",
+    ]
+    assert index.query_log[-1]["hit"]
+
+
+def test_attractions_are_grouped_by_type(index):
+    answer = index.answer("Which attractions are in Florence?")
+
+    assert "Attractions in Florence" in answer
+    assert "Art:\n- Uffizi Gallery" in answer
+    assert "Restaurants" not in answer
+
+
+def test_min_rating_keeps_the_top_rating_groups(index):
+    answer = index.answer("Restaurants in Rome rated 4.7 or above")
+
+    assert "Rated 4.8:" in answer and "Rated 4.7:" in answer
+    assert "Rated 4.5:" not in answer
+
+
+@pytest.mark.parametrize(
+    "question",
+    ["Restaurants in Rome over 5 days", "Restaurants in Rome for at least 5 nights"],
+)
+def test_numbers_without_a_rating_context_do_not_filter(index, question):
+    answer = index.answer(question)
+
+    assert "Rated 4.3:" in answer
+
+
+def test_food_type_is_looked_up_in_the_city(index):
+    answer = index.answer("Seafood restaurants in Venice")
+
+    assert answer.splitlines()[:3] == [
+        "Restaurants in Venice",
+        "Rated 4.6:",
+        "- Antiche Carampane (Seafood): A charming trattoria in Venice known for its"
+        " seafood dishes and Venetian specialties.",
+    ]
+    assert "Ristorante Quadri" not in answer
+
+
+def test_all_keywords_must_match_the_same_place(index):
+    answer = index.answer("An Italian restaurant in Rome with pasta")
+
+    assert "Tonnarello" in answer
+    assert "Il Pagliaccio" not in answer
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Seafood pasta restaurants in Venice",  # keywords never co-occur
+        "Seafood restaurants in Rome",  # matches only in other cities
+        "Restaurants with rooftop bars in Rome",  # words the data doesn't know
+        "Compare restaurants in Rome and Milan",  # more than one city
+        "Where should we eat?",  # no city
+    ],
+)
+def test_misses_fall_through_to_graphrag(index, question):
+    assert index.answer(question) is None
+    assert not index.query_log[-1]["hit"]
+
+
+def test_hit_rate(index):
+    index.answer("Attractions in Venice")
+    index.answer("Seafood restaurants in Rome")
+
+    assert index.hit_rate == 0.5
+    assert index.summary().startswith("POI index: 2 queries, hit rate 50%")